@@ -1,31 +1,114 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
 from http.server import HTTPServer
 from controllers.router import Router
-from database import Database
+from controllers.static_assets import StaticAssets
+from models.graph_snapshot import GraphSnapshot
+from storage import get_storage
+from views.json_view import JSONView
+from config import Config
 import signal
 import sys
+import threading
+
+class PooledHTTPServer(HTTPServer):
+    """HTTPServer qui traite chaque connexion dans un pool de threads borné.
+
+    Les connexions en cours ou en attente d'un thread sont limitées à
+    workers + Config.SERVER_BACKLOG ; au-delà, le client reçoit aussitôt un
+    503 plutôt que de s'accumuler dans la file du pool.
+    """
+    request_queue_size = 64
+    
+    def __init__(self, server_address, handler_class, workers):
+        super().__init__(server_address, handler_class)
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='wastegraph-worker')
+        self.pending = threading.BoundedSemaphore(workers + Config.SERVER_BACKLOG)
+        # Un flux SSE occupe un thread pendant toute sa durée : on en laisse
+        # toujours au moins un pour les requêtes ordinaires
+        self.stream_slots = threading.BoundedSemaphore(max(1, min(Config.SSE_MAX_CLIENTS, workers - 1)))
+    
+    def process_request(self, request, client_address):
+        if not self.pending.acquire(blocking=False):
+            self._reject(request)
+            return
+        try:
+            self.executor.submit(self._process_request_worker, request, client_address)
+        except RuntimeError:
+            # Pool arrêté (fermeture du serveur)
+            self.pending.release()
+            self.shutdown_request(request)
+    
+    def _reject(self, request):
+        body = json.dumps(JSONView.error("Server busy, retry later", 503)).encode()
+        head = (
+            "HTTP/1.1 503 Service Unavailable\r\n"
+            "Content-Type: application/json\r\n"
+            "Retry-After: 1\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Connection: close\r\n\r\n"
+        )
+        try:
+            request.sendall(head.encode() + body)
+        except OSError:
+            pass
+        finally:
+            self.shutdown_request(request)
+    
+    def _process_request_worker(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self.pending.release()
+    
+    def server_close(self):
+        super().server_close()
+        self.executor.shutdown(wait=False)
 
 class WasteGraphApp:
-    def __init__(self, host='localhost', port=8000):
+    def __init__(self, host='localhost', port=8000, workers=None):
         self.host = host
         self.port = port
+        self.workers = Config.SERVER_WORKERS if workers is None else workers
         self.server = None
-        self.db = Database()
+        self.storage = get_storage()
+    
+    def create_server(self):
+        if self.workers > 1:
+            return PooledHTTPServer((self.host, self.port), Router, self.workers)
+        return HTTPServer((self.host, self.port), Router)
     
     def run(self):
         try:
-            self.server = HTTPServer((self.host, self.port), Router)
-            print(f"Server running on http://{self.host}:{self.port}")
+            self.server = self.create_server()
+            StaticAssets().preload()
+            self._load_snapshot()
+            print(f"Server running on http://{self.host}:{self.port} ({self.workers} worker(s), {self.storage.name} storage)")
             print("Available endpoints:")
-            print("  GET  /graph - Get graph data")
+            print("  GET  /graph[?bbox=x1,y1,x2,y2&limit=N&cursor=C&format=ndjson] - Get graph data (streamed)")
+            print("  GET  /graph?format=columnar|binary - Graph as columns, JSON or typed arrays (or via Accept)")
+            print("  GET  /graph/changes?since=TAG - Changes since a graph version (SSE with Accept: text/event-stream)")
+            print("  GET  /graph/nearest?x=0&y=0[&k=5] - Nearest bins")
+            print("  GET  /graph/within?x=0&y=0&r=500 - Bins within a radius")
             print("  POST /graph/node - Add node")
             print("  POST /graph/edge - Add edge")
+            print("  POST /graph/bulk?format=csv|ndjson|geojson - Bulk import (NDJSON progress)")
             print("  PUT  /graph/node - Update node")
             print("  PUT  /graph/edge - Update edge")
+            print("  PATCH /graph/edges - Batch update of edge weights / constraints")
+            print("  GET|PUT|DELETE /graph/edge/profile - Time-of-day cost factors of an edge")
             print("  DELETE /graph/node - Delete node")
             print("  DELETE /graph/edge - Delete edge")
-            print("  GET  /algo/dijkstra?src=A&dst=Z - Shortest path")
-            print("  GET  /algo/coloring - Graph coloring")
+            print("  GET  /algo/dijkstra?src=A&dst=Z[&algo=astar|bidirectional|depart_at=HH:MM] - Shortest path")
+            print("  GET  /algo/dijkstra/matrix?sources=A,B&targets=X,Y - Distance matrix")
+            print("  GET  /algo/coloring[?strategy=welsh_powell|dsatur&format=columnar|binary] - Graph coloring")
+            print("  GET  /algo/routes?day=Lundi&depot=D[&capacity=100&time_budget=2] - Collection routes")
+            print("  GET  /jobs/<id> - Background job status and result (add ?async=1 to coloring, matrix or routes)")
             print("  GET  /stats - Graph statistics")
+            print("  GET  /metrics - Prometheus metrics")
             
             # Gestion propre de l'arrêt
             signal.signal(signal.SIGINT, self._shutdown)
@@ -37,11 +120,26 @@ class WasteGraphApp:
             print(f"Error starting server: {e}")
             sys.exit(1)
     
+    def _load_snapshot(self):
+        if not Config.SNAPSHOT_PATH:
+            return
+        try:
+            source = GraphSnapshot().warm_start(Config.SNAPSHOT_PATH)
+            print(f"Graph loaded from {'snapshot file' if source == 'file' else 'storage'} ({len(GraphSnapshot().nodes)} nodes)")
+        except Exception as e:
+            # Le graphe sera chargé à la première requête
+            print(f"Graph warm start failed: {e}")
+    
     def _shutdown(self, signum, frame):
         print("\nShutting down server...")
         if self.server:
             self.server.shutdown()
-        self.db.close()
+        if Config.SNAPSHOT_PATH:
+            try:
+                GraphSnapshot().save(Config.SNAPSHOT_PATH)
+            except Exception as e:
+                print(f"Could not save graph snapshot: {e}")
+        self.storage.close()
         sys.exit(0)
 
 if __name__ == '__main__':
@@ -0,0 +1,57 @@
+"""
+Hiérarchie de contraction : temps de prétraitement, mémoire et latence des requêtes.
+
+Usage : python benchmarks/contraction.py [--side 60] [--queries 200]
+Même grille synthétique que point_to_point.py, sans base de données.
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from point_to_point import city_grid
+from models.contraction import ContractionHierarchy
+from models.csr_graph import CSRGraph
+from models.dijkstra import Dijkstra
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--side', type=int, default=60)
+    parser.add_argument('--queries', type=int, default=200)
+    args = parser.parse_args()
+    
+    adjacency, nodes = city_grid(args.side)
+    graph = CSRGraph.from_adjacency(adjacency, nodes=nodes)
+    
+    start = time.perf_counter()
+    hierarchy = ContractionHierarchy.build(graph)
+    build_seconds = time.perf_counter() - start
+    
+    rng = random.Random(7)
+    pairs = [tuple(rng.sample(range(len(graph)), 2)) for _ in range(args.queries)]
+    dijkstra = Dijkstra.__new__(Dijkstra)
+    
+    start = time.perf_counter()
+    reference = [dijkstra._shortest_path(graph, s, t)[1] for s, t in pairs]
+    dijkstra_ms = (time.perf_counter() - start) * 1000 / len(pairs)
+    
+    settled = 0
+    start = time.perf_counter()
+    for (s, t), expected in zip(pairs, reference):
+        _, distance, count = hierarchy.query(s, t)
+        settled += count
+        assert math.isclose(distance, expected), (s, t, distance, expected)
+    ch_ms = (time.perf_counter() - start) * 1000 / len(pairs)
+    
+    print(f"{len(graph)} nœuds, {len(graph.targets) // 2} arêtes, {hierarchy.shortcuts} raccourcis")
+    print(f"Prétraitement : {build_seconds:8.2f} s")
+    print(f"Mémoire       : CSR {graph.nbytes() / 1e6:.2f} Mo   hiérarchie {hierarchy.nbytes() / 1e6:.2f} Mo")
+    print(f"Dijkstra      : {dijkstra_ms:8.3f} ms / requête")
+    print(f"Hiérarchie    : {ch_ms:8.3f} ms / requête ({settled / len(pairs):.0f} nœuds fixés)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""
+Comparaison mémoire / latence : adjacence dict-de-listes contre CSR.
+
+Usage : python benchmarks/csr_vs_dict.py [--nodes 20000] [--degree 4] [--queries 50]
+Graphe aléatoire synthétique, aucune base de données nécessaire.
+"""
+import argparse
+import heapq
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.csr_graph import CSRGraph
+from models.dijkstra import Dijkstra
+
+def random_edges(n, degree, seed=42):
+    rng = random.Random(seed)
+    edges = {}
+    # Une chaîne garantit la connexité, le reste est tiré au hasard
+    for i in range(1, n):
+        edges[(f'N{i - 1}', f'N{i}')] = rng.uniform(1, 10)
+    while len(edges) < n * degree // 2:
+        u, v = rng.sample(range(n), 2)
+        edges[(f'N{u}', f'N{v}')] = rng.uniform(1, 10)
+    return edges
+
+def build_dict(node_ids, edges):
+    # Représentation historique reconstruite à chaque requête
+    graph = {node_id: [] for node_id in node_ids}
+    for (u, v), weight in edges.items():
+        graph[u].append((v, weight))
+        graph[v].append((u, weight))
+    return graph
+
+def dict_dijkstra(graph, src, dst):
+    distances = {node: float('inf') for node in graph}
+    distances[src] = 0
+    queue = [(0, src)]
+    while queue:
+        d, node = heapq.heappop(queue)
+        if d > distances[node]:
+            continue
+        if node == dst:
+            break
+        for neighbor, weight in graph[node]:
+            nd = d + weight
+            if nd < distances[neighbor]:
+                distances[neighbor] = nd
+                heapq.heappush(queue, (nd, neighbor))
+    return distances[dst]
+
+def measure_memory(build):
+    tracemalloc.start()
+    result = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--nodes', type=int, default=20000)
+    parser.add_argument('--degree', type=int, default=4)
+    parser.add_argument('--queries', type=int, default=50)
+    args = parser.parse_args()
+    
+    node_ids = [f'N{i}' for i in range(args.nodes)]
+    edges = random_edges(args.nodes, args.degree)
+    adjacency = {node_id: {} for node_id in node_ids}
+    for (u, v), weight in edges.items():
+        adjacency[u][v] = weight
+        adjacency[v][u] = weight
+    
+    dict_graph, dict_bytes = measure_memory(lambda: build_dict(node_ids, edges))
+    csr_graph, csr_bytes = measure_memory(lambda: CSRGraph.from_adjacency(adjacency))
+    
+    rng = random.Random(7)
+    pairs = [tuple(rng.sample(node_ids, 2)) for _ in range(args.queries)]
+    
+    start = time.perf_counter()
+    for src, dst in pairs:
+        dict_dijkstra(dict_graph, src, dst)
+    dict_ms = (time.perf_counter() - start) * 1000 / len(pairs)
+    
+    dijkstra = Dijkstra.__new__(Dijkstra)
+    start = time.perf_counter()
+    for src, dst in pairs:
+        dijkstra._shortest_path(csr_graph, csr_graph.index[src], csr_graph.index[dst])
+    csr_ms = (time.perf_counter() - start) * 1000 / len(pairs)
+    
+    print(f"{args.nodes} nœuds, {len(edges)} arêtes")
+    print(f"Mémoire  dict : {dict_bytes / 1e6:8.2f} Mo   CSR : {csr_bytes / 1e6:8.2f} Mo "
+          f"(tampons {csr_graph.nbytes() / 1e6:.2f} Mo)")
+    print(f"Dijkstra dict : {dict_ms:8.2f} ms   CSR : {csr_ms:8.2f} ms")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""
+Débit des requêtes chaudes : dicts et texte SQL à chaque appel, contre
+requêtes nommées préparées et lignes en tuples.
+
+Usage : python benchmarks/data_access.py [--nodes 20000] [--backends sqlite]
+SQLite écrit dans un fichier temporaire ; postgres (à demander explicitement)
+utilise la base de Config avec des identifiants préfixés BENCH_, supprimés à la fin.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def open_backend(name, directory):
+    if name == 'sqlite':
+        from storage.sqlite import SQLiteStorage
+        return SQLiteStorage(os.path.join(directory, 'bench.db'))
+    if name == 'postgres':
+        from storage.postgres import PostgresStorage
+        return PostgresStorage()
+    raise ValueError(f"Unknown backend '{name}' (SQL backends only)")
+
+def rate(operation, repeat=1):
+    """Lignes par seconde : operation() renvoie le nombre de lignes traitées"""
+    start = time.perf_counter()
+    rows = sum(operation() for _ in range(repeat))
+    return rows / (time.perf_counter() - start)
+
+def run(storage, n, rng):
+    ids = [f'BENCH_{i}' for i in range(n)]
+    pairs = [(ids[i - 1], ids[i]) for i in range(1, n)]
+    with storage.bulk_writer() as writer:
+        writer.write_nodes([(i, rng.uniform(0, 1000), rng.uniform(0, 1000), 10) for i in ids])
+        writer.write_edges([(u, v, rng.uniform(1, 10), 0) for u, v in pairs])
+    sample = rng.sample(ids, min(n, 2000))
+    sample_pairs = rng.sample(pairs, min(len(pairs), 2000))
+
+    def scan_dicts():
+        # Chemin d'avant : un dict par ligne, puis accès par clé
+        nodes = storage._execute("SELECT id, x, y, capacity FROM nodes")
+        edges = storage._execute("SELECT u, v, weight, constraint_value FROM edges")
+        for node in nodes:
+            node['id'], node['x'], node['y'], node['capacity']
+        for edge in edges:
+            edge['u'], edge['v'], edge['weight'], edge['constraint_value']
+        return len(nodes) + len(edges)
+
+    def scan_tuples():
+        nodes = storage.node_rows()
+        edges = storage.edge_rows()
+        for node_id, x, y, capacity in nodes:
+            pass
+        for u, v, weight, constraint_value in edges:
+            pass
+        return len(nodes) + len(edges)
+
+    def get_dicts():
+        for node_id in sample:
+            storage._execute("SELECT id, x, y, capacity FROM nodes WHERE id = %s", (node_id,))
+        return len(sample)
+
+    def get_prepared():
+        for node_id in sample:
+            storage.get_node(node_id)
+        return len(sample)
+
+    def update_text():
+        # Texte reconstruit à chaque appel selon les colonnes modifiées
+        for u, v in sample_pairs:
+            fields = {'weight': rng.uniform(1, 10)}
+            assignments = ', '.join(f"{column} = %s" for column in fields)
+            storage._execute(f"UPDATE edges SET {assignments} WHERE u = %s AND v = %s", [*fields.values(), u, v])
+        return len(sample_pairs)
+
+    def update_prepared():
+        for u, v in sample_pairs:
+            storage.update_edge(u, v, {'weight': rng.uniform(1, 10)})
+        return len(sample_pairs)
+
+    try:
+        return {
+            'scan': (rate(scan_dicts, 5), rate(scan_tuples, 5)),
+            'get_node': (rate(get_dicts), rate(get_prepared)),
+            'update_edge': (rate(update_text), rate(update_prepared))
+        }
+    finally:
+        for i in ids:
+            storage.delete_node(i)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--nodes', type=int, default=20000)
+    parser.add_argument('--backends', default='sqlite')
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for name in args.backends.split(','):
+            storage = open_backend(name, directory)
+            try:
+                results[name] = run(storage, args.nodes, random.Random(42))
+            finally:
+                storage.close()
+
+    print(f"{args.nodes} nœuds, {args.nodes - 1} arêtes — lignes par seconde")
+    print(f"{'':24}{'avant':>12}{'après':>12}{'gain':>8}")
+    for name, timings in results.items():
+        for label, (before, after) in timings.items():
+            print(f"{name + ' ' + label:24}{before:12.0f}{after:12.0f}{after / before:7.2f}x")
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
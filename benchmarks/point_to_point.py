@@ -0,0 +1,98 @@
+"""
+Requêtes point à point : nœuds fixés et latence par algorithme.
+
+Usage : python benchmarks/point_to_point.py [--side 150] [--queries 50]
+Grille urbaine synthétique (coordonnées + poids ~ longueur), sans base de données.
+time_dependent part à 07:30 avec un profil horaire (pointe 7 h - 10 h) sur un
+tiers des rues.
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.csr_graph import CSRGraph
+from models.dijkstra import Dijkstra
+from models.time_profiles import TimeDependentCosts
+
+def city_grid(side, seed=42):
+    """Grille side x side légèrement bruitée, poids = longueur x facteur de trafic"""
+    rng = random.Random(seed)
+    nodes = {}
+    for row in range(side):
+        for col in range(side):
+            nodes[f'N{row}_{col}'] = {
+                'x': col * 100 + rng.uniform(-20, 20),
+                'y': row * 100 + rng.uniform(-20, 20),
+                'capacity': None
+            }
+    adjacency = {node_id: {} for node_id in nodes}
+    
+    def link(u, v):
+        length = math.hypot(nodes[u]['x'] - nodes[v]['x'], nodes[u]['y'] - nodes[v]['y'])
+        weight = length * rng.uniform(1.0, 1.6)
+        adjacency[u][v] = weight
+        adjacency[v][u] = weight
+    
+    for row in range(side):
+        for col in range(side):
+            if col + 1 < side:
+                link(f'N{row}_{col}', f'N{row}_{col + 1}')
+            if row + 1 < side:
+                link(f'N{row}_{col}', f'N{row + 1}_{col}')
+    return adjacency, nodes
+
+def rush_hour_profiles(adjacency, share=1 / 3, slots=96, seed=42):
+    """Arêtes (u, v) et profils : facteur jusqu'à 3.5 entre 7 h et 10 h, 1 sinon"""
+    rng = random.Random(seed)
+    edges = {
+        (u, v): {'weight': weight, 'constraint_value': 0}
+        for u, neighbors in adjacency.items() for v, weight in neighbors.items() if u < v
+    }
+    profiles = {
+        key: [1 + 2.5 * rng.random() if 28 <= slot < 40 else 1.0 for slot in range(slots)]
+        for key in edges if rng.random() < share
+    }
+    return edges, profiles
+
+def run(name, search, pairs):
+    settled = 0
+    distances = []
+    start = time.perf_counter()
+    for source, target in pairs:
+        _, distance, count = search(source, target)
+        settled += count
+        distances.append(distance)
+    elapsed = (time.perf_counter() - start) * 1000 / len(pairs)
+    print(f"{name:<14}: {settled / len(pairs):10.0f} nœuds fixés   {elapsed:8.2f} ms")
+    return distances
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--side', type=int, default=150)
+    parser.add_argument('--queries', type=int, default=50)
+    args = parser.parse_args()
+    
+    adjacency, nodes = city_grid(args.side)
+    graph = CSRGraph.from_adjacency(adjacency, nodes=nodes)
+    rng = random.Random(7)
+    pairs = [tuple(rng.sample(range(len(graph)), 2)) for _ in range(args.queries)]
+    
+    dijkstra = Dijkstra.__new__(Dijkstra)
+    print(f"{len(graph)} nœuds, {len(graph.targets) // 2} arêtes, {len(pairs)} requêtes")
+    reference = run('dijkstra', lambda s, t: dijkstra.point_to_point(graph, s, t, 'dijkstra'), pairs)
+    for name in ('astar', 'bidirectional'):
+        distances = run(name, lambda s, t: dijkstra.point_to_point(graph, s, t, name), pairs)
+        assert all(math.isclose(a, b) for a, b in zip(reference, distances)), name
+    
+    # Facteurs >= 1 : jamais plus court que le chemin statique
+    costs = TimeDependentCosts.build(graph, *rush_hour_profiles(adjacency), 96)
+    distances = run('time_dependent', lambda s, t: dijkstra._time_dependent(graph, costs, s, t, 450), pairs)
+    assert all(a <= b + 1e-9 for a, b in zip(reference, distances)), 'time_dependent'
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""
+Index spatial : latence des requêtes plus-proches / rayon contre un parcours linéaire.
+
+Usage : python benchmarks/spatial.py [--nodes 100000] [--queries 200] [--radius 500]
+Bacs répartis en quartiers sur une ville de 20 km, sans base de données.
+"""
+import argparse
+import heapq
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.spatial_index import GridIndex
+
+def city_points(n, size=20000, seed=42):
+    """Densité inégale : la moitié des bacs autour de quelques centres"""
+    rng = random.Random(seed)
+    centers = [(rng.uniform(0, size), rng.uniform(0, size)) for _ in range(20)]
+    points = {}
+    for i in range(n):
+        if i % 2:
+            cx, cy = rng.choice(centers)
+            points[f'B{i}'] = (rng.gauss(cx, size / 40), rng.gauss(cy, size / 40))
+        else:
+            points[f'B{i}'] = (rng.uniform(0, size), rng.uniform(0, size))
+    return points
+
+def linear_nearest(points, x, y, k):
+    return heapq.nsmallest(k, ((math.hypot(px - x, py - y), node_id) for node_id, (px, py) in points.items()))
+
+def linear_within(points, x, y, radius):
+    return sorted(
+        (distance, node_id)
+        for node_id, (px, py) in points.items()
+        if (distance := math.hypot(px - x, py - y)) <= radius
+    )
+
+def timed(function, queries):
+    start = time.perf_counter()
+    results = [function(*query) for query in queries]
+    return (time.perf_counter() - start) * 1000 / len(queries), results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--nodes', type=int, default=100000)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--radius', type=float, default=500)
+    args = parser.parse_args()
+
+    points = city_points(args.nodes)
+    start = time.perf_counter()
+    grid = GridIndex(points)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    rng = random.Random(7)
+    locations = [(rng.uniform(0, 20000), rng.uniform(0, 20000)) for _ in range(args.queries)]
+    # Le parcours linéaire est lent : on le mesure sur un échantillon
+    sample = locations[:max(1, args.queries // 10)]
+
+    print(f"{args.nodes} bacs, grille {grid.cell_size:.0f} m, {len(grid.cells)} cellules, construite en {build_ms:.0f} ms")
+    for k in (1, 10):
+        grid_ms, grid_results = timed(lambda x, y: grid.nearest(x, y, k), locations)
+        scan_ms, scan_results = timed(lambda x, y: linear_nearest(points, x, y, k), sample)
+        assert [[d for d, _ in r] for r in grid_results[:len(sample)]] == [[d for d, _ in r] for r in scan_results]
+        print(f"nearest k={k:<3}  grille : {grid_ms:8.3f} ms   parcours : {scan_ms:8.2f} ms")
+
+    grid_ms, grid_results = timed(lambda x, y: grid.within(x, y, args.radius), locations)
+    scan_ms, scan_results = timed(lambda x, y: linear_within(points, x, y, args.radius), sample)
+    assert grid_results[:len(sample)] == scan_results
+    found = sum(len(result) for result in grid_results) / len(grid_results)
+    print(f"within r={args.radius:<5.0f} grille : {grid_ms:8.3f} ms   parcours : {scan_ms:8.2f} ms   ({found:.0f} bacs en moyenne)")
+
+    # Maintenance : déplacement d'un bac existant
+    moves = [(f'B{rng.randrange(args.nodes)}', rng.uniform(0, 20000), rng.uniform(0, 20000)) for _ in range(1000)]
+    start = time.perf_counter()
+    for node_id, x, y in moves:
+        grid.insert(node_id, x, y)
+    print(f"déplacement d'un bac : {(time.perf_counter() - start) * 1e6 / len(moves):.1f} µs")
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
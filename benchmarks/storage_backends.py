@@ -0,0 +1,83 @@
+"""
+Coût par opération des stockages (mémoire, SQLite, PostgreSQL).
+
+Usage : python benchmarks/storage_backends.py [--nodes 2000] [--backends memory,sqlite]
+SQLite écrit dans un fichier temporaire ; postgres (à demander explicitement)
+utilise la base de Config avec des identifiants préfixés BENCH_, supprimés à la fin.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage.memory import MemoryStorage
+
+def open_backend(name, directory):
+    if name == 'memory':
+        return MemoryStorage()
+    if name == 'sqlite':
+        from storage.sqlite import SQLiteStorage
+        return SQLiteStorage(os.path.join(directory, 'bench.db'))
+    if name == 'postgres':
+        from storage.postgres import PostgresStorage
+        return PostgresStorage()
+    raise ValueError(f"Unknown backend '{name}'")
+
+def run(storage, n, rng):
+    ids = [f'BENCH_{i}' for i in range(n)]
+    pairs = [(ids[i - 1], ids[i]) for i in range(1, n)]
+    timings = {}
+
+    def measure(label, operations):
+        start = time.perf_counter()
+        count = 0
+        for operation in operations:
+            operation()
+            count += 1
+        timings[label] = (time.perf_counter() - start) * 1e6 / max(count, 1)
+
+    measure('insert_node', (lambda i=i: storage.insert_node(i, rng.uniform(0, 1000), rng.uniform(0, 1000), 10) for i in ids))
+    measure('insert_edge', (lambda p=p: storage.insert_edge(p[0], p[1], rng.uniform(1, 10), 0) for p in pairs))
+    measure('update_edge', (lambda p=p: storage.update_edge(p[0], p[1], {'weight': rng.uniform(1, 10)}) for p in pairs))
+    measure('get_node', (lambda i=i: storage.get_node(i) for i in ids))
+    measure('fetch_all', [lambda: (storage.fetch_nodes(), storage.fetch_edges())])
+    measure('iter_bbox', [lambda: sum(1 for _ in storage.iter_nodes((0, 0, 250, 250)))])
+    measure('delete_node', (lambda i=i: storage.delete_node(i) for i in ids))
+
+    start = time.perf_counter()
+    with storage.bulk_writer() as writer:
+        writer.write_nodes([(i, rng.uniform(0, 1000), rng.uniform(0, 1000), 10) for i in ids])
+        writer.write_edges([(u, v, rng.uniform(1, 10), 0) for u, v in pairs])
+    timings['bulk_row'] = (time.perf_counter() - start) * 1e6 / (len(ids) + len(pairs))
+
+    for i in ids:
+        storage.delete_node(i)
+    return timings
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--nodes', type=int, default=2000)
+    parser.add_argument('--backends', default='memory,sqlite')
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for name in args.backends.split(','):
+            storage = open_backend(name, directory)
+            try:
+                results[name] = run(storage, args.nodes, random.Random(42))
+            finally:
+                storage.close()
+
+    labels = list(next(iter(results.values())))
+    print(f"{args.nodes} nœuds, {args.nodes - 1} arêtes — µs par opération")
+    print(f"{'':12}" + ''.join(f"{name:>12}" for name in results))
+    for label in labels:
+        print(f"{label:12}" + ''.join(f"{results[name][label]:12.1f}" for name in results))
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,59 @@
+"""
+Comparaison de débit : serveur mono-thread contre serveur à pool de threads.
+
+Usage : python benchmarks/throughput.py [--requests 400] [--clients 16]
+Nécessite la base PostgreSQL configurée dans config.py.
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.request import urlopen
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from app import WasteGraphApp
+
+DEFAULT_PATHS = ['/', '/static/app.js', '/graph', '/stats', '/algo/coloring']
+
+def measure(workers, paths, total, clients):
+    app = WasteGraphApp(host='127.0.0.1', port=0, workers=workers)
+    server = app.create_server()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    
+    def hit(i):
+        with urlopen(base_url + paths[i % len(paths)]) as response:
+            response.read()
+    
+    try:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=clients) as pool:
+            list(pool.map(hit, range(total)))
+        return total / (time.perf_counter() - start)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=400)
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--path', action='append', help="Chemin à interroger (répétable)")
+    args = parser.parse_args()
+    
+    # Les fichiers statiques sont servis relativement au répertoire du projet
+    os.chdir(ROOT)
+    paths = args.path or DEFAULT_PATHS
+    
+    single = measure(1, paths, args.requests, args.clients)
+    pooled = measure(args.workers, paths, args.requests, args.clients)
+    print(f"{'Mono-thread':<22}: {single:8.1f} req/s")
+    print(f"{f'Pool de {args.workers} threads':<22}: {pooled:8.1f} req/s  (x{pooled / single:.2f})")
+
+if __name__ == '__main__':
+    main()
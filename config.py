@@ -6,4 +6,86 @@ class Config:
     DB_USER = 'postgres'
     DB_PASSWORD = '5751'
     
-    DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
\ No newline at end of file
+    DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+    
+    # Stockage du graphe : 'postgres', 'sqlite' (fichier SQLITE_PATH) ou 'memory'
+    STORAGE_BACKEND = 'postgres'
+    SQLITE_PATH = 'wastegraph.db'
+    
+    # Fichier binaire du graphe, projeté en mémoire au démarrage s'il
+    # correspond encore à la base (None = désactivé)
+    SNAPSHOT_PATH = 'wastegraph.snapshot'
+    
+    # Pool de connexions PostgreSQL (bornes min/max)
+    DB_POOL_MIN = 1
+    DB_POOL_MAX = 10
+    # Lignes rapatriées par aller-retour pour les curseurs côté serveur
+    DB_STREAM_ITERSIZE = 2000
+    # Délai minimal (secondes) entre deux contrôles des écritures d'autres
+    # processus avant de répondre à une requête conditionnelle (0 = à chaque fois)
+    STORAGE_CHECK_TTL = 1.0
+    
+    # Nombre de threads traitant les requêtes HTTP (1 = serveur mono-thread)
+    SERVER_WORKERS = 8
+    # Connexions acceptées en attente d'un thread libre ; au-delà, réponse 503
+    SERVER_BACKLOG = 64
+    
+    # Instrumentation (/metrics) et journal des requêtes lentes (ms, 0 = désactivé)
+    METRICS_ENABLED = True
+    SLOW_REQUEST_MS = 1000
+    SLOW_QUERY_MS = 200
+    
+    # Compression gzip des réponses JSON au-delà de cette taille (octets)
+    GZIP_MIN_SIZE = 1024
+    GZIP_LEVEL = 6
+    
+    # Fichiers statiques : cache navigateur (secondes), rechargement des
+    # fichiers modifiés sur disque (dev) et taille à partir de laquelle
+    # ils sont envoyés par sendfile au lieu d'être gardés en mémoire
+    STATIC_MAX_AGE = 300
+    STATIC_RELOAD = True
+    STATIC_SENDFILE_MIN = 256 * 1024
+    
+    # Nombre d'arbres de plus courts chemins gardés en cache (0 = désactivé)
+    SPT_CACHE_SIZE = 32
+    
+    # Profils horaires des arêtes (/algo/dijkstra?depart_at=HH:MM) : créneaux
+    # par jour (96 = quarts d'heure) et minutes de trajet par unité de poids
+    # total, pour avancer l'horloge le long du chemin
+    PROFILE_SLOTS = 96
+    WEIGHT_MINUTES = 1.0
+    
+    # Composantes connexes : au-delà de COMPONENT_PARALLEL_MIN nœuds, le
+    # coloriage est calculé par lots de composantes dans COMPONENT_WORKERS
+    # processus
+    COMPONENT_WORKERS = 4
+    COMPONENT_PARALLEL_MIN = 50000
+    
+    # Hiérarchie de contraction (prétraitement optionnel des requêtes de routage)
+    CH_ENABLED = False
+    CH_WITNESS_LIMIT = 50
+    
+    # Tournées de collecte (/algo/routes)
+    VEHICLE_CAPACITY = 100
+    ROUTES_WORKERS = 4
+    ROUTES_TIME_BUDGET = 2.0
+    ROUTES_MAX_TIME_BUDGET = 30.0
+    
+    # Jobs en arrière-plan (?async=1, /jobs/<id>) : processus de calcul et
+    # durée de conservation des résultats (secondes)
+    JOBS_WORKERS = 2
+    JOBS_TTL = 600
+    
+    # Index spatial (/graph/nearest) : nombre maximal de voisins renvoyés
+    SPATIAL_MAX_K = 1000
+    
+    # Journal des modifications (/graph/changes) : deltas conservés, puis
+    # flux SSE (clients simultanés, battement de cœur et durée d'une
+    # connexion en secondes ; le navigateur se reconnecte ensuite)
+    CHANGE_LOG_SIZE = 10000
+    SSE_MAX_CLIENTS = 4
+    SSE_HEARTBEAT = 15
+    SSE_MAX_DURATION = 300
+    
+    # Import massif (/graph/bulk, import_graph.py) : lignes par COPY
+    BULK_BATCH_SIZE = 5000
\ No newline at end of file
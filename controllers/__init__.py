@@ -4,5 +4,6 @@ Contient les routeurs et gestionnaires de requêtes
 """
 
 from .router import Router
+from .static_assets import StaticAssets
 
-__all__ = ['Router']
\ No newline at end of file
+__all__ = ['Router', 'StaticAssets']
\ No newline at end of file
@@ -1,21 +1,246 @@
+import gzip
+import io
+import itertools
 import json
+import math
 import os
+import time
+import zlib
+from email.utils import parsedate_to_datetime
 from http.server import BaseHTTPRequestHandler
 from urllib.parse import urlparse, parse_qs
+from config import Config
+from controllers.static_assets import StaticAssets
+from metrics import Metrics
 from models.graph_data import GraphData
 from models.dijkstra import Dijkstra
 from models.coloring import Coloring
-from views.json_view import JSONView
+from models.routing import RouteOptimizer
+from models.bulk_import import BulkImporter
+from models.change_log import ChangeLog
+from models.jobs import JobManager
+from models.graph_snapshot import GraphSnapshot
+from models.spatial_index import SpatialIndex
+from models.time_profiles import parse_time
+from storage import IntegrityError
+from views.json_view import JSONView, ColumnarView
+
+# Type de contenu -> format d'import, quand ?format= est absent
+BULK_CONTENT_TYPES = {
+    'text/csv': 'csv',
+    'application/x-ndjson': 'ndjson',
+    'application/geo+json': 'geojson'
+}
+
+# Formats de réponse -> type de contenu, le premier étant celui par défaut
+RESPONSE_TYPES = {
+    'json': 'application/json',
+    'ndjson': 'application/x-ndjson',
+    'columnar': ColumnarView.JSON_TYPE,
+    'binary': ColumnarView.BINARY_TYPE
+}
+
+class _RequestBody(io.RawIOBase):
+    """Corps de requête borné par Content-Length, lisible en flux"""
+    
+    def __init__(self, rfile, length):
+        self.rfile = rfile
+        self.remaining = length
+    
+    def readable(self):
+        return True
+    
+    def readinto(self, buffer):
+        if self.remaining <= 0:
+            return 0
+        data = self.rfile.read(min(len(buffer), self.remaining))
+        self.remaining -= len(data)
+        buffer[:len(data)] = data
+        return len(data)
+
+class _ChunkedWriter:
+    """Regroupe les petites écritures en blocs avant de les envoyer au client"""
+    
+    def __init__(self, wfile, size=65536, compress=False):
+        self.wfile = wfile
+        self.size = size
+        self.parts = []
+        self.pending = 0
+        # wbits=31 : flux deflate avec en-tête et somme de contrôle gzip
+        self.compressor = zlib.compressobj(Config.GZIP_LEVEL, zlib.DEFLATED, 31) if compress else None
+    
+    def write(self, text):
+        self.parts.append(text)
+        self.pending += len(text)
+        if self.pending >= self.size:
+            self.flush()
+    
+    def flush(self):
+        if self.parts:
+            data = ''.join(self.parts).encode()
+            if self.compressor:
+                data = self.compressor.compress(data)
+            self.wfile.write(data)
+            self.parts, self.pending = [], 0
+    
+    def close(self):
+        self.flush()
+        if self.compressor:
+            self.wfile.write(self.compressor.flush())
+
+def accepts_gzip(accept_encoding):
+    """Vrai si l'en-tête Accept-Encoding autorise gzip (q > 0)"""
+    for part in (accept_encoding or '').split(','):
+        coding, _, params = part.partition(';')
+        if coding.strip().lower() not in ('gzip', '*'):
+            continue
+        quality = 1.0
+        for param in params.split(';'):
+            name, _, value = param.partition('=')
+            if name.strip() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        return quality > 0
+    return False
+
+def negotiate(accept, formats):
+    """Format de formats dont le type est préféré par l'en-tête Accept.
+
+    Seuls les types cités explicitement comptent (q le plus haut, puis
+    l'ordre de formats) ; sans en-tête, avec */* seul ou sans type connu,
+    le premier format.
+    """
+    best, best_quality = formats[0], 0.0
+    for part in (accept or '').split(','):
+        media_type, _, params = part.partition(';')
+        media_type = media_type.strip().lower()
+        quality = 1.0
+        for param in params.split(';'):
+            name, _, value = param.partition('=')
+            if name.strip() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        for fmt in formats:
+            if RESPONSE_TYPES[fmt] == media_type and (quality > best_quality or (
+                    quality == best_quality and formats.index(fmt) < formats.index(best))):
+                best, best_quality = fmt, quality
+    return best
+
+def etag_matches(if_none_match, etag):
+    """Comparaison faible (RFC 9110) entre If-None-Match et l'ETag courant"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    opaque = etag.removeprefix('W/')
+    return any(candidate.strip().removeprefix('W/') == opaque for candidate in if_none_match.split(','))
+
+class _CountingWriter:
+    """Enveloppe de wfile qui compte les octets envoyés au client"""
+    
+    def __init__(self, raw):
+        self.raw = raw
+        self.bytes = 0
+    
+    def write(self, data):
+        self.bytes += len(data)
+        return self.raw.write(data)
+    
+    def __getattr__(self, name):
+        return getattr(self.raw, name)
 
 class Router(BaseHTTPRequestHandler):
-    def _set_headers(self, status_code=200, content_type='application/json'):
+    def setup(self):
+        super().setup()
+        self.wfile = _CountingWriter(self.wfile)
+    
+    def handle_one_request(self):
+        # Une connexion peut servir plusieurs requêtes : mesure par requête
+        self._status = None
+        self._stream = False
+        self.wfile.bytes = 0
+        start = time.perf_counter()
+        super().handle_one_request()
+        if self._status is not None:
+            Metrics().observe_request(
+                self.command or '-', self._endpoint_label(), self._status,
+                time.perf_counter() - start, self.wfile.bytes, self._stream
+            )
+    
+    def send_response(self, code, message=None):
+        self._status = code
+        super().send_response(code, message)
+    
+    def _endpoint_label(self):
+        # Étiquette bornée : chemin de la route, jamais l'URL brute
+        path = urlparse(getattr(self, 'path', '')).path
+        if path.startswith('/static/'):
+            return '/static/'
+        if path.startswith('/jobs/'):
+            return '/jobs/'
+        if self._status == 404 or not path.startswith('/'):
+            return 'unmatched'
+        return path
+    
+    def _set_headers(self, status_code=200, content_type='application/json', headers=None):
         self.send_response(status_code)
         self.send_header('Content-type', content_type)
         self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, PUT, DELETE, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.send_header('Access-Control-Allow-Methods', 'GET, POST, PUT, PATCH, DELETE, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers', 'Accept, Content-Type, If-None-Match, Last-Event-ID, Prefer')
+        self.send_header('Access-Control-Expose-Headers', 'ETag, Location')
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
         self.end_headers()
     
+    def _send_json(self, payload, status_code=200, etag=None, content_type='application/json', vary='Accept-Encoding'):
+        """Écrire une réponse JSON, compressée en gzip si elle est assez grosse"""
+        self._send_body(json.dumps(payload).encode(), status_code, etag, content_type, vary)
+    
+    def _send_body(self, body, status_code=200, etag=None, content_type='application/json', vary='Accept-Encoding'):
+        headers = self._cache_headers(etag, vary)
+        if len(body) >= Config.GZIP_MIN_SIZE and accepts_gzip(self.headers.get('Accept-Encoding')):
+            body = gzip.compress(body, Config.GZIP_LEVEL, mtime=0)
+            headers['Content-Encoding'] = 'gzip'
+        headers['Content-Length'] = str(len(body))
+        self._set_headers(status_code, content_type, headers)
+        self.wfile.write(body)
+    
+    def _send_columns(self, fmt, tables, meta=None, etag=None):
+        """Réponse en colonnes, JSON ou binaire selon fmt"""
+        if fmt == 'binary':
+            self._send_body(ColumnarView.binary(tables, meta), etag=etag,
+                            content_type=ColumnarView.BINARY_TYPE, vary='Accept, Accept-Encoding')
+        else:
+            self._send_json(ColumnarView.json(tables, meta), etag=etag,
+                            content_type=ColumnarView.JSON_TYPE, vary='Accept, Accept-Encoding')
+    
+    def _cache_headers(self, etag, vary='Accept-Encoding'):
+        headers = {'Vary': vary}
+        if etag:
+            # no-cache : le navigateur garde la réponse mais la revalide à chaque fois
+            headers['ETag'] = etag
+            headers['Cache-Control'] = 'no-cache'
+        return headers
+    
+    def _check_not_modified(self, vary='Accept-Encoding'):
+        """ETag de la version du graphe ; None si un 304 a déjà été envoyé"""
+        # Une écriture d'un autre processus recharge le snapshot et change l'ETag
+        snapshot = GraphSnapshot()
+        snapshot.check_storage()
+        etag = f'W/"{snapshot.version_tag()}"'
+        if etag_matches(self.headers.get('If-None-Match'), etag):
+            self.send_response(304)
+            for name, value in self._cache_headers(etag, vary).items():
+                self.send_header(name, value)
+            self.end_headers()
+            return None
+        return etag
+    
     def do_OPTIONS(self):
         self._set_headers(200)
     
@@ -31,13 +256,29 @@ class Router(BaseHTTPRequestHandler):
             elif path == '/' or path == '/index.html':
                 self._serve_index()
             elif path == '/graph':
-                self._handle_get_graph()
+                self._handle_get_graph(query_params)
+            elif path == '/graph/changes':
+                self._handle_changes(query_params)
+            elif path == '/graph/nearest':
+                self._handle_nearest(query_params)
+            elif path == '/graph/within':
+                self._handle_within(query_params)
+            elif path == '/graph/edge/profile':
+                self._handle_get_profile(query_params)
             elif path == '/algo/dijkstra':
                 self._handle_dijkstra(query_params)
+            elif path == '/algo/dijkstra/matrix':
+                self._handle_dijkstra_matrix(query_params)
             elif path == '/algo/coloring':
-                self._handle_coloring()
+                self._handle_coloring(query_params)
+            elif path == '/algo/routes':
+                self._handle_routes(query_params)
+            elif path.startswith('/jobs/'):
+                self._handle_job(path[len('/jobs/'):])
             elif path == '/stats':
                 self._handle_stats()
+            elif path == '/metrics':
+                self._handle_metrics()
             else:
                 self._set_headers(404)
                 self.wfile.write(json.dumps(JSONView.error("Endpoint not found", 404)).encode())
@@ -51,6 +292,11 @@ class Router(BaseHTTPRequestHandler):
         path = parsed_path.path
         
         try:
+            # L'import massif lit le corps en flux, il ne doit pas être chargé ici
+            if path == '/graph/bulk':
+                self._handle_bulk_import(parse_qs(parsed_path.query))
+                return
+            
             content_length = int(self.headers['Content-Length'])
             post_data = self.rfile.read(content_length)
             data = json.loads(post_data.decode()) if content_length > 0 else {}
@@ -80,6 +326,27 @@ class Router(BaseHTTPRequestHandler):
                 self._handle_update_node(data)
             elif path == '/graph/edge':
                 self._handle_update_edge(data)
+            elif path == '/graph/edge/profile':
+                self._handle_set_profile(data)
+            else:
+                self._set_headers(404)
+                self.wfile.write(json.dumps(JSONView.error("Endpoint not found", 404)).encode())
+        
+        except Exception as e:
+            self._set_headers(500)
+            self.wfile.write(json.dumps(JSONView.error(str(e), 500)).encode())
+    
+    def do_PATCH(self):
+        parsed_path = urlparse(self.path)
+        path = parsed_path.path
+        
+        try:
+            content_length = int(self.headers['Content-Length'])
+            patch_data = self.rfile.read(content_length)
+            data = json.loads(patch_data.decode()) if content_length > 0 else []
+            
+            if path == '/graph/edges':
+                self._handle_update_edges(data)
             else:
                 self._set_headers(404)
                 self.wfile.write(json.dumps(JSONView.error("Endpoint not found", 404)).encode())
@@ -98,6 +365,8 @@ class Router(BaseHTTPRequestHandler):
                 self._handle_delete_node(query_params)
             elif path == '/graph/edge':
                 self._handle_delete_edge(query_params)
+            elif path == '/graph/edge/profile':
+                self._handle_delete_profile(query_params)
             else:
                 self._set_headers(404)
                 self.wfile.write(json.dumps(JSONView.error("Endpoint not found", 404)).encode())
@@ -109,86 +378,434 @@ class Router(BaseHTTPRequestHandler):
     # Handlers pour les fichiers statiques
     def _serve_index(self):
         """Servir la page index.html"""
-        try:
-            with open('static/index.html', 'rb') as f:
-                content = f.read()
-            
-            self.send_response(200)
-            self.send_header('Content-type', 'text/html; charset=utf-8')
-            self.end_headers()
-            self.wfile.write(content)
-        except FileNotFoundError:
-            self._set_headers(404)
-            self.wfile.write(b'Index file not found')
+        self._serve_asset('index.html', b'Index file not found')
     
     def _serve_static_file(self, path):
         """Servir les fichiers statiques (CSS, JS)"""
+        # Enlever le préfixe /static/
+        self._serve_asset(path[8:], b'Static file not found')
+    
+    def _serve_asset(self, relative_path, not_found):
         try:
-            # Enlever le préfixe /static/
-            file_path = path[8:]
+            asset = StaticAssets().get(relative_path)
+            if asset is None:
+                self._set_headers(404)
+                self.wfile.write(not_found)
+                return
+            
+            use_gzip = asset.gzipped is not None and accepts_gzip(self.headers.get('Accept-Encoding'))
+            etag = asset.gzip_etag if use_gzip else asset.etag
+            headers = {
+                'ETag': etag,
+                'Last-Modified': asset.last_modified,
+                'Cache-Control': f'public, max-age={Config.STATIC_MAX_AGE}',
+                'Vary': 'Accept-Encoding'
+            }
             
-            # Déterminer le type MIME
-            if path.endswith('.css'):
-                mime_type = 'text/css'
-            elif path.endswith('.js'):
-                mime_type = 'application/javascript'
-            elif path.endswith('.png'):
-                mime_type = 'image/png'
-            elif path.endswith('.jpg') or path.endswith('.jpeg'):
-                mime_type = 'image/jpeg'
-            elif path.endswith('.svg'):
-                mime_type = 'image/svg+xml'
+            # If-None-Match prime sur If-Modified-Since (RFC 9110)
+            if_none_match = self.headers.get('If-None-Match')
+            if if_none_match:
+                not_modified = etag_matches(if_none_match, etag)
             else:
-                mime_type = 'text/plain'
+                not_modified = self._not_modified_since(asset)
+            if not_modified:
+                self.send_response(304)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                return
             
-            with open(f'static/{file_path}', 'rb') as f:
-                content = f.read()
+            body = asset.gzipped if use_gzip else asset.content
+            if use_gzip:
+                headers['Content-Encoding'] = 'gzip'
+            headers['Content-Length'] = str(len(body) if body is not None else asset.size)
             
             self.send_response(200)
-            self.send_header('Content-type', mime_type)
-            self.send_header('Content-Length', str(len(content)))
+            self.send_header('Content-type', asset.mime_type)
+            for name, value in headers.items():
+                self.send_header(name, value)
             self.end_headers()
-            self.wfile.write(content)
             
-        except FileNotFoundError:
-            self._set_headers(404)
-            self.wfile.write(b'Static file not found')
+            if body is not None:
+                self.wfile.write(body)
+            else:
+                # Gros fichier : copie noyau fichier -> socket, sans passer par Python
+                with open(asset.path, 'rb') as f:
+                    self.wfile.bytes += self.connection.sendfile(f)
+        
         except Exception as e:
             self._set_headers(500)
             self.wfile.write(f'Error serving static file: {str(e)}'.encode())
     
+    def _not_modified_since(self, asset):
+        value = self.headers.get('If-Modified-Since')
+        if not value:
+            return False
+        try:
+            since = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return False
+        return since is not None and int(asset.mtime_ns // 1_000_000_000) <= since.timestamp()
+    
     # Handlers pour les API
-    def _handle_get_graph(self):
-        graph_data = GraphData()
-        result = graph_data.get_graph()
-        self._set_headers(200)
-        self.wfile.write(json.dumps(JSONView.success(result)).encode())
+    def _handle_get_graph(self, query_params):
+        # ?bbox=min_x,min_y,max_x,max_y&limit=N&cursor=...&format=json|ndjson|columnar|binary,
+        # le format pouvant aussi venir de l'en-tête Accept
+        fmt = query_params.get('format', [None])[0] or negotiate(self.headers.get('Accept'), list(RESPONSE_TYPES))
+        cursor = query_params.get('cursor', [None])[0]
+        try:
+            bbox = None
+            if 'bbox' in query_params:
+                bbox = [float(value) for value in query_params['bbox'][0].split(',')]
+                if len(bbox) != 4:
+                    raise ValueError("bbox must be min_x,min_y,max_x,max_y")
+            limit = int(query_params['limit'][0]) if 'limit' in query_params else None
+            if limit is not None and limit <= 0:
+                raise ValueError("limit must be a positive integer")
+            if fmt not in RESPONSE_TYPES:
+                raise ValueError(f"format must be one of: {', '.join(RESPONSE_TYPES)}")
+            if fmt in ('columnar', 'binary') and (limit is not None or cursor):
+                raise ValueError("columnar formats return the whole selection, use json or ndjson to page")
+            GraphData.parse_cursor(cursor)
+        except ValueError as e:
+            self._set_headers(400)
+            self.wfile.write(json.dumps(JSONView.error(f"Invalid graph query: {e}", 400)).encode())
+            return
+        
+        etag = self._check_not_modified('Accept, Accept-Encoding')
+        if etag is None:
+            return
+        
+        if fmt in ('columnar', 'binary'):
+            # Colonnes tirées du snapshot : les extrémités des arêtes sont des indices de nœuds
+            self._send_columns(fmt, GraphData().get_columns(bbox), etag=etag)
+            return
+        
+        # Taille inconnue à l'avance : gzip dès que le client l'accepte
+        compress = accepts_gzip(self.headers.get('Accept-Encoding'))
+        headers = self._cache_headers(etag, 'Accept, Accept-Encoding')
+        if compress:
+            headers['Content-Encoding'] = 'gzip'
+        
+        # Première ligne lue avant les en-têtes : une erreur de requête donne
+        # encore une réponse 500 complète (via do_GET)
+        rows = GraphData().iter_graph(bbox, cursor, limit)
+        first = next(rows, None)
+        stream = itertools.chain([first] if first is not None else [], rows)
+        out = _ChunkedWriter(self.wfile, compress=compress)
+        try:
+            if fmt == 'ndjson':
+                self._set_headers(200, 'application/x-ndjson', headers)
+                self._stream_graph_ndjson(out, stream, limit)
+            else:
+                self._set_headers(200, headers=headers)
+                self._stream_graph_json(out, stream, limit)
+        except Exception as e:
+            # En-têtes déjà partis : pas de seconde réponse, le corps tronqué
+            # et la fermeture de la connexion signalent l'échec au client
+            self.log_error("graph stream aborted: %s", e)
+            self.close_connection = True
+        finally:
+            rows.close()
+    
+    def _stream_graph_json(self, out, rows, limit):
+        """Même enveloppe que JSONView.success, écrite au fil des lignes"""
+        envelope = json.dumps(JSONView.success({}))
+        out.write(envelope[:-2] + '"nodes": [')
+        section, separator, count, last = 'node', '', 0, None
+        for kind, row in rows:
+            if kind != section:
+                out.write('], "edges": [')
+                section, separator = kind, ''
+            out.write(separator + json.dumps(row))
+            separator = ', '
+            count += 1
+            last = (kind, row)
+        if section == 'node':
+            out.write('], "edges": [')
+        out.write('], "next_cursor": ' + json.dumps(self._next_cursor(last, limit, count)) + '}}')
+        out.close()
+    
+    def _stream_graph_ndjson(self, out, rows, limit):
+        count, last = 0, None
+        for kind, row in rows:
+            out.write(json.dumps({'type': kind, **row}) + '\n')
+            count += 1
+            last = (kind, row)
+        out.write(json.dumps({'type': 'end', 'next_cursor': self._next_cursor(last, limit, count)}) + '\n')
+        out.close()
+    
+    @staticmethod
+    def _next_cursor(last, limit, count):
+        # Page pleine : il reste peut-être des éléments après le dernier envoyé
+        if limit is None or last is None or count < limit:
+            return None
+        return GraphData.page_cursor(*last)
+    
+    def _handle_changes(self, query_params):
+        # Flux SSE si le client le demande (EventSource), sinon un seul delta JSON
+        stream = 'text/event-stream' in (self.headers.get('Accept') or '')
+        log = ChangeLog()
+        # À la reconnexion, EventSource renvoie l'id du dernier événement reçu
+        tag = self.headers.get('Last-Event-ID') if stream else None
+        tag = tag or query_params.get('since', [None])[0]
+        try:
+            if tag is None:
+                if not stream:
+                    raise ValueError("since is required")
+                version = log.version
+            else:
+                version = log.parse_tag(tag)
+        except ValueError as e:
+            self._set_headers(400)
+            self.wfile.write(json.dumps(JSONView.error(f"Invalid changes query: {e}", 400)).encode())
+            return
+        
+        if stream:
+            self._stream_changes(log, version)
+        else:
+            self._send_json(JSONView.success(self._changes_payload(log, log.changes_since(version))))
+    
+    @staticmethod
+    def _changes_payload(log, result):
+        # reset : version inconnue ou trop ancienne, le client recharge /graph
+        if result is None:
+            return {'version': log.tag(log.version), 'reset': True, 'changes': []}
+        version, changes = result
+        return {'version': log.tag(version), 'reset': False, 'changes': changes}
+    
+    def _stream_changes(self, log, version):
+        slots = getattr(self.server, 'stream_slots', None)
+        if slots is None or not slots.acquire(blocking=False):
+            # Serveur mono-thread ou trop de flux ouverts : le client interroge
+            # /graph/changes à intervalles réguliers
+            self._set_headers(503, headers={'Retry-After': str(Config.SSE_HEARTBEAT)})
+            self.wfile.write(json.dumps(JSONView.error("Too many change streams, poll /graph/changes", 503)).encode())
+            return
+        
+        self._stream = True
+        try:
+            self._set_headers(200, 'text/event-stream', {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+            self.wfile.write(b'retry: 3000\n\n')
+            self.wfile.flush()
+            deadline = time.monotonic() + Config.SSE_MAX_DURATION
+            while time.monotonic() < deadline:
+                result = log.wait(version, Config.SSE_HEARTBEAT)
+                payload = self._changes_payload(log, result)
+                if result is None:
+                    # Pas d'id : une reconnexion ne doit pas reprendre de cette version
+                    self.wfile.write(f"event: reset\ndata: {json.dumps(payload)}\n\n".encode())
+                    self.wfile.flush()
+                    break
+                if payload['changes']:
+                    version = result[0]
+                    self.wfile.write(f"id: {payload['version']}\nevent: changes\ndata: {json.dumps(payload)}\n\n".encode())
+                else:
+                    self.wfile.write(b': keep-alive\n\n')
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            # Le navigateur a fermé l'onglet ou la connexion
+            self.close_connection = True
+        finally:
+            slots.release()
+    
+    def _handle_nearest(self, query_params):
+        try:
+            x, y = self._coordinates(query_params)
+            k = int(query_params.get('k', ['1'])[0])
+            if not 1 <= k <= Config.SPATIAL_MAX_K:
+                raise ValueError(f"k must be between 1 and {Config.SPATIAL_MAX_K}")
+        except (KeyError, ValueError) as e:
+            self._set_headers(400)
+            self.wfile.write(json.dumps(JSONView.error(f"Invalid nearest query: {e}", 400)).encode())
+            return
+        
+        etag = self._check_not_modified()
+        if etag is None:
+            return
+        
+        result = SpatialIndex().nearest(x, y, k)
+        self._send_json(JSONView.success(result), etag=etag)
+    
+    def _handle_within(self, query_params):
+        try:
+            x, y = self._coordinates(query_params)
+            radius = float(query_params['r'][0])
+            if not 0 <= radius < float('inf'):
+                raise ValueError("r must be a finite, non-negative number")
+        except (KeyError, ValueError) as e:
+            self._set_headers(400)
+            self.wfile.write(json.dumps(JSONView.error(f"Invalid within query: {e}", 400)).encode())
+            return
+        
+        etag = self._check_not_modified()
+        if etag is None:
+            return
+        
+        result = SpatialIndex().within(x, y, radius)
+        self._send_json(JSONView.success(result), etag=etag)
+    
+    @staticmethod
+    def _coordinates(query_params):
+        x, y = float(query_params['x'][0]), float(query_params['y'][0])
+        if not (math.isfinite(x) and math.isfinite(y)):
+            raise ValueError("x and y must be finite numbers")
+        return x, y
     
     def _handle_dijkstra(self, query_params):
         src = query_params.get('src', [None])[0]
         dst = query_params.get('dst', [None])[0]
+        algo = query_params.get('algo', ['dijkstra'])[0]
+        depart_at = query_params.get('depart_at', [None])[0]
         
         if not src or not dst:
             self._set_headers(400)
             self.wfile.write(json.dumps(JSONView.error("Missing src or dst parameters", 400)).encode())
             return
         
+        if algo not in Dijkstra.ALGORITHMS:
+            self._set_headers(400)
+            message = f"Unknown algo '{algo}', expected one of: {', '.join(Dijkstra.ALGORITHMS)}"
+            self.wfile.write(json.dumps(JSONView.error(message, 400)).encode())
+            return
+        
+        if depart_at is not None:
+            try:
+                depart_at = parse_time(depart_at)
+                if algo != 'dijkstra':
+                    raise ValueError("depart_at is only supported with algo=dijkstra")
+            except ValueError as e:
+                self._set_headers(400)
+                self.wfile.write(json.dumps(JSONView.error(str(e), 400)).encode())
+                return
+        
+        etag = self._check_not_modified()
+        if etag is None:
+            return
+        
         dijkstra = Dijkstra()
-        result = dijkstra.get_shortest_path(src, dst)
-        self._set_headers(200)
-        self.wfile.write(json.dumps(JSONView.success(result)).encode())
+        result = dijkstra.get_shortest_path(src, dst, algo, depart_at)
+        self._send_json(JSONView.success(result), etag=etag)
     
-    def _handle_coloring(self):
+    def _handle_dijkstra_matrix(self, query_params):
+        # Accepte sources=A,B,C ou sources=A&sources=B ; targets vaut sources par défaut
+        sources = [node for value in query_params.get('sources', []) for node in value.split(',') if node]
+        targets = [node for value in query_params.get('targets', []) for node in value.split(',') if node]
+        
+        if not sources:
+            self._set_headers(400)
+            self.wfile.write(json.dumps(JSONView.error("Missing sources parameter", 400)).encode())
+            return
+        
+        if self._wants_job(query_params):
+            self._submit_job('matrix', {'sources': sources, 'targets': targets or sources})
+            return
+        
+        dijkstra = Dijkstra()
+        result = dijkstra.distance_matrix(sources, targets or sources)
+        self._send_json(JSONView.success(result))
+    
+    def _handle_coloring(self, query_params):
+        strategy = query_params.get('strategy', ['welsh_powell'])[0]
+        formats = ['json', 'columnar', 'binary']
+        fmt = query_params.get('format', [None])[0] or negotiate(self.headers.get('Accept'), formats)
+        
+        if strategy not in Coloring.STRATEGIES:
+            self._set_headers(400)
+            message = f"Unknown strategy '{strategy}', expected one of: {', '.join(Coloring.STRATEGIES)}"
+            self.wfile.write(json.dumps(JSONView.error(message, 400)).encode())
+            return
+        
+        if fmt not in formats:
+            self._set_headers(400)
+            self.wfile.write(json.dumps(JSONView.error(f"format must be one of: {', '.join(formats)}", 400)).encode())
+            return
+        
+        if self._wants_job(query_params):
+            self._submit_job('coloring', {'strategy': strategy})
+            return
+        
+        etag = self._check_not_modified('Accept, Accept-Encoding')
+        if etag is None:
+            return
+        
         coloring = Coloring()
-        result = coloring.color_graph()
-        self._set_headers(200)
-        self.wfile.write(json.dumps(JSONView.success(result)).encode())
+        if fmt == 'json':
+            result = coloring.color_graph(strategy)
+            self._send_json(JSONView.success(result), etag=etag, vary='Accept, Accept-Encoding')
+        else:
+            self._send_columns(fmt, coloring.color_columns(strategy), {'days': Coloring.DAYS}, etag)
+    
+    def _handle_routes(self, query_params):
+        day = query_params.get('day', [None])[0]
+        depot = query_params.get('depot', [None])[0]
+        strategy = query_params.get('strategy', ['welsh_powell'])[0]
+        
+        if not day or not depot:
+            self._set_headers(400)
+            self.wfile.write(json.dumps(JSONView.error("Missing day or depot parameters", 400)).encode())
+            return
+        
+        if day not in Coloring.DAYS or strategy not in Coloring.STRATEGIES:
+            self._set_headers(400)
+            self.wfile.write(json.dumps(JSONView.error("Invalid day or strategy parameter", 400)).encode())
+            return
+        
+        try:
+            capacity = float(query_params['capacity'][0]) if 'capacity' in query_params else None
+            time_budget = float(query_params['time_budget'][0]) if 'time_budget' in query_params else None
+        except ValueError:
+            self._set_headers(400)
+            self.wfile.write(json.dumps(JSONView.error("capacity and time_budget must be numbers", 400)).encode())
+            return
+        
+        if self._wants_job(query_params):
+            self._submit_job('routes', {
+                'day': day,
+                'depot': depot,
+                'vehicle_capacity': capacity,
+                'time_budget': time_budget,
+                'strategy': strategy
+            })
+            return
+        
+        optimizer = RouteOptimizer()
+        result = optimizer.plan_routes(day, depot, capacity, time_budget, strategy)
+        self._send_json(JSONView.success(result))
+    
+    def _wants_job(self, query_params):
+        # ?async=1 ou en-tête Prefer: respond-async (RFC 7240)
+        if query_params.get('async', ['0'])[0].lower() in ('1', 'true'):
+            return True
+        return 'respond-async' in (self.headers.get('Prefer') or '')
+    
+    def _submit_job(self, kind, params):
+        job, created = JobManager().submit(kind, params)
+        message = "Job submitted" if created else "Identical job already submitted for this graph version"
+        self._set_headers(202, headers={'Location': f'/jobs/{job.id}'})
+        self.wfile.write(json.dumps(JSONView.success(job.describe(), message)).encode())
+    
+    def _handle_job(self, job_id):
+        job = JobManager().get(job_id)
+        if job is None:
+            self._set_headers(404)
+            self.wfile.write(json.dumps(JSONView.error(f"Job {job_id} not found", 404)).encode())
+            return
+        self._send_json(JSONView.success(job.describe()))
     
     def _handle_stats(self):
+        etag = self._check_not_modified()
+        if etag is None:
+            return
+        
         graph_data = GraphData()
         result = graph_data.get_stats()
-        self._set_headers(200)
-        self.wfile.write(json.dumps(JSONView.success(result)).encode())
+        self._send_json(JSONView.success(result), etag=etag)
+    
+    def _handle_metrics(self):
+        body = Metrics().render().encode()
+        self._set_headers(200, 'text/plain; version=0.0.4; charset=utf-8', {'Content-Length': str(len(body))})
+        self.wfile.write(body)
     
     def _handle_add_node(self, data):
         required_fields = ['id', 'x', 'y']
@@ -214,6 +831,47 @@ class Router(BaseHTTPRequestHandler):
         self._set_headers(201)
         self.wfile.write(json.dumps(JSONView.success(None, "Edge added successfully")).encode())
     
+    def _handle_bulk_import(self, query_params):
+        content_type = (self.headers.get('Content-Type') or '').split(';')[0].strip()
+        fmt = query_params.get('format', [BULK_CONTENT_TYPES.get(content_type)])[0]
+        
+        if fmt not in BulkImporter.FORMATS:
+            self._set_headers(400)
+            message = f"Unknown import format, expected one of: {', '.join(BulkImporter.FORMATS)}"
+            self.wfile.write(json.dumps(JSONView.error(message, 400)).encode())
+            return
+        
+        if 'Content-Length' not in self.headers:
+            self._set_headers(411)
+            self.wfile.write(json.dumps(JSONView.error("Content-Length required", 411)).encode())
+            return
+        
+        try:
+            batch_size = int(query_params['batch_size'][0]) if 'batch_size' in query_params else None
+        except ValueError:
+            self._set_headers(400)
+            self.wfile.write(json.dumps(JSONView.error("batch_size must be an integer", 400)).encode())
+            return
+        
+        body = _RequestBody(self.rfile, int(self.headers['Content-Length']))
+        stream = io.TextIOWrapper(io.BufferedReader(body), encoding='utf-8', newline='')
+        
+        # Réponse NDJSON : une ligne par lot copié, puis une ligne finale
+        self._set_headers(200, 'application/x-ndjson')
+        
+        def progress(totals):
+            self.wfile.write(json.dumps({'status': 'progress', **totals}).encode() + b'\n')
+            self.wfile.flush()
+        
+        try:
+            totals = BulkImporter(batch_size).import_stream(stream, fmt, progress)
+            line = JSONView.success(totals, "Bulk import committed")
+        except (ValueError, IntegrityError) as e:
+            line = JSONView.error(f"Bulk import rolled back: {e}", 400)
+        except Exception as e:
+            line = JSONView.error(f"Bulk import rolled back: {e}", 500)
+        self.wfile.write(json.dumps(line).encode() + b'\n')
+    
     def _handle_update_node(self, data):
         if 'id' not in data:
             self._set_headers(400)
@@ -247,6 +905,96 @@ class Router(BaseHTTPRequestHandler):
         self._set_headers(200)
         self.wfile.write(json.dumps(JSONView.success(None, "Edge updated successfully")).encode())
     
+    def _handle_update_edges(self, data):
+        # Tableau de {u, v, weight?, constraint_value?}, ou {"updates": [...]}
+        updates = data.get('updates') if isinstance(data, dict) else data
+        try:
+            if not isinstance(updates, list):
+                raise ValueError("expected an array of edge updates")
+            for number, update in enumerate(updates):
+                if not isinstance(update, dict) or not update.get('u') or not update.get('v'):
+                    raise ValueError(f"update #{number} needs u and v")
+                values = [update.get(field) for field in ('weight', 'constraint_value')]
+                if all(value is None for value in values):
+                    raise ValueError(f"update #{number} needs weight or constraint_value")
+                for value in values:
+                    if value is not None and (isinstance(value, bool) or not math.isfinite(float(value))):
+                        raise ValueError(f"update #{number} has a non-finite value")
+        except (TypeError, ValueError) as e:
+            self._set_headers(400)
+            self.wfile.write(json.dumps(JSONView.error(f"Invalid edge updates: {e}", 400)).encode())
+            return
+        
+        graph_data = GraphData()
+        updated = set(graph_data.update_edges(updates))
+        missing = list(dict.fromkeys(
+            (update['u'], update['v']) for update in updates if (update['u'], update['v']) not in updated
+        ))
+        result = {
+            'updated': len(updated),
+            'missing': [{'u': u, 'v': v} for u, v in missing],
+            'version': GraphSnapshot().version_tag()
+        }
+        self._send_json(JSONView.success(result, f"{len(updated)} edges updated"))
+    
+    def _handle_get_profile(self, query_params):
+        u = query_params.get('u', [None])[0]
+        v = query_params.get('v', [None])[0]
+        
+        if not u or not v:
+            self._set_headers(400)
+            self.wfile.write(json.dumps(JSONView.error("Missing u or v parameters", 400)).encode())
+            return
+        
+        if (u, v) not in GraphSnapshot().ensure_loaded().edges:
+            self._set_headers(404)
+            self.wfile.write(json.dumps(JSONView.error(f"Edge {u}-{v} not found", 404)).encode())
+            return
+        
+        factors = GraphData().get_profile(u, v)
+        self._send_json(JSONView.success({'u': u, 'v': v, 'slots': Config.PROFILE_SLOTS, 'factors': factors}))
+    
+    def _handle_set_profile(self, data):
+        # {u, v, factors: [un facteur du poids total par créneau]}
+        try:
+            if not data.get('u') or not data.get('v'):
+                raise ValueError("missing required fields: u, v")
+            factors = data.get('factors')
+            if not isinstance(factors, list) or len(factors) != Config.PROFILE_SLOTS:
+                raise ValueError(f"factors must be an array of {Config.PROFILE_SLOTS} numbers")
+            for factor in factors:
+                if isinstance(factor, bool) or not math.isfinite(float(factor)) or float(factor) <= 0:
+                    raise ValueError("factors must be finite positive numbers")
+        except (TypeError, ValueError) as e:
+            self._set_headers(400)
+            self.wfile.write(json.dumps(JSONView.error(f"Invalid profile: {e}", 400)).encode())
+            return
+        
+        u, v = data['u'], data['v']
+        if (u, v) not in GraphSnapshot().ensure_loaded().edges:
+            self._set_headers(404)
+            self.wfile.write(json.dumps(JSONView.error(f"Edge {u}-{v} not found", 404)).encode())
+            return
+        
+        graph_data = GraphData()
+        result = graph_data.set_profile(u, v, [float(factor) for factor in factors])
+        self._set_headers(200)
+        self.wfile.write(json.dumps(JSONView.success(None, "Edge profile updated successfully")).encode())
+    
+    def _handle_delete_profile(self, query_params):
+        u = query_params.get('u', [None])[0]
+        v = query_params.get('v', [None])[0]
+        
+        if not u or not v:
+            self._set_headers(400)
+            self.wfile.write(json.dumps(JSONView.error("Missing u or v parameters", 400)).encode())
+            return
+        
+        graph_data = GraphData()
+        result = graph_data.set_profile(u, v, None)
+        self._set_headers(200)
+        self.wfile.write(json.dumps(JSONView.success(None, "Edge profile deleted successfully")).encode())
+    
     def _handle_delete_node(self, query_params):
         node_id = query_params.get('id', [None])[0]
         if not node_id:
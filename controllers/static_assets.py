@@ -0,0 +1,109 @@
+import gzip
+import mimetypes
+import os
+import threading
+from email.utils import formatdate
+from config import Config
+
+STATIC_ROOT = os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))), 'static')
+
+MIME_TYPES = {
+    '.html': 'text/html; charset=utf-8',
+    '.css': 'text/css; charset=utf-8',
+    '.js': 'application/javascript; charset=utf-8',
+    '.json': 'application/json',
+    '.png': 'image/png',
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.svg': 'image/svg+xml',
+    '.ico': 'image/x-icon'
+}
+
+# Formats déjà compressés : gzip n'y gagnerait rien
+COMPRESSIBLE = ('text/', 'application/javascript', 'application/json', 'image/svg+xml')
+
+class Asset:
+    """Fichier statique prêt à servir : contenu, version gzip et validateurs HTTP.
+
+    Au-delà de Config.STATIC_SENDFILE_MIN, le contenu n'est pas gardé en
+    mémoire (content vaut None) : le fichier est envoyé avec sendfile.
+    """
+
+    def __init__(self, path, stat):
+        self.path = path
+        self.mtime_ns = stat.st_mtime_ns
+        self.size = stat.st_size
+        extension = os.path.splitext(path)[1].lower()
+        self.mime_type = MIME_TYPES.get(extension) or mimetypes.guess_type(path)[0] or 'text/plain'
+        self.etag = f'"{self.size:x}-{self.mtime_ns:x}"'
+        self.last_modified = formatdate(stat.st_mtime, usegmt=True)
+        self.content = None
+        self.gzipped = None
+
+        if self.size < Config.STATIC_SENDFILE_MIN:
+            with open(path, 'rb') as f:
+                self.content = f.read()
+            if self.mime_type.startswith(COMPRESSIBLE):
+                compressed = gzip.compress(self.content, 9, mtime=0)
+                if len(compressed) < len(self.content):
+                    self.gzipped = compressed
+
+    @property
+    def gzip_etag(self):
+        # Représentation différente : validateur différent
+        return self.etag[:-1] + '-gz"'
+
+    def is_stale(self, stat):
+        return stat.st_mtime_ns != self.mtime_ns or stat.st_size != self.size
+
+class StaticAssets:
+    """Cache en mémoire des fichiers de static/, rechargés quand ils changent sur disque"""
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    instance = super(StaticAssets, cls).__new__(cls)
+                    instance._initialize()
+                    cls._instance = instance
+        return cls._instance
+
+    def _initialize(self):
+        self.lock = threading.Lock()
+        self.root = STATIC_ROOT
+        self.assets = {}   # chemin relatif -> Asset
+
+    def preload(self):
+        """Charger et précompresser tous les fichiers au démarrage"""
+        for directory, _, files in os.walk(self.root):
+            for name in files:
+                self.get(os.path.relpath(os.path.join(directory, name), self.root))
+
+    def get(self, relative_path):
+        """Asset correspondant à relative_path, ou None s'il n'existe pas"""
+        path = os.path.realpath(os.path.join(self.root, relative_path))
+        # Refuser toute sortie du dossier static (../)
+        if os.path.commonpath([path, self.root]) != self.root:
+            return None
+
+        asset = self.assets.get(path)
+        if asset is not None and not Config.STATIC_RELOAD:
+            return asset
+        try:
+            stat = os.stat(path)
+        except OSError:
+            self.assets.pop(path, None)
+            return None
+        if not os.path.isfile(path):
+            return None
+        if asset is not None and not asset.is_stale(stat):
+            return asset
+
+        with self.lock:
+            asset = self.assets.get(path)
+            if asset is None or asset.is_stale(stat):
+                asset = Asset(path, stat)
+                self.assets[path] = asset
+            return asset
\ No newline at end of file
@@ -1,22 +1,64 @@
-import psycopg2
+import itertools
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from psycopg2.extensions import connection as BaseConnection
 from psycopg2.extras import RealDictCursor
+from psycopg2.pool import ThreadedConnectionPool
 from config import Config
+from metrics import Metrics
+
+class PreparedConnection(BaseConnection):
+    """Connexion qui retient les requêtes déjà préparées (PREPARE) sur sa session"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared = set()
 
 class Database:
     _instance = None
+    _instance_lock = threading.Lock()
     
     def __new__(cls):
         if cls._instance is None:
-            cls._instance = super(Database, cls).__new__(cls)
-            cls._instance._initialize()
+            with cls._instance_lock:
+                if cls._instance is None:
+                    instance = super(Database, cls).__new__(cls)
+                    instance._initialize()
+                    cls._instance = instance
         return cls._instance
     
     def _initialize(self):
-        self.connection = psycopg2.connect(Config.DATABASE_URL)
+        self.pool = ThreadedConnectionPool(
+            Config.DB_POOL_MIN, Config.DB_POOL_MAX, Config.DATABASE_URL,
+            connection_factory=PreparedConnection
+        )
+        # ThreadedConnectionPool lève une erreur quand il est épuisé :
+        # le sémaphore fait patienter les threads en surnombre à la place.
+        self._slots = threading.BoundedSemaphore(Config.DB_POOL_MAX)
+        self._cursor_names = itertools.count()
         self.create_tables()
     
+    @contextmanager
+    def connection(self):
+        """Emprunter une connexion du pool le temps d'un bloc `with`"""
+        self._slots.acquire()
+        try:
+            conn = self.pool.getconn()
+            try:
+                yield conn
+            except Exception:
+                if not conn.closed:
+                    conn.rollback()
+                raise
+            finally:
+                self.pool.putconn(conn, close=bool(conn.closed))
+        finally:
+            self._slots.release()
+    
     def create_tables(self):
-        with self.connection.cursor() as cursor:
+        with self.connection() as connection, connection.cursor() as cursor:
             # Table des nœuds
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS nodes (
@@ -43,16 +85,130 @@ class Database:
                 )
             """)
             
-            self.connection.commit()
+            # Arêtes incidentes à un nœud : UNIQUE(u, v) couvre déjà u
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_edges_v ON edges (v)")
+            
+            # Filtre par boîte englobante de GET /graph?bbox=
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_nodes_xy ON nodes (x, y)")
+            
+            # Profils horaires : facteurs float32 par créneau, supprimés avec l'arête
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS edge_profiles (
+                    u VARCHAR(50) NOT NULL,
+                    v VARCHAR(50) NOT NULL,
+                    factors BYTEA NOT NULL,
+                    PRIMARY KEY (u, v),
+                    FOREIGN KEY (u, v) REFERENCES edges(u, v) ON DELETE CASCADE
+                )
+            """)
+            
+            # Version des données, incrémentée par trigger à chaque écriture
+            # (COPY compris) : valide les fichiers de snapshot entre processus
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS graph_meta (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    token TEXT NOT NULL,
+                    version BIGINT NOT NULL DEFAULT 0
+                )
+            """)
+            cursor.execute(
+                "INSERT INTO graph_meta (id, token) VALUES (1, %s) ON CONFLICT (id) DO NOTHING",
+                (uuid.uuid4().hex,)
+            )
+            cursor.execute("SELECT 1 FROM pg_proc WHERE proname = 'wastegraph_bump_version'")
+            if cursor.fetchone() is None:
+                cursor.execute("""
+                    CREATE FUNCTION wastegraph_bump_version() RETURNS trigger AS $$
+                    BEGIN
+                        UPDATE graph_meta SET version = version + 1 WHERE id = 1;
+                        RETURN NULL;
+                    END
+                    $$ LANGUAGE plpgsql
+                """)
+            for table in ('nodes', 'edges', 'edge_profiles'):
+                cursor.execute("SELECT 1 FROM pg_trigger WHERE tgname = %s", (f"{table}_version",))
+                if cursor.fetchone() is None:
+                    cursor.execute(f"""
+                        CREATE TRIGGER {table}_version
+                        AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table}
+                        FOR EACH STATEMENT EXECUTE PROCEDURE wastegraph_bump_version()
+                    """)
+            
+            connection.commit()
     
     def execute_query(self, query, params=None):
-        with self.connection.cursor(cursor_factory=RealDictCursor) as cursor:
-            cursor.execute(query, params)
-            if query.strip().upper().startswith('SELECT'):
-                return cursor.fetchall()
-            self.connection.commit()
-            return cursor.rowcount
+        start = time.perf_counter()
+        with self.connection() as connection:
+            with connection.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute(query, params)
+                if cursor.description is not None:
+                    result = cursor.fetchall()
+                    rows = len(result)
+                else:
+                    result = rows = cursor.rowcount
+            # Ne jamais rendre au pool une connexion dont la transaction est ouverte
+            connection.commit()
+        Metrics().observe_query('postgres', query, time.perf_counter() - start, rows)
+        return result
+    
+    def execute_prepared(self, name, query, params=()):
+        """Exécuter une requête préparée côté serveur, lignes en tuples.
+        
+        La requête (marqueurs %s) est préparée sous le nom wastegraph_<name>
+        à sa première exécution sur chaque connexion du pool ; les appels
+        suivants n'envoient que EXECUTE et les paramètres, le serveur
+        réutilisant son analyse et son plan.
+        """
+        start = time.perf_counter()
+        statement = f"wastegraph_{name}"
+        with self.connection() as connection:
+            with connection.cursor() as cursor:
+                if statement not in connection.prepared:
+                    parts = query.split('%s')
+                    text = ''.join(f"{part}${i}" for i, part in enumerate(parts[:-1], 1)) + parts[-1]
+                    cursor.execute(f"PREPARE {statement} AS {text}")
+                    # Transaction à part : l'échec d'une exécution ne remet
+                    # pas en cause la préparation
+                    connection.commit()
+                    connection.prepared.add(statement)
+                if params:
+                    cursor.execute(f"EXECUTE {statement} ({', '.join(['%s'] * len(params))})", params)
+                else:
+                    cursor.execute(f"EXECUTE {statement}")
+                if cursor.description is not None:
+                    result = cursor.fetchall()
+                    rows = len(result)
+                else:
+                    result = rows = cursor.rowcount
+            connection.commit()
+        Metrics().observe_query('postgres', query, time.perf_counter() - start, rows)
+        return result
+    
+    def stream_query(self, query, params=None, itersize=None):
+        """Itérer sur les lignes d'un SELECT via un curseur nommé (côté serveur).
+        
+        Les lignes arrivent par paquets de itersize : la mémoire reste bornée
+        quelle que soit la taille du résultat. La connexion est gardée jusqu'à
+        la fin (ou l'abandon) de l'itération.
+        """
+        start = time.perf_counter()
+        rows = 0
+        with self.connection() as connection:
+            name = f"wastegraph_stream_{next(self._cursor_names)}"
+            try:
+                with connection.cursor(name=name, cursor_factory=RealDictCursor) as cursor:
+                    cursor.itersize = itersize or Config.DB_STREAM_ITERSIZE
+                    cursor.execute(query, params)
+                    for row in cursor:
+                        rows += 1
+                        yield row
+            finally:
+                # Lecture seule : clore la transaction même si l'itération est abandonnée
+                if not connection.closed:
+                    connection.rollback()
+                # Durée totale du flux, envoi au client compris
+                Metrics().observe_query('postgres', query, time.perf_counter() - start, rows)
     
     def close(self):
-        if self.connection:
-            self.connection.close()
\ No newline at end of file
+        if self.pool and not self.pool.closed:
+            self.pool.closeall()
\ No newline at end of file
@@ -0,0 +1,53 @@
+"""Import massif d'un graphe (CSV, NDJSON ou GeoJSON) dans la base.
+
+Usage : python import_graph.py fichier.csv [--format csv] [--batch-size 5000]
+
+Sans --format, le format est déduit de l'extension du fichier ; "-" lit
+l'entrée standard. L'import est fait en une seule transaction : en cas
+d'erreur, rien n'est écrit.
+"""
+import argparse
+import os
+import sys
+from models.bulk_import import BulkImporter
+from storage import get_storage
+
+EXTENSIONS = {
+    '.csv': 'csv',
+    '.ndjson': 'ndjson',
+    '.jsonl': 'ndjson',
+    '.geojson': 'geojson',
+    '.json': 'geojson'
+}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk import of nodes and edges")
+    parser.add_argument('path', help="input file, or - for stdin")
+    parser.add_argument('--format', choices=BulkImporter.FORMATS)
+    parser.add_argument('--batch-size', type=int)
+    args = parser.parse_args(argv)
+
+    fmt = args.format or EXTENSIONS.get(os.path.splitext(args.path)[1].lower())
+    if fmt is None:
+        parser.error("cannot infer format from file extension, use --format")
+
+    def progress(totals):
+        print(f"batch {totals['batches']}: {totals['nodes']} nodes, {totals['edges']} edges")
+
+    try:
+        if args.path == '-':
+            totals = BulkImporter(args.batch_size).import_stream(sys.stdin, fmt, progress)
+        else:
+            with open(args.path, encoding='utf-8', newline='') as stream:
+                totals = BulkImporter(args.batch_size).import_stream(stream, fmt, progress)
+    except Exception as e:
+        print(f"Import rolled back: {e}", file=sys.stderr)
+        return 1
+    finally:
+        get_storage().close()
+
+    print(f"Imported {totals['nodes']} nodes and {totals['edges']} edges")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,138 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from config import Config
+
+# Bornes des histogrammes (secondes, puis octets)
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)   # dernière case : au-delà de la plus grande borne
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+class Metrics:
+    """Compteurs et histogrammes du processus, exposés au format texte Prometheus.
+
+    Les requêtes HTTP, les requêtes au stockage et les phases des
+    algorithmes (construction du graphe, recherche...) y sont enregistrées ;
+    celles qui dépassent Config.SLOW_REQUEST_MS / SLOW_QUERY_MS sont aussi
+    journalisées.
+    """
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    FAMILIES = {
+        'wastegraph_http_requests_total': ('counter', 'HTTP requests by endpoint and status'),
+        'wastegraph_http_request_duration_seconds': ('histogram', 'HTTP request latency'),
+        'wastegraph_http_response_bytes': ('histogram', 'Bytes sent per HTTP response, headers included'),
+        'wastegraph_db_query_duration_seconds': ('histogram', 'Storage query latency'),
+        'wastegraph_db_rows_total': ('counter', 'Rows returned or affected by storage queries'),
+        'wastegraph_phase_duration_seconds': ('histogram', 'Time spent in each algorithm phase')
+    }
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    instance = super(Metrics, cls).__new__(cls)
+                    instance._initialize()
+                    cls._instance = instance
+        return cls._instance
+
+    def _initialize(self):
+        self.lock = threading.Lock()
+        # nom -> {tuple de (label, valeur): compteur ou Histogram}
+        self.series = {name: {} for name in self.FAMILIES}
+
+    # Enregistrement
+    def increment(self, name, labels, value=1):
+        key = tuple(labels.items())
+        with self.lock:
+            series = self.series[name]
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name, labels, value, buckets=DURATION_BUCKETS):
+        key = tuple(labels.items())
+        with self.lock:
+            histogram = self.series[name].get(key)
+            if histogram is None:
+                histogram = self.series[name][key] = Histogram(buckets)
+            histogram.observe(value)
+
+    def observe_request(self, method, endpoint, status, seconds, size, stream=False):
+        if not Config.METRICS_ENABLED:
+            return
+        labels = {'method': method, 'endpoint': endpoint}
+        self.increment('wastegraph_http_requests_total', {**labels, 'status': str(status)})
+        if stream:
+            # Flux longue durée (SSE) : sa durée n'est pas une latence
+            return
+        self.observe('wastegraph_http_request_duration_seconds', labels, seconds)
+        self.observe('wastegraph_http_response_bytes', labels, size, SIZE_BUCKETS)
+        if Config.SLOW_REQUEST_MS and seconds * 1000 >= Config.SLOW_REQUEST_MS:
+            print(f"Slow request: {method} {endpoint} -> {status} in {seconds * 1000:.0f} ms ({size} bytes)")
+
+    def observe_query(self, backend, query, seconds, rows):
+        if not Config.METRICS_ENABLED:
+            return
+        labels = {'backend': backend, 'operation': query.split(None, 1)[0].upper() if query.strip() else '?'}
+        self.observe('wastegraph_db_query_duration_seconds', labels, seconds)
+        self.increment('wastegraph_db_rows_total', labels, max(rows, 0))
+        if Config.SLOW_QUERY_MS and seconds * 1000 >= Config.SLOW_QUERY_MS:
+            print(f"Slow query ({backend}, {seconds * 1000:.0f} ms, {rows} rows): {' '.join(query.split())[:200]}")
+
+    @contextmanager
+    def phase(self, component, name):
+        """Chronométrer un bloc : with Metrics().phase('dijkstra', 'search'): ..."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            if Config.METRICS_ENABLED:
+                self.observe(
+                    'wastegraph_phase_duration_seconds',
+                    {'component': component, 'phase': name},
+                    time.perf_counter() - start
+                )
+
+    # Exposition
+    def render(self):
+        lines = []
+        with self.lock:
+            for name, (kind, help_text) in self.FAMILIES.items():
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                for key, value in sorted(self.series[name].items()):
+                    if kind == 'counter':
+                        lines.append(f"{name}{_labels(key)} {_number(value)}")
+                        continue
+                    cumulative = 0
+                    for bound, count in zip(value.buckets, value.counts):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{_labels(key + (('le', _number(bound)),))} {cumulative}")
+                    lines.append(f"{name}_bucket{_labels(key + (('le', '+Inf'),))} {value.count}")
+                    lines.append(f"{name}_sum{_labels(key)} {_number(value.sum)}")
+                    lines.append(f"{name}_count{_labels(key)} {value.count}")
+        return '\n'.join(lines) + '\n'
+
+def _labels(key):
+    if not key:
+        return ''
+    escaped = (
+        f'{label}="' + str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+        for label, value in key
+    )
+    return '{' + ','.join(escaped) + '}'
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
\ No newline at end of file
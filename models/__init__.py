@@ -6,5 +6,17 @@ Contient les modèles de données et algorithmes
 from .graph_data import GraphData
 from .dijkstra import Dijkstra
 from .coloring import Coloring
+from .graph_snapshot import GraphSnapshot
+from .csr_graph import CSRGraph
+from .path_cache import ShortestPathCache
+from .contraction import ContractionHierarchy
+from .coloring_engine import ColoringEngine
+from .routing import RouteOptimizer
+from .graph_stats import GraphStats
+from .spatial_index import SpatialIndex
+from .change_log import ChangeLog
+from .jobs import JobManager
+from .components import ComponentIndex
+from .time_profiles import TimeDependentCosts
 
-__all__ = ['GraphData', 'Dijkstra', 'Coloring']
\ No newline at end of file
+__all__ = ['GraphData', 'Dijkstra', 'Coloring', 'GraphSnapshot', 'CSRGraph', 'ShortestPathCache', 'ContractionHierarchy', 'ColoringEngine', 'RouteOptimizer', 'GraphStats', 'SpatialIndex', 'ChangeLog', 'JobManager', 'ComponentIndex', 'TimeDependentCosts']
\ No newline at end of file
@@ -0,0 +1,110 @@
+import csv
+import json
+import math
+from config import Config
+from models.graph_snapshot import GraphSnapshot
+from storage import get_storage
+
+class BulkImporter:
+    """Import massif de nœuds et d'arêtes par lots, dans une seule transaction.
+
+    Les enregistrements sont lus en flux (CSV, NDJSON ou GeoJSON) et envoyés
+    par lots au stockage (COPY sous PostgreSQL) ; les nœuds en attente sont
+    toujours écrits avant les arêtes, qui doivent donc suivre les nœuds
+    qu'elles relient. Toute erreur annule l'ensemble de l'import.
+    """
+    FORMATS = ('csv', 'ndjson', 'geojson')
+
+    def __init__(self, batch_size=None):
+        self.storage = get_storage()
+        self.batch_size = batch_size or Config.BULK_BATCH_SIZE
+
+    def import_stream(self, stream, fmt, progress=None):
+        """Importer depuis un flux texte ; progress(dict) est appelé après chaque lot"""
+        return self.import_records(iter_records(stream, fmt), progress)
+
+    def import_records(self, records, progress=None):
+        nodes, edges = [], []
+        totals = {'batches': 0, 'nodes': 0, 'edges': 0}
+
+        with self.storage.bulk_writer() as writer:
+            def flush_nodes():
+                if nodes:
+                    writer.write_nodes(nodes)
+                    totals['nodes'] += len(nodes)
+                    nodes.clear()
+                    report()
+
+            def flush_edges():
+                flush_nodes()
+                if edges:
+                    writer.write_edges(edges)
+                    totals['edges'] += len(edges)
+                    edges.clear()
+                    report()
+
+            def report():
+                totals['batches'] += 1
+                if progress:
+                    progress(dict(totals))
+
+            for kind, row in records:
+                if kind == 'node':
+                    nodes.append(row)
+                    if len(nodes) >= self.batch_size:
+                        flush_nodes()
+                else:
+                    edges.append(row)
+                    if len(edges) >= self.batch_size:
+                        flush_edges()
+            flush_edges()
+
+        # Les lignes ont été écrites sans passer par GraphData : relecture complète
+        GraphSnapshot().invalidate()
+        return totals
+
+def iter_records(stream, fmt):
+    """Enregistrements ('node', ligne) / ('edge', ligne) prêts pour l'import"""
+    if fmt == 'csv':
+        rows = csv.DictReader(stream)
+    elif fmt == 'ndjson':
+        rows = (json.loads(line) for line in stream if line.strip())
+    elif fmt == 'geojson':
+        # Un document GeoJSON n'est pas découpable en lignes : il est lu en entier
+        rows = _geojson_rows(json.load(stream))
+    else:
+        raise ValueError(f"Unknown import format '{fmt}', expected one of: {', '.join(BulkImporter.FORMATS)}")
+
+    for number, row in enumerate(rows, 1):
+        kind = row.get('type') or ('edge' if row.get('u') not in (None, '') else 'node')
+        try:
+            if kind == 'node':
+                yield 'node', (row['id'], float(row['x']), float(row['y']), _optional_int(row.get('capacity')))
+            elif kind == 'edge':
+                yield 'edge', (row['u'], row['v'], float(row['weight']), float(row.get('constraint_value') or 0))
+            else:
+                raise ValueError(f"unknown record type '{kind}'")
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Invalid {kind} record #{number}: {e}") from e
+
+def _optional_int(value):
+    return None if value in (None, '') else int(value)
+
+def _geojson_rows(document):
+    # Point -> nœud ; LineString -> arête (poids par défaut : longueur du tracé)
+    for feature in document.get('features', []):
+        geometry = feature.get('geometry') or {}
+        properties = dict(feature.get('properties') or {})
+        coordinates = geometry.get('coordinates') or []
+        if geometry.get('type') == 'Point':
+            properties.setdefault('id', feature.get('id'))
+            properties['x'], properties['y'] = coordinates[:2]
+            properties['type'] = 'node'
+            yield properties
+        elif geometry.get('type') == 'LineString':
+            if properties.get('weight') is None:
+                properties['weight'] = sum(
+                    math.hypot(b[0] - a[0], b[1] - a[1]) for a, b in zip(coordinates, coordinates[1:])
+                )
+            properties['type'] = 'edge'
+            yield properties
\ No newline at end of file
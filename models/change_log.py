@@ -0,0 +1,121 @@
+import threading
+from collections import deque
+from config import Config
+from models.graph_snapshot import GraphSnapshot
+
+class ChangeLog:
+    """Journal borné des modifications du snapshot, indexé par version.
+
+    Chaque mutation y laisse un delta autonome (nœud ou arête dans son état
+    après la modification, ou suppression) ; un client qui connaît la
+    version de ses données rattrape les changements suivants sans relire
+    tout le graphe. Un chargement, une invalidation ou un débordement du
+    journal rend les versions antérieures inutilisables : changes_since()
+    renvoie alors None et le client doit tout recharger.
+    """
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    instance = super(ChangeLog, cls).__new__(cls)
+                    instance._initialize()
+                    cls._instance = instance
+        return cls._instance
+
+    def _initialize(self):
+        self.snapshot = GraphSnapshot()
+        self.entries = deque()    # deltas, par version croissante
+        self.condition = threading.Condition()
+        with self.snapshot.lock:
+            # Les versions antérieures à la création du journal sont inconnues
+            self.start = self.snapshot.version
+            self.version = self.snapshot.version
+            self.snapshot.subscribe(self._on_change)
+
+    def tag(self, version):
+        """Étiquette "epoch-version", au format de GraphSnapshot.version_tag()"""
+        return f"{self.snapshot.epoch}-{version}"
+
+    def parse_tag(self, tag):
+        """Version correspondant à une étiquette "epoch-version" (ou à un entier).
+
+        Renvoie None si l'étiquette vient d'un autre processus ; ValueError
+        si elle est mal formée.
+        """
+        epoch, _, version = str(tag).rpartition('-')
+        if not version.isdigit():
+            raise ValueError(f"'{tag}' is not a graph version tag")
+        if epoch and epoch != self.snapshot.epoch:
+            return None
+        return int(version)
+
+    def changes_since(self, version):
+        """(version courante, deltas postérieurs à version), ou None si trop ancienne"""
+        with self.condition:
+            return self._collect(version)
+
+    def wait(self, version, timeout):
+        """Comme changes_since, en attendant au plus timeout secondes un delta"""
+        with self.condition:
+            self.condition.wait_for(lambda: self.version != version, timeout)
+            return self._collect(version)
+
+    def _collect(self, version):
+        if version is None or not self.start <= version <= self.version:
+            return None
+        # Les versions se suivent : parcours depuis la fin, en ne remontant
+        # que les deltas manquants
+        changes = []
+        for entry in reversed(self.entries):
+            if entry['version'] <= version:
+                break
+            changes.append(entry)
+        changes.reverse()
+        return self.version, changes
+
+    def _on_change(self, event, args, version):
+        snapshot = self.snapshot
+        with self.condition:
+            if event in ('load', 'invalidate') or not snapshot.loaded:
+                self.entries.clear()
+                self.start = version
+            elif event == 'update_edges':
+                # Une version pour tout le lot : ses deltas la partagent
+                self.entries.extend(self._describe('update_edge', key, version) for key in args)
+            else:
+                self.entries.append(self._describe(event, args, version))
+            while len(self.entries) > Config.CHANGE_LOG_SIZE:
+                self.start = self.entries.popleft()['version']
+            self.version = version
+            self.condition.notify_all()
+
+    def _describe(self, event, args, version):
+        nodes, edges = self.snapshot.nodes, self.snapshot.edges
+        if event in ('add_node', 'update_node'):
+            node_id = args[0]
+            node = nodes.get(node_id)
+            if node is not None:
+                return {'version': version, 'op': 'put_node', 'node': {'id': node_id, **node}}
+            return {'version': version, 'op': 'delete_node', 'id': node_id}
+        if event == 'remove_node':
+            # Le client retire aussi les arêtes incidentes, supprimées en cascade
+            return {'version': version, 'op': 'delete_node', 'id': args[0]}
+
+        u, v = args
+        edge = edges.get((u, v))
+        if event == 'remove_edge' or edge is None:
+            return {'version': version, 'op': 'delete_edge', 'u': u, 'v': v}
+        return {
+            'version': version,
+            'op': 'put_edge',
+            'edge': {
+                'u': u,
+                'v': v,
+                'weight': edge['weight'],
+                'constraint_value': edge['constraint_value'],
+                'total_weight': edge['weight'] + edge['constraint_value']
+            }
+        }
\ No newline at end of file
@@ -0,0 +1,164 @@
+import heapq
+import threading
+from array import array
+from metrics import Metrics
+from models.components import ComponentIndex
+from models.graph_snapshot import GraphSnapshot
+
+def lowest_free_color(mask):
+    """Plus petite couleur absente du masque des couleurs voisines"""
+    return (~mask & (mask + 1)).bit_length() - 1
+
+class ColoringEngine:
+    """Coloriage maintenu incrémentalement au fil des mutations du graphe.
+
+    Les couleurs voisines sont manipulées sous forme de masques binaires
+    (bit c = couleur c utilisée). Un calcul complet n'a lieu qu'au premier
+    appel, au changement de stratégie ou si l'état a pris du retard sur le
+    snapshot ; ensuite seuls les sommets en conflit sont recoloriés, ce qui
+    garde les jours de collecte stables.
+    """
+    STRATEGIES = ('welsh_powell', 'dsatur')
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    instance = super(ColoringEngine, cls).__new__(cls)
+                    instance._initialize()
+                    cls._instance = instance
+        return cls._instance
+
+    def _initialize(self):
+        self.lock = threading.Lock()
+        self.snapshot = GraphSnapshot()
+        self.components = ComponentIndex()
+        self.colors = None       # id -> couleur, dans l'ordre de coloriage
+        self.strategy = None
+        self.version = -1
+        self.snapshot.subscribe(self._on_change)
+        self.snapshot.persist('coloring', self._export, self._restore)
+
+    def coloring(self, strategy='welsh_powell'):
+        """Couleurs à jour pour la version courante (id -> couleur)"""
+        with self.lock:
+            if self.colors is not None and self.strategy == strategy and self.version == self.snapshot.version:
+                return dict(self.colors)
+
+        metrics = Metrics()
+        with metrics.phase(strategy, 'graph'):
+            graph = self.snapshot.csr()
+
+        with metrics.phase(strategy, 'color'):
+            # Les stratégies gloutonnes ne regardent que les voisins : chaque
+            # composante se colorie seule, à l'identique du calcul global
+            colors = self.components.map(graph, self.compute, strategy)
+
+        with self.lock:
+            self.colors = colors
+            self.strategy = strategy
+            self.version = graph.version
+            return dict(self.colors)
+
+    def adopt(self, strategy, version, colors):
+        """Reprendre un coloriage calculé ailleurs (job) s'il est encore à jour"""
+        with self.lock:
+            if version == self.snapshot.version:
+                self.colors = dict(colors)
+                self.strategy = strategy
+                self.version = version
+
+    # Fichier de snapshot : le coloriage courant, en indices du CSR
+    def _export(self, graph):
+        with self.lock:
+            if self.colors is None or self.version != graph.version:
+                return None
+            return {'strategy': self.strategy}, {
+                'order': array('i', (graph.index[node_id] for node_id in self.colors)),
+                'colors': array('i', self.colors.values())
+            }
+
+    def _restore(self, version, meta, sections):
+        ids = self.snapshot.csr().ids
+        colors = {ids[node]: color for node, color in zip(sections['order'], sections['colors'])}
+        self.adopt(meta['strategy'], version, colors)
+
+    @classmethod
+    def compute(cls, graph, strategy='welsh_powell'):
+        """Coloriage complet d'un CSR (id -> couleur), sans état partagé"""
+        if strategy == 'dsatur':
+            order, colors = cls._dsatur(graph)
+        else:
+            order, colors = cls._welsh_powell(graph)
+        return {graph.ids[i]: colors[i] for i in order}
+
+    # Stratégies complètes (sur le CSR, indices entiers)
+    @staticmethod
+    def _welsh_powell(graph):
+        colors = [-1] * len(graph)
+        # Degré décroissant puis première couleur libre
+        order = sorted(range(len(graph)), key=graph.degree, reverse=True)
+        for node in order:
+            mask = 0
+            for neighbor in graph.neighbors(node):
+                if colors[neighbor] >= 0:
+                    mask |= 1 << colors[neighbor]
+            colors[node] = lowest_free_color(mask)
+        return order, colors
+
+    @staticmethod
+    def _dsatur(graph):
+        n = len(graph)
+        colors = [-1] * n
+        saturation = [0] * n      # masque des couleurs déjà présentes chez les voisins
+        queue = [(0, -graph.degree(i), i) for i in range(n)]
+        heapq.heapify(queue)
+        order = []
+        while queue:
+            negative_saturation, _, node = heapq.heappop(queue)
+            # Entrée périmée : sommet déjà colorié ou saturation obsolète
+            if colors[node] >= 0 or -negative_saturation != saturation[node].bit_count():
+                continue
+            color = lowest_free_color(saturation[node])
+            colors[node] = color
+            order.append(node)
+            bit = 1 << color
+            for neighbor in graph.neighbors(node):
+                if colors[neighbor] < 0 and not saturation[neighbor] & bit:
+                    saturation[neighbor] |= bit
+                    heapq.heappush(queue, (-saturation[neighbor].bit_count(), -graph.degree(neighbor), neighbor))
+        return order, colors
+
+    # Maintenance incrémentale
+    def _on_change(self, event, args, version):
+        with self.lock:
+            if self.colors is None or self.version != version - 1 or event in ('load', 'invalidate'):
+                self.colors = None
+                return
+
+            adjacency = self.snapshot.adjacency
+            if event == 'add_node':
+                node_id = args[0]
+                if node_id not in self.colors:
+                    self.colors[node_id] = self._free_color(adjacency, node_id)
+            elif event == 'remove_node':
+                self.colors.pop(args[0], None)
+            elif event == 'add_edge':
+                u, v = args
+                if u != v and self.colors.get(u) is not None and self.colors.get(u) == self.colors.get(v):
+                    # Conflit : on ne recolorie que l'extrémité la moins contrainte
+                    node_id = u if len(adjacency.get(u, ())) < len(adjacency.get(v, ())) else v
+                    self.colors[node_id] = self._free_color(adjacency, node_id)
+            # Suppression d'arête, mise à jour de nœud ou de poids :
+            # le coloriage reste propre, on ne touche à rien
+            self.version = version
+
+    def _free_color(self, adjacency, node_id):
+        mask = 0
+        for neighbor in adjacency.get(node_id, ()):
+            color = self.colors.get(neighbor)
+            if color is not None:
+                mask |= 1 << color
+        return lowest_free_color(mask)
@@ -0,0 +1,200 @@
+import heapq
+import itertools
+import threading
+from config import Config
+from models.graph_snapshot import GraphSnapshot
+from models.process_pool import ProcessPool
+
+class ComponentIndex:
+    """Composantes connexes du graphe, étiquetées et tenues à jour au fil des mutations.
+
+    Chaque nœud porte l'étiquette de sa composante : deux nœuds sont reliés
+    si et seulement si leurs étiquettes sont égales, un test en O(1). Un
+    ajout d'arête entre deux composantes renomme la plus petite ; la perte
+    d'une adjacence n'explore que les deux côtés, en alternance, jusqu'à
+    ce qu'ils se rejoignent ou que le plus petit soit épuisé ; la
+    suppression d'un nœud réétiquette sa seule composante.
+    """
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    instance = super(ComponentIndex, cls).__new__(cls)
+                    instance._initialize()
+                    cls._instance = instance
+        return cls._instance
+
+    def _initialize(self):
+        self.snapshot = GraphSnapshot()
+        self.labels = None        # id -> étiquette, None = à recalculer
+        self.members = {}         # étiquette -> ids de la composante
+        self.counter = itertools.count()
+        self.version = -1
+        self.pool = ProcessPool(lambda: Config.COMPONENT_WORKERS)
+        self.snapshot.subscribe(self._on_change)
+
+    # Lecture (sous le verrou du snapshot, comme les écouteurs)
+    def count(self):
+        self.snapshot.ensure_loaded()
+        with self.snapshot.lock:
+            self._refresh()
+            return len(self.members)
+
+    def connected(self, u, v, version):
+        """u et v sont-ils reliés dans la version donnée ? None si elle n'est plus courante"""
+        with self.snapshot.lock:
+            if version != self.snapshot.version:
+                return None
+            self._refresh()
+            label = self.labels.get(u)
+            return label is not None and label == self.labels.get(v)
+
+    def partition(self, graph, parts):
+        """Indices du CSR en au plus parts lots de composantes entières.
+
+        Les composantes, de la plus grosse à la plus petite, vont au lot le
+        moins rempli ; chaque lot garde l'ordre du CSR. None si graph n'est
+        plus la version courante.
+        """
+        with self.snapshot.lock:
+            if graph.version != self.snapshot.version:
+                return None
+            self._refresh()
+            sizes = [(0, k) for k in range(parts)]
+            bucket_of = {}
+            for label, component in sorted(self.members.items(), key=lambda item: len(item[1]), reverse=True):
+                size, k = heapq.heappop(sizes)
+                bucket_of[label] = k
+                heapq.heappush(sizes, (size + len(component), k))
+            labels = self.labels
+            buckets = [[] for _ in range(parts)]
+            for i, node_id in enumerate(graph.ids):
+                buckets[bucket_of[labels[node_id]]].append(i)
+        return [bucket for bucket in buckets if bucket]
+
+    def map(self, graph, function, *args):
+        """function(graph, *args) -> dict, par lots de composantes dans des processus.
+
+        Valable pour les algorithmes dont le résultat sur un nœud ne dépend
+        que de sa composante (coloriage glouton...) : chaque processus
+        reçoit le sous-CSR de son seul lot, et les dicts des lots sont
+        fusionnés. Petit graphe, composante unique ou pool indisponible :
+        un seul appel sur le graphe entier.
+        """
+        workers = Config.COMPONENT_WORKERS
+        if workers < 2 or len(graph) < Config.COMPONENT_PARALLEL_MIN:
+            return function(graph, *args)
+        buckets = self.partition(graph, workers)
+        if buckets is None or len(buckets) < 2:
+            return function(graph, *args)
+
+        try:
+            futures = [self.pool.submit(function, graph.subgraph(bucket), *args) for bucket in buckets]
+            results = [future.result() for future in futures]
+        except (OSError, RuntimeError):
+            # Pool cassé (processus tué) : recréé au prochain appel
+            self.pool.reset()
+            return function(graph, *args)
+
+        merged = {}
+        for result in results:
+            merged.update(result)
+        return merged
+
+    # Étiquetage
+    def _refresh(self):
+        if self.labels is None or self.version != self.snapshot.version:
+            self.labels = {}
+            self.members = {}
+            for node_id in self.snapshot.adjacency:
+                if node_id not in self.labels:
+                    self._flood(node_id)
+            self.version = self.snapshot.version
+
+    def _flood(self, start):
+        """Donner une nouvelle étiquette à la composante de start ; la renvoie"""
+        adjacency = self.snapshot.adjacency
+        component = {start}
+        stack = [start]
+        while stack:
+            for neighbor in adjacency.get(stack.pop(), ()):
+                if neighbor not in component:
+                    component.add(neighbor)
+                    stack.append(neighbor)
+        self._assign(component, next(self.counter))
+        return component
+
+    def _assign(self, component, label):
+        for node_id in component:
+            self.labels[node_id] = label
+        self.members[label] = component
+
+    def _merge(self, u, v):
+        first, second = self.labels[u], self.labels[v]
+        if first == second:
+            return
+        if len(self.members[first]) < len(self.members[second]):
+            first, second = second, first
+        moved = self.members.pop(second)
+        for node_id in moved:
+            self.labels[node_id] = first
+        self.members[first] |= moved
+
+    def _detach(self, u, v):
+        """Après la perte de l'adjacence u-v : explorer depuis les deux bouts
+        en alternance ; si un côté s'épuise sans rencontrer l'autre, il
+        forme désormais une composante à part."""
+        adjacency = self.snapshot.adjacency
+        seen = ({u}, {v})
+        stacks = ([u], [v])
+        while True:
+            for side in (0, 1):
+                if not stacks[side]:
+                    part = seen[side]
+                    self.members[self.labels[u]] -= part
+                    self._assign(part, next(self.counter))
+                    return
+                for neighbor in adjacency.get(stacks[side].pop(), ()):
+                    if neighbor in seen[1 - side]:
+                        return
+                    if neighbor not in seen[side]:
+                        seen[side].add(neighbor)
+                        stacks[side].append(neighbor)
+
+    def _split(self, label):
+        """Réétiqueter les restes d'une composante (après suppression d'un nœud)"""
+        remaining = self.members.pop(label, set())
+        while remaining:
+            remaining -= self._flood(next(iter(remaining)))
+
+    # Maintenance incrémentale
+    def _on_change(self, event, args, version):
+        if self.labels is None or self.version != version - 1 or event in ('load', 'invalidate'):
+            self.labels = None
+            return
+
+        adjacency = self.snapshot.adjacency
+        if event == 'add_node':
+            if args[0] not in self.labels:
+                self._assign({args[0]}, next(self.counter))
+        elif event == 'remove_node':
+            label = self.labels.pop(args[0], None)
+            if label is not None:
+                self.members[label].discard(args[0])
+                self._split(label)
+        elif event == 'add_edge':
+            u, v = args
+            if u not in self.labels or v not in self.labels:
+                self.labels = None
+                return
+            self._merge(u, v)
+        elif event == 'remove_edge':
+            u, v = args
+            # L'arête inverse peut porter encore l'adjacence
+            if u != v and self.labels.get(u, -1) == self.labels.get(v) and v not in adjacency.get(u, ()):
+                self._detach(u, v)
+        # Poids, profils et coordonnées ne changent pas la connexité
+        self.version = version
\ No newline at end of file
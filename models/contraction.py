@@ -0,0 +1,280 @@
+import heapq
+import threading
+from array import array
+from config import Config
+from metrics import Metrics
+from models.graph_snapshot import GraphSnapshot
+
+class ContractionHierarchy:
+    """Hiérarchie de contraction construite à partir d'un CSRGraph.
+
+    Les nœuds sont contractés un par un (ordre par différence d'arêtes) en
+    ajoutant des raccourcis lorsqu'aucun chemin témoin n'existe. Seul le
+    graphe « montant » est conservé, au format CSR : up_middle vaut -1 pour
+    une arête d'origine et l'index du nœud contourné pour un raccourci.
+    """
+
+    def __init__(self, version, rank, up_offsets, up_targets, up_weights, up_middle, shortcuts=0):
+        self.version = version
+        self.rank = rank
+        self.up_offsets = up_offsets
+        self.up_targets = up_targets
+        self.up_weights = up_weights
+        self.up_middle = up_middle
+        self.shortcuts = shortcuts
+
+    @classmethod
+    def build(cls, graph, witness_limit=None):
+        witness_limit = witness_limit or Config.CH_WITNESS_LIMIT
+        n = len(graph)
+        # Graphe de travail : nœud -> {voisin: (poids, nœud contourné)}
+        adjacency = [{} for _ in range(n)]
+        for u in range(n):
+            for k in range(graph.offsets[u], graph.offsets[u + 1]):
+                adjacency[u][graph.targets[k]] = (graph.weights[k], -1)
+
+        rank = array('i', bytes(4 * n))
+        contracted_neighbors = [0] * n
+        level = [0] * n
+        upward = [None] * n
+        shortcut_count = 0
+
+        def priority(node):
+            shortcuts = cls._shortcuts(adjacency, node, witness_limit)
+            edge_difference = len(shortcuts) - len(adjacency[node])
+            return 4 * edge_difference + contracted_neighbors[node] + 2 * level[node], shortcuts
+
+        queue = [(priority(node)[0], node) for node in range(n)]
+        heapq.heapify(queue)
+        order = 0
+        while queue:
+            _, node = heapq.heappop(queue)
+            # Mise à jour paresseuse : on recalcule et on repousse si besoin
+            current, shortcuts = priority(node)
+            if queue and current > queue[0][0]:
+                heapq.heappush(queue, (current, node))
+                continue
+
+            rank[node] = order
+            order += 1
+            upward[node] = [(v, weight, middle) for v, (weight, middle) in adjacency[node].items()]
+            for v in adjacency[node]:
+                del adjacency[v][node]
+                contracted_neighbors[v] += 1
+                level[v] = max(level[v], level[node] + 1)
+            for u, v, weight in shortcuts:
+                if weight < adjacency[u].get(v, (float('inf'),))[0]:
+                    adjacency[u][v] = (weight, node)
+                    adjacency[v][u] = (weight, node)
+                    shortcut_count += 1
+            adjacency[node] = {}
+
+        up_offsets = array('i', [0])
+        up_targets = array('i')
+        up_weights = array('d')
+        up_middle = array('i')
+        for node in range(n):
+            for v, weight, middle in upward[node]:
+                up_targets.append(v)
+                up_weights.append(weight)
+                up_middle.append(middle)
+            up_offsets.append(len(up_targets))
+
+        return cls(graph.version, rank, up_offsets, up_targets, up_weights, up_middle, shortcut_count)
+
+    @staticmethod
+    def _shortcuts(adjacency, node, witness_limit):
+        """Raccourcis nécessaires pour contracter node (recherches de témoins locales)"""
+        neighbors = list(adjacency[node].items())
+        shortcuts = []
+        for i, (u, (weight_u, _)) in enumerate(neighbors):
+            others = neighbors[i + 1:]
+            if not others:
+                continue
+            max_cost = weight_u + max(weight for _, (weight, _) in others)
+            pending = {v for v, _ in others}
+
+            distances = {u: 0}
+            queue = [(0, u)]
+            settled = 0
+            while queue and pending and settled < witness_limit:
+                distance, current = heapq.heappop(queue)
+                if distance > distances[current]:
+                    continue
+                if distance > max_cost:
+                    break
+                settled += 1
+                pending.discard(current)
+                for v, (weight, _) in adjacency[current].items():
+                    if v == node:
+                        continue
+                    candidate = distance + weight
+                    if candidate < distances.get(v, float('inf')):
+                        distances[v] = candidate
+                        heapq.heappush(queue, (candidate, v))
+
+            for v, (weight_v, _) in others:
+                via = weight_u + weight_v
+                if distances.get(v, float('inf')) > via:
+                    shortcuts.append((u, v, via))
+        return shortcuts
+
+    def query(self, source, target):
+        """Recherche bidirectionnelle montante ; renvoie (chemin, distance, nœuds fixés)"""
+        if source == target:
+            return [source], 0, 0
+
+        distances = ({source: 0}, {target: 0})
+        previous = ({source: -1}, {target: -1})
+        queues = ([(0, source)], [(0, target)])
+        best = float('inf')
+        meeting = -1
+        settled = 0
+
+        while queues[0] or queues[1]:
+            if not queues[1] or (queues[0] and queues[0][0][0] <= queues[1][0][0]):
+                side = 0
+            else:
+                side = 1
+            own, other = distances[side], distances[1 - side]
+            distance, current = heapq.heappop(queues[side])
+            if distance > own[current]:
+                continue
+            if distance >= best:
+                # Ce côté ne peut plus améliorer le meilleur chemin
+                queues[side].clear()
+                continue
+            settled += 1
+
+            if current in other and distance + other[current] < best:
+                best = distance + other[current]
+                meeting = current
+
+            # Stall-on-demand : un voisin plus haut atteint déjà current moins cher,
+            # inutile de propager depuis ce nœud
+            start, end = self.up_offsets[current], self.up_offsets[current + 1]
+            if any(
+                own.get(self.up_targets[k], float('inf')) + self.up_weights[k] < distance
+                for k in range(start, end)
+            ):
+                continue
+
+            for k in range(start, end):
+                neighbor = self.up_targets[k]
+                candidate = distance + self.up_weights[k]
+                if candidate < own.get(neighbor, float('inf')):
+                    own[neighbor] = candidate
+                    previous[side][neighbor] = current
+                    heapq.heappush(queues[side], (candidate, neighbor))
+
+        if meeting == -1:
+            return [], float('inf'), settled
+
+        # Chemin dans la hiérarchie, puis dépliage des raccourcis
+        hops = []
+        current = meeting
+        while current != -1:
+            hops.append(current)
+            current = previous[0][current]
+        hops.reverse()
+        current = previous[1][meeting]
+        while current != -1:
+            hops.append(current)
+            current = previous[1][current]
+
+        path = [hops[0]]
+        for a, b in zip(hops, hops[1:]):
+            path.extend(self._unpack(a, b))
+        return path, best, settled
+
+    def _unpack(self, a, b):
+        """Nœuds d'origine parcourus par l'arête a-b, a exclu, b inclus"""
+        result = []
+        stack = [(a, b)]
+        while stack:
+            u, v = stack.pop()
+            middle = self._middle(u, v)
+            if middle == -1:
+                result.append(v)
+            else:
+                # Empiler la seconde moitié d'abord pour dépiler la première
+                stack.append((middle, v))
+                stack.append((u, middle))
+        return result
+
+    def _middle(self, u, v):
+        low, high = (u, v) if self.rank[u] < self.rank[v] else (v, u)
+        for k in range(self.up_offsets[low], self.up_offsets[low + 1]):
+            if self.up_targets[k] == high:
+                return self.up_middle[k]
+        return -1
+
+    def nbytes(self):
+        return sum(
+            len(buffer) * buffer.itemsize
+            for buffer in (self.rank, self.up_offsets, self.up_targets, self.up_weights, self.up_middle)
+        )
+
+class HierarchyManager:
+    """Détient la hiérarchie courante et la reconstruit en arrière-plan.
+
+    Tant qu'aucune hiérarchie ne correspond à la version du graphe,
+    current() renvoie None et les requêtes retombent sur Dijkstra.
+    """
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    instance = super(HierarchyManager, cls).__new__(cls)
+                    instance._initialize()
+                    cls._instance = instance
+        return cls._instance
+
+    def _initialize(self):
+        self.lock = threading.Lock()
+        self.hierarchy = None
+        self.building = False
+        GraphSnapshot().persist('hierarchy', self._export, self._restore)
+
+    def current(self, graph):
+        hierarchy = self.hierarchy
+        if hierarchy is not None and hierarchy.version == graph.version:
+            return hierarchy
+        self.schedule(graph)
+        return None
+
+    # Fichier de snapshot : la hiérarchie évite un prétraitement au démarrage
+    def _export(self, graph):
+        hierarchy = self.hierarchy
+        if hierarchy is None or hierarchy.version != graph.version:
+            return None
+        return {'shortcuts': hierarchy.shortcuts}, {
+            'rank': hierarchy.rank,
+            'up_offsets': hierarchy.up_offsets,
+            'up_targets': hierarchy.up_targets,
+            'up_weights': hierarchy.up_weights,
+            'up_middle': hierarchy.up_middle
+        }
+
+    def _restore(self, version, meta, sections):
+        self.hierarchy = ContractionHierarchy(version, shortcuts=meta['shortcuts'], **sections)
+
+    def schedule(self, graph):
+        with self.lock:
+            if self.building:
+                return
+            self.building = True
+        threading.Thread(target=self._rebuild, args=(graph,), name='wastegraph-ch', daemon=True).start()
+
+    def _rebuild(self, graph):
+        try:
+            with Metrics().phase('ch', 'build'):
+                self.hierarchy = ContractionHierarchy.build(graph)
+        except Exception as e:
+            print(f"Contraction hierarchy build failed: {e}")
+        finally:
+            with self.lock:
+                self.building = False
@@ -0,0 +1,147 @@
+import copy
+import itertools
+import math
+from array import array
+
+class CSRGraph:
+    """Adjacence compacte au format CSR (Compressed Sparse Row).
+
+    Les identifiants de nœuds sont internés en entiers denses 0..n-1 ;
+    les voisins du nœud i sont targets[offsets[i]:offsets[i + 1]] et les
+    poids totaux correspondants sont dans weights. Le graphe est immuable :
+    un nouveau CSR est construit à chaque version du snapshot.
+    """
+
+    def __init__(self, ids, offsets, targets, weights, version=0, xs=None, ys=None):
+        self.ids = ids                                   # index -> id
+        self.index = {node_id: i for i, node_id in enumerate(ids)}
+        self.offsets = offsets                           # array('i'), n + 1 entrées
+        self.targets = targets                           # array('i'), 2m entrées
+        self.weights = weights                           # array('d'), 2m entrées
+        self.xs = xs if xs is not None else array('d', bytes(8 * len(ids)))
+        self.ys = ys if ys is not None else array('d', bytes(8 * len(ids)))
+        self.version = version
+        self._heuristic_scale = None
+
+    def __getstate__(self):
+        # Les tampons projetés depuis un fichier de snapshot (memoryview) ne
+        # sont pas sérialisables : copie en array pour le pool de processus
+        state = dict(self.__dict__)
+        for name in ('offsets', 'targets', 'weights', 'xs', 'ys'):
+            if isinstance(state[name], memoryview):
+                state[name] = array(state[name].format, state[name].tobytes())
+        # Reconstruit à la réception plutôt que transmis
+        del state['index']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.index = {node_id: i for i, node_id in enumerate(self.ids)}
+
+    @classmethod
+    def from_adjacency(cls, adjacency, version=0, nodes=None):
+        ids = list(adjacency)
+        index = {node_id: i for i, node_id in enumerate(ids)}
+        offsets = array('i', [0])
+        targets = array('i')
+        weights = array('d')
+        xs = array('d')
+        ys = array('d')
+
+        for node_id in ids:
+            for neighbor, weight in adjacency[node_id].items():
+                targets.append(index[neighbor])
+                weights.append(weight)
+            offsets.append(len(targets))
+            node = nodes.get(node_id) if nodes else None
+            xs.append(node['x'] if node else 0.0)
+            ys.append(node['y'] if node else 0.0)
+
+        return cls(ids, offsets, targets, weights, version, xs, ys)
+
+    def subgraph(self, nodes):
+        """CSR réduit aux indices nodes, triés et formant des composantes entières.
+
+        L'ordre relatif des nœuds et de leurs voisins est conservé : un
+        algorithme déterministe y donne le même résultat que sur le graphe
+        entier restreint à nodes.
+        """
+        remap = array('i', [-1]) * len(self.ids)
+        for new, i in enumerate(nodes):
+            remap[i] = new
+        spans = [(self.offsets[i], self.offsets[i + 1]) for i in nodes]
+        source_targets, source_weights = self.targets, self.weights
+        targets = array('i', [remap[j] for start, end in spans for j in source_targets[start:end]])
+        weights = array('d')
+        for start, end in spans:
+            weights += source_weights[start:end]
+        offsets = array('i', [0])
+        offsets.extend(itertools.accumulate(end - start for start, end in spans))
+        return CSRGraph(
+            [self.ids[i] for i in nodes], offsets, targets, weights, self.version,
+            array('d', [self.xs[i] for i in nodes]), array('d', [self.ys[i] for i in nodes])
+        )
+
+    def with_weight(self, i, j, weight, version):
+        """Copie du graphe où seule l'arête i-j change de poids.
+
+        Les tampons de structure sont partagés, seul weights est recopié.
+        """
+        return self.with_weights({(i, j): weight}, version)
+
+    def with_weights(self, changes, version):
+        """Comme with_weight pour plusieurs arêtes ((i, j) -> poids), une seule copie"""
+        weights = array('d', self.weights)
+        for (i, j), weight in changes.items():
+            for a, b in ((i, j), (j, i)):
+                for k in range(self.offsets[a], self.offsets[a + 1]):
+                    if self.targets[k] == b:
+                        weights[k] = weight
+        graph = copy.copy(self)
+        graph.weights = weights
+        graph.version = version
+        graph._heuristic_scale = None
+        return graph
+
+    def edge_weight(self, i, j):
+        for k in range(self.offsets[i], self.offsets[i + 1]):
+            if self.targets[k] == j:
+                return self.weights[k]
+        return None
+
+    def __len__(self):
+        return len(self.ids)
+
+    def degree(self, i):
+        return self.offsets[i + 1] - self.offsets[i]
+
+    def neighbors(self, i):
+        return self.targets[self.offsets[i]:self.offsets[i + 1]]
+
+    def distance(self, i, j):
+        """Distance euclidienne entre les coordonnées de deux nœuds"""
+        return math.hypot(self.xs[i] - self.xs[j], self.ys[i] - self.ys[j])
+
+    def heuristic_scale(self):
+        """Plus petit rapport poids / longueur euclidienne observé sur les arêtes.
+
+        scale * distance(i, j) ne surestime jamais le coût réel d'un chemin :
+        l'heuristique d'A* qui en découle est admissible (et cohérente).
+        """
+        if self._heuristic_scale is None:
+            scale = float('inf')
+            for i in range(len(self.ids)):
+                for k in range(self.offsets[i], self.offsets[i + 1]):
+                    length = self.distance(i, self.targets[k])
+                    if length > 0:
+                        scale = min(scale, self.weights[k] / length)
+            # Sans arête exploitable (ou poids négatif), l'heuristique s'annule
+            self._heuristic_scale = scale if 0 < scale < float('inf') else 0.0
+        return self._heuristic_scale
+
+    def nbytes(self):
+        """Taille des tampons CSR en octets (hors table d'internement)"""
+        return sum(
+            len(buffer) * buffer.itemsize
+            for buffer in (self.offsets, self.targets, self.weights, self.xs, self.ys)
+        )
@@ -1,74 +1,374 @@
 import heapq
-from database import Database
+import math
+from array import array
+from config import Config
+from metrics import Metrics
+from models.components import ComponentIndex
+from models.contraction import HierarchyManager
+from models.graph_snapshot import GraphSnapshot
+from models.path_cache import ShortestPathCache, ShortestPathTree
+from models.time_profiles import MINUTES_PER_DAY, format_time
 
 class Dijkstra:
+    ALGORITHMS = ('dijkstra', 'astar', 'bidirectional')
+    
     def __init__(self):
-        self.db = Database()
+        self.snapshot = GraphSnapshot()
+        self.cache = ShortestPathCache()
+        self.hierarchies = HierarchyManager()
+        self.components = ComponentIndex()
+        self.metrics = Metrics()
     
-    def get_shortest_path(self, src, dst):
-        # Récupérer tous les nœuds et arêtes
-        nodes = self.db.execute_query("SELECT id FROM nodes")
-        edges = self.db.execute_query("SELECT u, v, weight, constraint_value FROM edges")
+    def get_shortest_path(self, src, dst, algo='dijkstra', depart_at=None):
+        if depart_at is not None:
+            return self.get_time_dependent_path(src, dst, depart_at)
+        with self.metrics.phase(algo, 'graph'):
+            graph = self.snapshot.csr()
+        error = self._check_endpoints(graph, src, dst)
+        if error:
+            return error
+        if self.components.connected(src, dst, graph.version) is False:
+            # Composantes différentes : aucun chemin, inutile d'explorer
+            return self._format_path(graph, [], float('inf'), src, dst, algo, 0)
         
-        if not nodes:
-            return {'path': [], 'distance': float('inf'), 'error': 'No nodes in graph'}
+        source = graph.index[src]
+        target = graph.index[dst]
+        with self.metrics.phase(algo, 'search'):
+            if algo == 'dijkstra':
+                path, distance, settled, algo = self._default_path(graph, src, dst)
+            else:
+                path, distance, settled = self.point_to_point(graph, source, target, algo)
+        return self._format_path(graph, path, distance, src, dst, algo, settled)
+    
+    def point_to_point(self, graph, source, target, algo='astar'):
+        """Recherche point à point sur les indices d'un CSR déjà obtenu.
+        
+        Renvoie (indices du chemin, distance, nœuds fixés), sans passer par
+        le cache d'arbres ni la hiérarchie ; pour les modèles (tournées...)
+        qui travaillent sur une version donnée du graphe.
+        """
+        if algo == 'bidirectional':
+            return self._bidirectional(graph, source, target)
+        if algo == 'dijkstra':
+            return self._shortest_path(graph, source, target)
+        return self._astar(graph, source, target)
+    
+    def get_time_dependent_path(self, src, dst, depart_at):
+        """Plus court chemin en partant à depart_at (minutes depuis minuit).
+
+        Le coût d'une arête profilée est celui du créneau où le camion y
+        entre. Sans aucun profil, tous les coûts sont fixes : le chemin
+        statique (cache, hiérarchie) est la réponse.
+        """
+        with self.metrics.phase('time_dependent', 'graph'):
+            graph, costs = self.snapshot.time_costs()
+        error = self._check_endpoints(graph, src, dst)
+        if error:
+            return error
+        
+        with self.metrics.phase('time_dependent', 'search'):
+            if self.components.connected(src, dst, graph.version) is False:
+                path, distance, settled, algo = [], float('inf'), 0, 'time_dependent'
+            elif costs.profiled:
+                path, distance, settled = self._time_dependent(graph, costs, graph.index[src], graph.index[dst], depart_at)
+                algo = 'time_dependent'
+            else:
+                path, distance, settled, algo = self._default_path(graph, src, dst)
+        result = self._format_path(graph, path, distance, src, dst, algo, settled)
+        result['depart_at'] = format_time(depart_at)
+        if path:
+            result['arrive_at'] = format_time(depart_at + distance * Config.WEIGHT_MINUTES)
+        return result
+    
+    def _default_path(self, graph, src, dst):
+        """Arbre en cache, sinon hiérarchie de contraction, sinon Dijkstra"""
+        # Graphe non orienté : un arbre déjà calculé depuis dst répond aussi
+        settled = 0
+        tree = self.cache.get(src, graph.version)
+        reverse = False
+        if tree is None:
+            tree = self.cache.get(dst, graph.version)
+            reverse = tree is not None
+        if tree is None and Config.CH_ENABLED:
+            # Hiérarchie à jour : réponse directe ; sinon reconstruction en fond
+            hierarchy = self.hierarchies.current(graph)
+            if hierarchy is not None:
+                path, distance, settled = hierarchy.query(graph.index[src], graph.index[dst])
+                return path, distance, settled, 'ch'
+        if tree is None and self.cache.capacity <= 0:
+            path, distance, settled = self._shortest_path(graph, graph.index[src], graph.index[dst])
+            return path, distance, settled, 'dijkstra'
+        if tree is None:
+            tree, settled = self.build_tree(graph, graph.index[src])
+            self.cache.put(src, tree)
+        
+        target = graph.index[src if reverse else dst]
+        path = tree.path_to(target)
+        if reverse:
+            path.reverse()
+        return path, tree.distances[target], settled, 'dijkstra'
+    
+    def shortest_path_tree(self, graph, src):
+        """Arbre complet depuis src, servi par le cache quand il est à jour"""
+        tree = self.cache.get(src, graph.version)
+        if tree is None:
+            tree, _ = self.build_tree(graph, graph.index[src])
+            self.cache.put(src, tree)
+        return tree
+    
+    def distance_matrix(self, sources, targets):
+        with self.metrics.phase('matrix', 'graph'):
+            graph = self.snapshot.csr()
+        unknown = [node for node in dict.fromkeys(sources + targets) if node not in graph.index]
+        if unknown:
+            return {'distances': [], 'error': f"Unknown nodes: {', '.join(unknown)}"}
+        
+        target_indices = [graph.index[node] for node in targets]
+        distances = []
+        with self.metrics.phase('matrix', 'search'):
+            for src in sources:
+                if not any(self.components.connected(src, dst, graph.version) is not False for dst in targets):
+                    # Aucune cible dans la composante de src : pas d'arbre à construire
+                    distances.append([None] * len(targets))
+                    continue
+                tree = self.shortest_path_tree(graph, src)
+                # None plutôt que Infinity pour les paires sans chemin (JSON valide)
+                distances.append([
+                    tree.distances[t] if tree.distances[t] != float('inf') else None
+                    for t in target_indices
+                ])
+        
+        return {
+            'sources': sources,
+            'targets': targets,
+            'distances': distances
+        }
+    
+    @staticmethod
+    def build_tree(graph, source):
+        """Dijkstra complet (sans arrêt anticipé) depuis l'index source"""
+        offsets, targets, weights = graph.offsets, graph.targets, graph.weights
+        distances = [float('inf')] * len(graph)
+        previous = [-1] * len(graph)
+        distances[source] = 0
         
-        # Construire le graphe avec poids total
-        graph = {}
-        for node in nodes:
-            graph[node['id']] = []
+        settled = 0
         
-        for edge in edges:
-            u, v = edge['u'], edge['v']
-            total_weight = edge['weight'] + edge['constraint_value']
+        priority_queue = [(0, source)]
+        
+        while priority_queue:
+            current_distance, current_node = heapq.heappop(priority_queue)
             
-            graph[u].append((v, total_weight))
-            graph[v].append((u, total_weight))  # Graphe non orienté
+            if current_distance > distances[current_node]:
+                continue
+            settled += 1
+            
+            for k in range(offsets[current_node], offsets[current_node + 1]):
+                neighbor = targets[k]
+                distance = current_distance + weights[k]
+                if distance < distances[neighbor]:
+                    distances[neighbor] = distance
+                    previous[neighbor] = current_node
+                    heapq.heappush(priority_queue, (distance, neighbor))
+        
+        tree = ShortestPathTree(source, graph.version, array('d', distances), array('i', previous))
+        return tree, settled
+    
+    def _check_endpoints(self, graph, src, dst):
+        if not len(graph):
+            return {'path': [], 'distance': float('inf'), 'error': 'No nodes in graph'}
         
         # Vérifier si les nœuds source et destination existent
-        if src not in graph:
+        if src not in graph.index:
             return {'path': [], 'distance': float('inf'), 'error': f'Source node {src} not found'}
-        if dst not in graph:
+        if dst not in graph.index:
             return {'path': [], 'distance': float('inf'), 'error': f'Destination node {dst} not found'}
+        return None
+    
+    def _format_path(self, graph, path, distance, src, dst, algo, settled):
+        if not path:
+            return {
+                'path': [],
+                'distance': float('inf'),
+                'error': 'No path found',
+                'algorithm': algo,
+                'settled_nodes': settled
+            }
         
-        # Implémentation de Dijkstra
-        distances = {node: float('inf') for node in graph}
-        previous = {node: None for node in graph}
-        distances[src] = 0
+        return {
+            'path': [graph.ids[i] for i in path],
+            'distance': distance,
+            'source': src,
+            'destination': dst,
+            'algorithm': algo,
+            'settled_nodes': settled
+        }
+    
+    def _shortest_path(self, graph, source, target):
+        """Dijkstra point à point avec arrêt anticipé (cache désactivé)"""
+        # Implémentation de Dijkstra sur les tampons CSR (indices entiers)
+        offsets, targets, weights = graph.offsets, graph.targets, graph.weights
+        distances = [float('inf')] * len(graph)
+        previous = [-1] * len(graph)
+        distances[source] = 0
+        settled = 0
         
-        priority_queue = [(0, src)]
+        priority_queue = [(0, source)]
         
         while priority_queue:
             current_distance, current_node = heapq.heappop(priority_queue)
             
             if current_distance > distances[current_node]:
                 continue
+            settled += 1
             
-            if current_node == dst:
+            if current_node == target:
                 break
             
-            for neighbor, weight in graph[current_node]:
-                distance = current_distance + weight
+            for k in range(offsets[current_node], offsets[current_node + 1]):
+                neighbor = targets[k]
+                distance = current_distance + weights[k]
                 if distance < distances[neighbor]:
                     distances[neighbor] = distance
                     previous[neighbor] = current_node
                     heapq.heappush(priority_queue, (distance, neighbor))
         
-        # Reconstruire le chemin
-        path = []
-        current = dst
-        while current is not None:
-            path.append(current)
-            current = previous[current]
+        return self._walk(previous, target, distances[target]), distances[target], settled
+    
+    def _time_dependent(self, graph, costs, source, target, depart_at):
+        """Dijkstra dépendant du temps : l'horloge d'un nœud est depart_at plus
+        sa distance, le créneau est calculé une fois par nœud fixé.
         
-        path.reverse()
+        Exact tant qu'attendre ne fait jamais arriver plus tôt (propriété
+        FIFO), ce que des facteurs par créneau raisonnables respectent.
+        """
+        offsets, targets, weights = graph.offsets, graph.targets, graph.weights
+        entries, slot_costs = costs.entries, costs.costs
+        # Créneau ((depart_at + distance x minutes) mod jour) x slots / jour,
+        # multiplié d'avance par slots pour ne garder qu'un modulo et une division
+        start, scale = depart_at * costs.slots, Config.WEIGHT_MINUTES * costs.slots
+        day = MINUTES_PER_DAY * costs.slots
+        distances = [float('inf')] * len(graph)
+        previous = [-1] * len(graph)
+        distances[source] = 0
+        settled = 0
         
-        if distances[dst] == float('inf'):
-            return {'path': [], 'distance': float('inf'), 'error': 'No path found'}
+        priority_queue = [(0, source)]
         
-        return {
-            'path': path,
-            'distance': distances[dst],
-            'source': src,
-            'destination': dst
-        }
\ No newline at end of file
+        while priority_queue:
+            current_distance, current_node = heapq.heappop(priority_queue)
+            
+            if current_distance > distances[current_node]:
+                continue
+            settled += 1
+            
+            if current_node == target:
+                break
+            
+            slot = int((start + current_distance * scale) % day // MINUTES_PER_DAY)
+            for k in range(offsets[current_node], offsets[current_node + 1]):
+                neighbor = targets[k]
+                row = entries[k]
+                distance = current_distance + (weights[k] if row < 0 else slot_costs[row + slot])
+                if distance < distances[neighbor]:
+                    distances[neighbor] = distance
+                    previous[neighbor] = current_node
+                    heapq.heappush(priority_queue, (distance, neighbor))
+        
+        return self._walk(previous, target, distances[target]), distances[target], settled
+    
+    def _astar(self, graph, source, target):
+        """A* guidé par la distance euclidienne, mise à l'échelle pour rester admissible"""
+        offsets, targets, weights = graph.offsets, graph.targets, graph.weights
+        xs, ys = graph.xs, graph.ys
+        scale = graph.heuristic_scale()
+        target_x, target_y = xs[target], ys[target]
+        
+        distances = [float('inf')] * len(graph)
+        previous = [-1] * len(graph)
+        distances[source] = 0
+        settled = 0
+        
+        priority_queue = [(scale * math.hypot(xs[source] - target_x, ys[source] - target_y), 0, source)]
+        
+        while priority_queue:
+            _, current_distance, current_node = heapq.heappop(priority_queue)
+            
+            if current_distance > distances[current_node]:
+                continue
+            settled += 1
+            
+            if current_node == target:
+                break
+            
+            for k in range(offsets[current_node], offsets[current_node + 1]):
+                neighbor = targets[k]
+                distance = current_distance + weights[k]
+                if distance < distances[neighbor]:
+                    distances[neighbor] = distance
+                    previous[neighbor] = current_node
+                    estimate = scale * math.hypot(xs[neighbor] - target_x, ys[neighbor] - target_y)
+                    heapq.heappush(priority_queue, (distance + estimate, distance, neighbor))
+        
+        return self._walk(previous, target, distances[target]), distances[target], settled
+    
+    def _bidirectional(self, graph, source, target):
+        """Dijkstra lancé simultanément depuis la source et la destination"""
+        offsets, targets, weights = graph.offsets, graph.targets, graph.weights
+        n = len(graph)
+        distances = ([float('inf')] * n, [float('inf')] * n)
+        previous = ([-1] * n, [-1] * n)
+        queues = ([(0, source)], [(0, target)])
+        distances[0][source] = 0
+        distances[1][target] = 0
+        
+        best = 0 if source == target else float('inf')
+        meeting = source if source == target else -1
+        settled = 0
+        
+        while queues[0] and queues[1]:
+            # Arrêt dès qu'aucun chemin plus court ne peut encore être trouvé
+            if queues[0][0][0] + queues[1][0][0] >= best:
+                break
+            
+            # Avancer le côté dont la frontière est la plus proche
+            side = 0 if queues[0][0][0] <= queues[1][0][0] else 1
+            own, other = distances[side], distances[1 - side]
+            current_distance, current_node = heapq.heappop(queues[side])
+            
+            if current_distance > own[current_node]:
+                continue
+            settled += 1
+            
+            for k in range(offsets[current_node], offsets[current_node + 1]):
+                neighbor = targets[k]
+                distance = current_distance + weights[k]
+                if distance < own[neighbor]:
+                    own[neighbor] = distance
+                    previous[side][neighbor] = current_node
+                    heapq.heappush(queues[side], (distance, neighbor))
+                    if distance + other[neighbor] < best:
+                        best = distance + other[neighbor]
+                        meeting = neighbor
+        
+        if meeting == -1:
+            return [], float('inf'), settled
+        
+        # Moitié avant (source -> rencontre) puis moitié arrière (rencontre -> destination)
+        path = self._walk(previous[0], meeting, best)
+        current = previous[1][meeting]
+        while current != -1:
+            path.append(current)
+            current = previous[1][current]
+        return path, best, settled
+    
+    def _walk(self, previous, target, distance):
+        """Reconstruire le chemin en remontant les prédécesseurs"""
+        path = []
+        if distance != float('inf'):
+            current = target
+            while current != -1:
+                path.append(current)
+                current = previous[current]
+            path.reverse()
+        return path
\ No newline at end of file
@@ -1,73 +1,135 @@
-from database import Database
+import math
+from array import array
+from models.graph_snapshot import GraphSnapshot
+from models.path_cache import ShortestPathCache
+from models.graph_stats import GraphStats
+from models.change_log import ChangeLog
+from models.time_profiles import encode_profile
+from storage import get_storage
 
 class GraphData:
     def __init__(self):
-        self.db = Database()
+        self.storage = get_storage()
+        self.snapshot = GraphSnapshot()
+        self.path_cache = ShortestPathCache()
+        self.stats = GraphStats()
+        # Créé avant toute mutation pour que le journal n'en manque aucune
+        self.changes = ChangeLog()
     
     def get_all_nodes(self):
-        return self.db.execute_query("SELECT * FROM nodes")
+        return self.storage.fetch_nodes()
     
     def get_all_edges(self):
-        return self.db.execute_query("SELECT * FROM edges")
+        return self.storage.fetch_edges()
     
     def get_node(self, node_id):
-        result = self.db.execute_query("SELECT * FROM nodes WHERE id = %s", (node_id,))
-        return result[0] if result else None
+        return self.storage.get_node(node_id)
     
     def add_node(self, node_id, x, y, capacity):
-        return self.db.execute_query(
-            "INSERT INTO nodes (id, x, y, capacity) VALUES (%s, %s, %s, %s)",
-            (node_id, x, y, capacity)
-        )
+        result = self.storage.insert_node(node_id, float(x), float(y), capacity)
+        self.snapshot.add_node(node_id, float(x), float(y), capacity)
+        return result
     
     def update_node(self, node_id, x=None, y=None, capacity=None):
-        updates = []
-        params = []
+        fields = {}
         
         if x is not None:
-            updates.append("x = %s")
-            params.append(x)
+            fields['x'] = float(x)
         if y is not None:
-            updates.append("y = %s")
-            params.append(y)
+            fields['y'] = float(y)
         if capacity is not None:
-            updates.append("capacity = %s")
-            params.append(capacity)
+            fields['capacity'] = capacity
         
-        if updates:
-            params.append(node_id)
-            query = f"UPDATE nodes SET {', '.join(updates)} WHERE id = %s"
-            return self.db.execute_query(query, params)
+        if fields:
+            result = self.storage.update_node(node_id, fields)
+            if result:
+                self.snapshot.update_node(node_id, fields.get('x'), fields.get('y'), capacity)
+            return result
         return 0
     
     def delete_node(self, node_id):
-        return self.db.execute_query("DELETE FROM nodes WHERE id = %s", (node_id,))
+        result = self.storage.delete_node(node_id)
+        if result:
+            self.snapshot.remove_node(node_id)
+        return result
     
     def add_edge(self, u, v, weight, constraint_value=0):
-        return self.db.execute_query(
-            "INSERT INTO edges (u, v, weight, constraint_value) VALUES (%s, %s, %s, %s)",
-            (u, v, weight, constraint_value)
-        )
+        result = self.storage.insert_edge(u, v, float(weight), float(constraint_value or 0))
+        self.snapshot.add_edge(u, v, float(weight), float(constraint_value or 0))
+        return result
     
     def update_edge(self, u, v, weight=None, constraint_value=None):
-        updates = []
-        params = []
+        fields = {}
         
         if weight is not None:
-            updates.append("weight = %s")
-            params.append(weight)
+            fields['weight'] = float(weight)
         if constraint_value is not None:
-            updates.append("constraint_value = %s")
-            params.append(constraint_value)
+            fields['constraint_value'] = float(constraint_value)
         
-        if updates:
-            params.extend([u, v])
-            query = f"UPDATE edges SET {', '.join(updates)} WHERE u = %s AND v = %s"
-            return self.db.execute_query(query, params)
+        if fields:
+            result = self.storage.update_edge(u, v, fields)
+            if result:
+                self._apply_edge_update(u, v, fields.get('weight'), fields.get('constraint_value'))
+            return result
         return 0
     
+    def update_edges(self, updates):
+        """Mise à jour groupée de poids et contraintes.
+
+        updates : dicts u, v et weight et/ou constraint_value. Les mises à
+        jour d'une même arête sont fusionnées dans l'ordre. Tout est écrit
+        en une transaction et le graphe ne change qu'une fois de version ;
+        renvoie les (u, v) modifiées.
+        """
+        merged = {}
+        for update in updates:
+            fields = merged.setdefault((update['u'], update['v']), {})
+            if update.get('weight') is not None:
+                fields['weight'] = float(update['weight'])
+            if update.get('constraint_value') is not None:
+                fields['constraint_value'] = float(update['constraint_value'])
+        rows = [
+            (u, v, fields.get('weight'), fields.get('constraint_value'))
+            for (u, v), fields in merged.items() if fields
+        ]
+        if not rows:
+            return []
+
+        updated = set(self.storage.update_edges(rows))
+        if updated:
+            self.snapshot.update_edges([row for row in rows if (row[0], row[1]) in updated])
+        return [(u, v) for u, v, _, _ in rows if (u, v) in updated]
+    
+    def _apply_edge_update(self, u, v, weight, constraint_value):
+        # Un changement de poids ne modifie pas la structure : les arbres de
+        # plus courts chemins en cache sont réparés au lieu d'être perdus
+        with self.snapshot.lock:
+            old_version = self.snapshot.version
+            old_weight = self.snapshot.edge_weight(u, v) if self.snapshot.loaded else None
+            self.snapshot.update_edge(u, v, weight, constraint_value)
+            new_weight = self.snapshot.edge_weight(u, v)
+            if old_weight is not None and new_weight is not None:
+                self.path_cache.repair(self.snapshot.csr(), u, v, old_weight, new_weight, old_version)
+    
     def delete_edge(self, u, v):
-        return self.db.execute_query("DELETE FROM edges WHERE u = %s AND v = %s", (u, v))
+        result = self.storage.delete_edge(u, v)
+        if result:
+            self.snapshot.remove_edge(u, v)
+        return result
+    
+    def set_profile(self, u, v, factors):
+        """Profil horaire de l'arête (u, v) : un facteur du poids total par
+        créneau de Config.PROFILE_SLOTS, None pour revenir au poids fixe"""
+        # Arrondi en float32 avant l'écriture : base et snapshot gardent les mêmes valeurs
+        profile = array('f', factors) if factors is not None else None
+        result = self.storage.set_profile(u, v, encode_profile(profile) if profile is not None else None)
+        if result:
+            self.snapshot.set_profile(u, v, profile)
+        return result
+    
+    def get_profile(self, u, v):
+        profile = self.snapshot.ensure_loaded().profiles.get((u, v))
+        return list(profile) if profile is not None else None
     
     def get_graph(self):
         nodes = self.get_all_nodes()
@@ -82,22 +144,84 @@ class GraphData:
             'edges': edges
         }
     
-    def get_stats(self):
-        nodes_count = self.db.execute_query("SELECT COUNT(*) as count FROM nodes")[0]['count']
-        edges_count = self.db.execute_query("SELECT COUNT(*) as count FROM edges")[0]['count']
+    def get_columns(self, bbox=None):
+        """Graphe en colonnes, lu dans le snapshot : un tableau par champ.
         
-        # Calcul du degré moyen
-        degree_avg = self.db.execute_query("""
-            SELECT AVG(degree) as avg_degree FROM (
-                SELECT n.id, COUNT(e.id) as degree 
-                FROM nodes n 
-                LEFT JOIN edges e ON n.id = e.u OR n.id = e.v 
-                GROUP BY n.id
-            ) as degrees
-        """)[0]['avg_degree'] or 0
+        Nœuds triés par id ; u et v sont des indices dans les colonnes des
+        nœuds, capacity vaut NaN quand elle est absente et total_weight se
+        déduit (weight + constraint_value). Avec bbox, les nœuds hors de la
+        boîte reliés à une arête retenue sont ajoutés pour que chaque indice
+        se résolve.
+        """
+        snapshot = self.snapshot.ensure_loaded()
+        with snapshot.lock:
+            nodes, edges = snapshot.nodes, snapshot.edges
+            if bbox:
+                min_x, min_y, max_x, max_y = bbox
+                inside = {
+                    node_id for node_id, node in nodes.items()
+                    if min_x <= node['x'] <= max_x and min_y <= node['y'] <= max_y
+                }
+                keys = [key for key in edges if key[0] in inside or key[1] in inside]
+                selected = inside.union(*keys)
+            else:
+                keys, selected = list(edges), nodes
+            
+            ids = sorted(selected)
+            index = {node_id: i for i, node_id in enumerate(ids)}
+            keys.sort(key=lambda key: (index[key[0]], index[key[1]]))
+            capacities = (nodes[node_id]['capacity'] for node_id in ids)
+            return {
+                'nodes': {
+                    'id': ids,
+                    'x': array('d', (nodes[node_id]['x'] for node_id in ids)),
+                    'y': array('d', (nodes[node_id]['y'] for node_id in ids)),
+                    'capacity': array('d', (math.nan if capacity is None else capacity for capacity in capacities))
+                },
+                'edges': {
+                    'u': array('I', (index[u] for u, _ in keys)),
+                    'v': array('I', (index[v] for _, v in keys)),
+                    'weight': array('d', (edges[key]['weight'] for key in keys)),
+                    'constraint_value': array('d', (edges[key]['constraint_value'] for key in keys))
+                }
+            }
+    
+    def iter_graph(self, bbox=None, cursor=None, limit=None):
+        """Parcourir les nœuds puis les arêtes en flux, triés par clé.
         
-        return {
-            'nodes_count': nodes_count,
-            'edges_count': edges_count,
-            'average_degree': float(degree_avg)
-        }
\ No newline at end of file
+        Produit des couples ('node', ligne) / ('edge', ligne). bbox vaut
+        (min_x, min_y, max_x, max_y) ; une arête y figure dès qu'une de ses
+        extrémités est dans la boîte. cursor reprend après un élément donné
+        (voir page_cursor) et limit borne le nombre d'éléments produits.
+        """
+        kind, key = self.parse_cursor(cursor)
+        if kind == 'node':
+            for row in self.storage.iter_nodes(bbox, key, limit):
+                yield 'node', row
+                if limit is not None:
+                    limit -= 1
+            key = None
+        if limit == 0:
+            return
+        for row in self.storage.iter_edges(bbox, key, limit):
+            yield 'edge', row
+    
+    @staticmethod
+    def page_cursor(kind, row):
+        """Curseur de pagination désignant l'élément qui suit (kind, row)"""
+        return f"{kind}:{row['id']}"
+    
+    @staticmethod
+    def parse_cursor(cursor):
+        if not cursor:
+            return 'node', None
+        kind, _, key = cursor.partition(':')
+        if kind == 'node' and key:
+            return kind, key
+        if kind == 'edge' and key.isdigit():
+            return kind, int(key)
+        raise ValueError(f"Invalid cursor '{cursor}'")
+    
+    def get_stats(self):
+        # Compteurs maintenus en mémoire : aucune lecture des tables
+        return self.stats.summary()
\ No newline at end of file
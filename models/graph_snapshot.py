@@ -0,0 +1,456 @@
+import os
+import threading
+import time
+import uuid
+from array import array
+from config import Config
+from storage import get_storage
+from metrics import Metrics
+from models.csr_graph import CSRGraph
+from models.snapshot_file import MappedSnapshot, write_snapshot
+from models.time_profiles import TimeDependentCosts, decode_profile
+
+# Capacité absente dans la section 'capacity' d'un fichier de snapshot
+NO_CAPACITY = -2 ** 63
+
+class GraphSnapshot:
+    """Image en mémoire du graphe, partagée par tout le processus.
+
+    Construite une seule fois depuis la base puis tenue à jour par les
+    mutations de GraphData. Chaque modification incrémente `version`.
+    """
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    instance = super(GraphSnapshot, cls).__new__(cls)
+                    instance._initialize()
+                    cls._instance = instance
+        return cls._instance
+
+    def _initialize(self):
+        self.lock = threading.RLock()
+        self.version = 0
+        # Distingue les versions de deux processus successifs (ETag HTTP)
+        self.epoch = uuid.uuid4().hex[:12]
+        self.loaded = False
+        self.nodes = {}       # id -> {'x', 'y', 'capacity'}
+        self.edges = {}       # (u, v) -> {'weight', 'constraint_value'}
+        self.adjacency = {}   # id -> {voisin: poids total}
+        self.profiles = {}    # (u, v) -> array('f'), facteur du poids total par créneau horaire
+        self._csr = None
+        self._time_costs = None
+        self.listeners = []
+        # (version des données du stockage, version du snapshot) au dernier
+        # chargement : tant que rien n'a changé, l'image peut être enregistrée
+        self.source = None
+        # (version des données, version du snapshot) au dernier check_storage
+        self.checked = None
+        self.checked_at = None  # time.monotonic() du dernier contrôle
+        self.persisted = {}   # nom -> (export, restore), structures dérivées du fichier
+        self.restored = {}    # nom -> (version, meta, sections) en attente de leur propriétaire
+
+    # Chargement
+    def ensure_loaded(self):
+        if not self.loaded:
+            with self.lock:
+                if not self.loaded:
+                    with Metrics().phase('snapshot', 'load'):
+                        self._load()
+        return self
+
+    def _load(self):
+        storage = get_storage()
+        # Lue avant les tables : une écriture concurrente rend le fichier
+        # enregistré périmé, jamais faux
+        data_version = storage.data_version()
+        # Tuples bruts : ni dict par ligne côté stockage, ni accès par clé ici
+        nodes = storage.node_rows()
+        edges = storage.edge_rows()
+        profiles = storage.profile_rows()
+
+        self.nodes = {}
+        self.edges = {}
+        self.adjacency = {}
+        for node_id, x, y, capacity in nodes:
+            self.nodes[node_id] = {'x': x, 'y': y, 'capacity': capacity}
+            self.adjacency[node_id] = {}
+
+        for u, v, weight, constraint_value in edges:
+            self.edges[(u, v)] = {'weight': weight, 'constraint_value': constraint_value or 0}
+            self._relink(u, v)
+
+        self.profiles = {(u, v): decode_profile(factors) for u, v, factors in profiles if (u, v) in self.edges}
+
+        self.loaded = True
+        self.version += 1
+        self.source = (data_version, self.version)
+        self.checked = self.source
+        self._notify('load')
+
+    def check_storage(self):
+        """Relire l'image si une autre connexion a écrit dans les tables.
+
+        La version des données (graph_meta) a bougé depuis le dernier contrôle
+        sans mutation de ce processus : l'écriture vient d'ailleurs
+        (import_graph.py, autre serveur) et l'image est rechargée, ce qui
+        change version_tag. Après une mutation locale, version_tag a changé
+        de toute façon et seule la référence est notée. Au plus un contrôle
+        par Config.STORAGE_CHECK_TTL : une écriture externe est vue avec
+        ce délai, sans requête de plus à chaque GET conditionnel.
+        """
+        self.ensure_loaded()
+        now = time.monotonic()
+        if self.checked_at is not None and now - self.checked_at < Config.STORAGE_CHECK_TTL:
+            return
+        self.checked_at = now
+        data_version = get_storage().data_version()
+        if data_version is None:
+            return
+        with self.lock:
+            if self.checked is not None and self.checked[1] == self.version and self.checked[0] != data_version:
+                self.invalidate()
+                self.ensure_loaded()
+            else:
+                self.checked = (data_version, self.version)
+
+    # Fichier de snapshot (démarrage à chaud)
+    def persist(self, name, export, restore):
+        """Inclure une structure dérivée (coloriage, hiérarchie...) dans le fichier.
+
+        export(csr) renvoie (meta, {nom: tableau}) si la structure correspond
+        à csr, None sinon ; restore(version, meta, sections) la reprend après
+        un démarrage depuis le fichier, y compris si le propriétaire
+        s'enregistre après coup.
+        """
+        with self.lock:
+            self.persisted[name] = (export, restore)
+            pending = self.restored.pop(name, None)
+            if pending is not None and pending[0] == self.version:
+                restore(*pending)
+
+    def warm_start(self, path):
+        """Charger l'image depuis path si elle correspond au stockage, sinon
+        depuis le stockage puis l'enregistrer. Renvoie 'file' ou 'storage'."""
+        data_version = get_storage().data_version()
+        with self.lock:
+            mapped = None
+            if data_version is not None and os.path.exists(path):
+                try:
+                    mapped = MappedSnapshot(path)
+                except (OSError, ValueError, KeyError) as e:
+                    print(f"Ignoring graph snapshot {path}: {e}")
+            if mapped is not None and mapped.data_version == data_version:
+                with Metrics().phase('snapshot', 'map'):
+                    self._restore(mapped)
+                return 'file'
+
+            self.ensure_loaded()
+        self.save(path)
+        return 'storage'
+
+    def save(self, path):
+        """Enregistrer l'image courante dans path ; relue depuis le stockage
+        si des mutations l'ont fait diverger de la version chargée.
+        Renvoie False si le stockage ne fournit pas de version."""
+        self.ensure_loaded()
+        with self.lock:
+            if self.source is None or self.source[1] != self.version:
+                self._load()
+            data_version = self.source[0]
+            if data_version is None:
+                return False
+
+            graph = self.csr()
+            ids = graph.ids
+            encoded = [node_id.encode() for node_id in ids]
+            id_offsets = array('q', [0])
+            for value in encoded:
+                id_offsets.append(id_offsets[-1] + len(value))
+            index = graph.index
+            capacities = array('q', (
+                NO_CAPACITY if self.nodes[node_id]['capacity'] is None else int(self.nodes[node_id]['capacity'])
+                for node_id in ids
+            ))
+            keys = list(self.edges)
+            sections = {
+                'ids': array('B', b''.join(encoded)),
+                'id_offsets': id_offsets,
+                'x': graph.xs,
+                'y': graph.ys,
+                'capacity': capacities,
+                'offsets': graph.offsets,
+                'targets': graph.targets,
+                'weights': graph.weights,
+                'edge_u': array('i', (index[u] for u, _ in keys)),
+                'edge_v': array('i', (index[v] for _, v in keys)),
+                'edge_weight': array('d', (self.edges[key]['weight'] for key in keys)),
+                'edge_constraint': array('d', (self.edges[key]['constraint_value'] for key in keys))
+            }
+            # Profils : position de l'arête dans edge_*, facteurs bout à bout
+            profiled = [position for position, key in enumerate(keys) if key in self.profiles]
+            profile_offsets = array('i', [0])
+            profile_factors = array('f')
+            for position in profiled:
+                profile_factors.extend(self.profiles[keys[position]])
+                profile_offsets.append(len(profile_factors))
+            sections.update({
+                'profile_edges': array('i', profiled),
+                'profile_offsets': profile_offsets,
+                'profile_factors': profile_factors
+            })
+            extras = {}
+            for name, (export, _) in self.persisted.items():
+                exported = export(graph)
+                if exported is not None:
+                    extras[name], arrays = exported
+                    sections.update((f"{name}.{key}", value) for key, value in arrays.items())
+
+            with Metrics().phase('snapshot', 'save'):
+                write_snapshot(path, data_version, {'nodes': len(ids), 'edges': len(keys), 'extras': extras}, sections)
+            return True
+
+    def _restore(self, mapped):
+        """Reconstruire l'image depuis un fichier projeté ; le CSR reste sur la projection"""
+        blob = mapped.array('ids')
+        id_offsets = mapped.array('id_offsets')
+        ids = [bytes(blob[id_offsets[i]:id_offsets[i + 1]]).decode() for i in range(mapped.meta['nodes'])]
+        xs, ys, capacities = mapped.array('x'), mapped.array('y'), mapped.array('capacity')
+        offsets, targets, weights = mapped.array('offsets'), mapped.array('targets'), mapped.array('weights')
+
+        self.nodes = {
+            node_id: {
+                'x': xs[i],
+                'y': ys[i],
+                'capacity': None if capacities[i] == NO_CAPACITY else capacities[i]
+            }
+            for i, node_id in enumerate(ids)
+        }
+        self.adjacency = {
+            node_id: {ids[targets[k]]: weights[k] for k in range(offsets[i], offsets[i + 1])}
+            for i, node_id in enumerate(ids)
+        }
+        self.edges = {
+            (ids[u], ids[v]): {'weight': weight, 'constraint_value': constraint_value}
+            for u, v, weight, constraint_value in zip(
+                mapped.array('edge_u'), mapped.array('edge_v'),
+                mapped.array('edge_weight'), mapped.array('edge_constraint')
+            )
+        }
+        self.profiles = {}
+        if 'profile_edges' in mapped:
+            keys = list(self.edges)
+            profile_offsets, profile_factors = mapped.array('profile_offsets'), mapped.array('profile_factors')
+            for i, position in enumerate(mapped.array('profile_edges')):
+                self.profiles[keys[position]] = array('f', profile_factors[profile_offsets[i]:profile_offsets[i + 1]])
+
+        self.loaded = True
+        self.version += 1
+        self.source = (mapped.data_version, self.version)
+        self.checked = self.source
+        self._csr = CSRGraph(ids, offsets, targets, weights, self.version, xs, ys)
+        self._notify('load')
+
+        for name, meta in mapped.meta['extras'].items():
+            prefix = f"{name}."
+            arrays = {
+                section[len(prefix):]: mapped.array(section)
+                for section in mapped.sections if section.startswith(prefix)
+            }
+            self.restored[name] = (self.version, meta, arrays)
+            if name in self.persisted:
+                self.persisted[name][1](*self.restored.pop(name))
+
+    def version_tag(self):
+        """Identifiant opaque de la version courante, stable tant que rien ne change"""
+        self.ensure_loaded()
+        return f"{self.epoch}-{self.version}"
+
+    def subscribe(self, listener):
+        """Enregistrer listener(event, args, version), appelé sous verrou après chaque mutation"""
+        with self.lock:
+            if listener not in self.listeners:
+                self.listeners.append(listener)
+
+    def _notify(self, event, *args):
+        for listener in self.listeners:
+            listener(event, args, self.version)
+
+    def csr(self):
+        """Vue CSR immuable de la version courante, construite à la demande"""
+        self.ensure_loaded()
+        csr = self._csr
+        if csr is not None and csr.version == self.version:
+            return csr
+        with self.lock:
+            if self._csr is None or self._csr.version != self.version:
+                with Metrics().phase('snapshot', 'csr_build'):
+                    self._csr = CSRGraph.from_adjacency(self.adjacency, self.version, self.nodes)
+            return self._csr
+
+    def time_costs(self):
+        """(CSR, TimeDependentCosts) cohérents de la version courante, construits à la demande"""
+        graph = self.csr()
+        costs = self._time_costs
+        if costs is not None and costs.version == graph.version:
+            return graph, costs
+        with self.lock:
+            graph = self.csr()
+            if self._time_costs is None or self._time_costs.version != graph.version:
+                with Metrics().phase('snapshot', 'profiles_build'):
+                    self._time_costs = TimeDependentCosts.build(graph, self.edges, self.profiles, Config.PROFILE_SLOTS)
+            return graph, self._time_costs
+
+    def invalidate(self):
+        """Oublier l'image courante ; elle sera relue au prochain accès."""
+        with self.lock:
+            self.loaded = False
+            self.nodes = {}
+            self.edges = {}
+            self.adjacency = {}
+            self.profiles = {}
+            self.version += 1
+            self._notify('invalidate')
+
+    # Mises à jour incrémentales (appelées après une écriture réussie en base)
+    def add_node(self, node_id, x, y, capacity=None):
+        with self.lock:
+            if self.loaded:
+                self.nodes[node_id] = {'x': x, 'y': y, 'capacity': capacity}
+                self.adjacency.setdefault(node_id, {})
+            self.version += 1
+            self._notify('add_node', node_id)
+
+    def update_node(self, node_id, x=None, y=None, capacity=None):
+        with self.lock:
+            if self.loaded and node_id in self.nodes:
+                node = self.nodes[node_id]
+                if x is not None:
+                    node['x'] = x
+                if y is not None:
+                    node['y'] = y
+                if capacity is not None:
+                    node['capacity'] = capacity
+            self.version += 1
+            self._notify('update_node', node_id)
+
+    def remove_node(self, node_id):
+        with self.lock:
+            if self.loaded and node_id in self.nodes:
+                # Les arêtes incidentes sont supprimées en cascade par la base
+                for key in [k for k in self.edges if node_id in k]:
+                    del self.edges[key]
+                    self.profiles.pop(key, None)
+                for neighbor in self.adjacency.pop(node_id, {}):
+                    self.adjacency[neighbor].pop(node_id, None)
+                del self.nodes[node_id]
+            self.version += 1
+            self._notify('remove_node', node_id)
+
+    def add_edge(self, u, v, weight, constraint_value=0):
+        with self.lock:
+            if self.loaded:
+                self.edges[(u, v)] = {
+                    'weight': weight,
+                    'constraint_value': constraint_value or 0
+                }
+                self._relink(u, v)
+            self.version += 1
+            self._notify('add_edge', u, v)
+
+    def update_edge(self, u, v, weight=None, constraint_value=None):
+        with self.lock:
+            if self.loaded and (u, v) in self.edges:
+                edge = self.edges[(u, v)]
+                if weight is not None:
+                    edge['weight'] = weight
+                if constraint_value is not None:
+                    edge['constraint_value'] = constraint_value
+                self._relink(u, v)
+                # Seul un poids change : le CSR courant est recopié et corrigé
+                # plutôt que reconstruit entièrement
+                csr = self._csr
+                if csr is not None and csr.version == self.version and u != v:
+                    self._csr = csr.with_weight(
+                        csr.index[u], csr.index[v], self.adjacency[u][v], self.version + 1
+                    )
+            self.version += 1
+            self._notify('update_edge', u, v)
+
+    def update_edges(self, updates):
+        """Plusieurs mises à jour (u, v, weight, constraint_value), une seule version.
+
+        Les écouteurs reçoivent un unique événement 'update_edges' dont les
+        arguments sont les clés (u, v) modifiées.
+        """
+        with self.lock:
+            if self.loaded:
+                patched = set()
+                for u, v, weight, constraint_value in updates:
+                    edge = self.edges.get((u, v))
+                    if edge is None:
+                        continue
+                    if weight is not None:
+                        edge['weight'] = weight
+                    if constraint_value is not None:
+                        edge['constraint_value'] = constraint_value
+                    self._relink(u, v)
+                    if u != v:
+                        patched.add((u, v))
+                csr = self._csr
+                if csr is not None and csr.version == self.version and patched:
+                    self._csr = csr.with_weights(
+                        {(csr.index[u], csr.index[v]): self.adjacency[u][v] for u, v in patched},
+                        self.version + 1
+                    )
+            self.version += 1
+            self._notify('update_edges', *[(u, v) for u, v, _, _ in updates])
+
+    def set_profile(self, u, v, factors):
+        """Profil horaire (array('f') de facteurs par créneau) de l'arête (u, v), None pour le retirer"""
+        with self.lock:
+            if self.loaded and (u, v) in self.edges:
+                if factors is None:
+                    self.profiles.pop((u, v), None)
+                else:
+                    self.profiles[(u, v)] = factors
+                # Les poids fixes ne changent pas : le CSR courant est repris
+                csr = self._csr
+                if csr is not None and csr.version == self.version:
+                    self._csr = csr.with_weights({}, self.version + 1)
+            self.version += 1
+            self._notify('update_profile', u, v)
+
+    def edge_weight(self, u, v):
+        """Poids total courant de l'adjacence u-v (None si absente)"""
+        return self.adjacency.get(u, {}).get(v)
+
+    def remove_edge(self, u, v):
+        with self.lock:
+            if self.loaded and self.edges.pop((u, v), None) is not None:
+                self.profiles.pop((u, v), None)
+                self._relink(u, v)
+            self.version += 1
+            self._notify('remove_edge', u, v)
+
+    def _relink(self, u, v):
+        """Recalculer le poids de l'adjacence u-v (graphe non orienté).
+
+        Les arêtes (u, v) et (v, u) peuvent coexister : on garde la plus légère.
+        """
+        if u == v:
+            return
+        weights = [
+            edge['weight'] + edge['constraint_value']
+            for edge in (self.edges.get((u, v)), self.edges.get((v, u)))
+            if edge is not None
+        ]
+        if weights:
+            self.adjacency.setdefault(u, {})[v] = min(weights)
+            self.adjacency.setdefault(v, {})[u] = min(weights)
+        else:
+            self.adjacency.get(u, {}).pop(v, None)
+            self.adjacency.get(v, {}).pop(u, None)
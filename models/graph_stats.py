@@ -0,0 +1,137 @@
+import threading
+from collections import Counter
+from models.components import ComponentIndex
+from models.graph_snapshot import GraphSnapshot
+
+class GraphStats:
+    """Statistiques du graphe tenues à jour au fil des mutations du snapshot.
+
+    Degrés, histogramme des degrés, totaux et poids total cumulé (poids +
+    contrainte, comme total_weight) sont ajustés à chaque événement ; les
+    composantes connexes sont celles de ComponentIndex. Le degré d'un nœud
+    est son nombre de lignes dans edges, comme l'ancienne requête SQL.
+    """
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    instance = super(GraphStats, cls).__new__(cls)
+                    instance._initialize()
+                    cls._instance = instance
+        return cls._instance
+
+    def _initialize(self):
+        self.snapshot = GraphSnapshot()
+        self.incident = None      # id -> clés (u, v) des arêtes incidentes
+        self.weights = {}         # (u, v) -> poids total (weight + constraint_value)
+        self.histogram = Counter()
+        self.total_weight = 0.0
+        self.components = ComponentIndex()
+        self.version = -1
+        self.snapshot.subscribe(self._on_change)
+
+    def summary(self):
+        # Les écouteurs s'exécutent sous le verrou du snapshot : on le prend
+        # aussi pour lire un état cohérent
+        self.snapshot.ensure_loaded()
+        with self.snapshot.lock:
+            if self.incident is None or self.version != self.snapshot.version:
+                self._rebuild()
+
+            nodes_count = len(self.incident)
+            degree_sum = sum(degree * count for degree, count in self.histogram.items())
+            return {
+                'nodes_count': nodes_count,
+                'edges_count': len(self.weights),
+                'average_degree': degree_sum / nodes_count if nodes_count else 0.0,
+                'degree_histogram': {str(degree): self.histogram[degree] for degree in sorted(self.histogram)},
+                'components_count': self.components.count(),
+                'total_edge_weight': self.total_weight
+            }
+
+    def _rebuild(self):
+        self.incident = {node_id: set() for node_id in self.snapshot.nodes}
+        self.weights = {}
+        self.total_weight = 0.0
+        for key, edge in self.snapshot.edges.items():
+            self.weights[key] = self._total(edge)
+            self.total_weight += self.weights[key]
+            for node_id in key:
+                self.incident.setdefault(node_id, set()).add(key)
+        self.histogram = Counter(len(keys) for keys in self.incident.values())
+        self.version = self.snapshot.version
+
+    # Maintenance incrémentale
+    def _on_change(self, event, args, version):
+        if self.incident is None or self.version != version - 1 or event in ('load', 'invalidate'):
+            self.incident = None
+            return
+
+        if event == 'add_node':
+            self._add_node(args[0])
+        elif event == 'remove_node':
+            node_id = args[0]
+            keys = self.incident.pop(node_id, None)
+            if keys is not None:
+                self._shift(node_id, len(keys), None)
+                for key in keys:
+                    self._drop_edge(key, node_id)
+        elif event == 'add_edge':
+            key = tuple(args)
+            edge = self.snapshot.edges.get(key)
+            if edge is not None:
+                self._set_edge(key, self._total(edge))
+        elif event in ('update_edge', 'update_edges'):
+            for key in ([tuple(args)] if event == 'update_edge' else args):
+                edge = self.snapshot.edges.get(key)
+                if edge is not None and key in self.weights:
+                    self.total_weight += self._total(edge) - self.weights[key]
+                    self.weights[key] = self._total(edge)
+        elif event == 'remove_edge':
+            key = tuple(args)
+            if key in self.weights:
+                self._drop_edge(key)
+        self.version = version
+
+    @staticmethod
+    def _total(edge):
+        return edge['weight'] + (edge['constraint_value'] or 0)
+
+    def _add_node(self, node_id):
+        if node_id not in self.incident:
+            self.incident[node_id] = set()
+            self.histogram[0] += 1
+
+    def _set_edge(self, key, weight):
+        if key in self.weights:
+            self.total_weight += weight - self.weights[key]
+            self.weights[key] = weight
+            return
+        self.weights[key] = weight
+        self.total_weight += weight
+        for node_id in set(key):
+            self._add_node(node_id)
+            keys = self.incident[node_id]
+            self._shift(node_id, len(keys), len(keys) + 1)
+            keys.add(key)
+
+    def _drop_edge(self, key, removed_node=None):
+        self.total_weight -= self.weights.pop(key)
+        for node_id in set(key):
+            if node_id == removed_node:
+                continue
+            keys = self.incident[node_id]
+            self._shift(node_id, len(keys), len(keys) - 1)
+            keys.discard(key)
+
+    def _shift(self, node_id, old_degree, new_degree):
+        """Déplacer un nœud d'une case de l'histogramme à une autre (None = absent)"""
+        if old_degree is not None:
+            self.histogram[old_degree] -= 1
+            if not self.histogram[old_degree]:
+                del self.histogram[old_degree]
+        if new_degree is not None:
+            self.histogram[new_degree] += 1
\ No newline at end of file
@@ -0,0 +1,169 @@
+import json
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from config import Config
+from models.coloring import Coloring
+from models.coloring_engine import ColoringEngine
+from models.graph_snapshot import GraphSnapshot
+from models.process_pool import ProcessPool
+from models.routing import RouteOptimizer, distance_rows
+
+class Job:
+    """Calcul soumis en arrière-plan ; son état est lu par GET /jobs/<id>"""
+
+    def __init__(self, kind, params, key, version):
+        self.id = uuid.uuid4().hex[:16]
+        self.kind = kind
+        self.params = params
+        self.key = key
+        self.version = version
+        self.future = None
+        self.status = 'queued'
+        self.result = None
+        self.error = None
+        self.submitted_at = time.time()
+        self.finished_at = None
+
+    def describe(self):
+        status = self.status
+        if status == 'queued' and self.future is not None and self.future.running():
+            status = 'running'
+        job = {
+            'id': self.id,
+            'kind': self.kind,
+            'params': self.params,
+            'graph_version': f"{GraphSnapshot().epoch}-{self.version}",
+            'status': status,
+            'submitted_at': self.submitted_at,
+            'finished_at': self.finished_at
+        }
+        if status == 'done':
+            job['result'] = self.result
+        elif status == 'failed':
+            job['error'] = self.error
+        return job
+
+class JobManager:
+    """Exécution en arrière-plan des algorithmes coûteux.
+
+    Coloriage et matrices de distances tournent dans un pool de processus
+    sur une copie du CSR de la version courante : le thread HTTP rend la
+    main aussitôt (202) et le GIL reste libre pour les autres requêtes.
+    Les tournées, qui s'appuient sur le snapshot et répartissent déjà leurs
+    phases lourdes dans le pool de RouteOptimizer, sont lancées dans un
+    thread. Un job identique (même type, mêmes paramètres, même version du
+    graphe) n'est calculé qu'une fois ; les jobs terminés sont oubliés
+    après Config.JOBS_TTL secondes.
+    """
+    KINDS = ('coloring', 'matrix', 'routes')
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    instance = super(JobManager, cls).__new__(cls)
+                    instance._initialize()
+                    cls._instance = instance
+        return cls._instance
+
+    def _initialize(self):
+        self.lock = threading.Lock()
+        self.snapshot = GraphSnapshot()
+        self.jobs = {}      # id -> Job
+        self.keys = {}      # (type, paramètres, version) -> Job
+        self.processes = ProcessPool(lambda: Config.JOBS_WORKERS)
+        self._threads = None
+
+    def submit(self, kind, params):
+        """Lancer un calcul ; renvoie (job, créé). Un job identique en cours ou
+        terminé sur la même version du graphe est renvoyé tel quel."""
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown job kind '{kind}', expected one of: {', '.join(self.KINDS)}")
+
+        graph = self.snapshot.csr()
+        key = (kind, json.dumps(params, sort_keys=True), graph.version)
+        with self.lock:
+            self._expire()
+            job = self.keys.get(key)
+            if job is not None and job.status != 'failed':
+                return job, False
+
+            job = Job(kind, params, key, graph.version)
+            self.jobs[job.id] = job
+            self.keys[key] = job
+            job.future = self._dispatch(kind, graph, params)
+        job.future.add_done_callback(lambda future: self._finish(job, future))
+        return job, True
+
+    def get(self, job_id):
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def _dispatch(self, kind, graph, params):
+        if kind == 'routes':
+            return self._thread_pool().submit(RouteOptimizer().plan_routes, **params)
+
+        function = PROCESS_JOBS[kind]
+        try:
+            return self.processes.submit(function, graph, **params)
+        except (OSError, RuntimeError):
+            # Pool indisponible ou cassé (processus tué) : recréé au prochain
+            # job, celui-ci passe par un thread
+            return self._thread_pool().submit(function, graph, **params)
+
+    def _finish(self, job, future):
+        try:
+            result = future.result()
+            if job.kind == 'coloring':
+                # Le moteur incrémental repart de ce coloriage s'il est à jour
+                ColoringEngine().adopt(job.params['strategy'], job.version, result)
+                result = Coloring.to_days(result)
+            job.result = result
+            job.status = 'done'
+        except Exception as e:
+            if isinstance(e, BrokenProcessPool):
+                # Processus tué pendant le calcul : pool neuf pour les suivants
+                self.processes.reset()
+            job.error = str(e) or type(e).__name__
+            job.status = 'failed'
+        job.finished_at = time.time()
+
+    def _expire(self):
+        deadline = time.time() - Config.JOBS_TTL
+        for job in [job for job in self.jobs.values() if job.finished_at and job.finished_at < deadline]:
+            del self.jobs[job.id]
+            if self.keys.get(job.key) is job:
+                del self.keys[job.key]
+
+    def _thread_pool(self):
+        if self._threads is None:
+            self._threads = ThreadPoolExecutor(max_workers=Config.JOBS_WORKERS, thread_name_prefix='wastegraph-job')
+        return self._threads
+
+# Fonctions de niveau module : elles doivent être sérialisables pour le pool
+def coloring_job(graph, strategy):
+    return ColoringEngine.compute(graph, strategy)
+
+def matrix_job(graph, sources, targets):
+    """Même résultat que Dijkstra.distance_matrix, sans le cache du processus principal"""
+    unknown = [node for node in dict.fromkeys(sources + targets) if node not in graph.index]
+    if unknown:
+        return {'distances': [], 'error': f"Unknown nodes: {', '.join(unknown)}"}
+
+    rows = distance_rows(graph, [graph.index[node] for node in sources], [graph.index[node] for node in targets])
+    return {
+        'sources': sources,
+        'targets': targets,
+        'distances': [[d if d != float('inf') else None for d in row] for row in rows]
+    }
+
+# Type -> fonction exécutée dans le pool, appelée avec (graph, **paramètres)
+PROCESS_JOBS = {
+    'coloring': coloring_job,
+    'matrix': matrix_job
+}
\ No newline at end of file
@@ -0,0 +1,159 @@
+import heapq
+import threading
+from array import array
+from collections import OrderedDict
+from config import Config
+
+class ShortestPathTree:
+    """Arbre des plus courts chemins depuis une source, pour une version du graphe"""
+    __slots__ = ('source', 'version', 'distances', 'previous')
+
+    def __init__(self, source, version, distances, previous):
+        self.source = source          # index CSR de la source
+        self.version = version        # version du snapshot utilisée
+        self.distances = distances    # array('d') indexé par nœud
+        self.previous = previous      # array('i'), -1 pour la racine / inaccessible
+
+    def path_to(self, target):
+        """Indices du chemin source -> target, vide si inaccessible"""
+        if self.distances[target] == float('inf'):
+            return []
+        path = []
+        current = target
+        while current != -1:
+            path.append(current)
+            current = self.previous[current]
+        path.reverse()
+        return path
+
+    def repaired(self, graph, a, b, old_weight, new_weight):
+        """Nouvel arbre valable pour graph après changement du poids de l'arête a-b.
+
+        Seuls les nœuds dont la distance peut changer sont recalculés :
+        - baisse : propagation à partir de l'extrémité améliorée ;
+        - hausse d'une arête de l'arbre : le sous-arbre coupé est réinitialisé
+          puis reconstruit depuis sa frontière avec le reste de l'arbre.
+        """
+        distances = array('d', self.distances)
+        previous = array('i', self.previous)
+        offsets, targets, weights = graph.offsets, graph.targets, graph.weights
+        queue = []
+
+        if new_weight < old_weight:
+            for x, y in ((a, b), (b, a)):
+                if distances[x] + new_weight < distances[y]:
+                    distances[y] = distances[x] + new_weight
+                    previous[y] = x
+                    heapq.heappush(queue, (distances[y], y))
+        else:
+            if previous[b] == a:
+                child = b
+            elif previous[a] == b:
+                child = a
+            else:
+                # Arête hors de l'arbre : aucune distance ne change
+                return ShortestPathTree(self.source, graph.version, distances, previous)
+
+            # Sous-arbre enraciné en child (les arêtes de l'arbre sont des arêtes du graphe)
+            subtree = {child}
+            stack = [child]
+            while stack:
+                x = stack.pop()
+                for k in range(offsets[x], offsets[x + 1]):
+                    y = targets[k]
+                    if previous[y] == x and y not in subtree:
+                        subtree.add(y)
+                        stack.append(y)
+
+            for x in subtree:
+                distances[x] = float('inf')
+                previous[x] = -1
+            for x in subtree:
+                for k in range(offsets[x], offsets[x + 1]):
+                    y = targets[k]
+                    if y not in subtree and distances[y] + weights[k] < distances[x]:
+                        distances[x] = distances[y] + weights[k]
+                        previous[x] = y
+                if distances[x] != float('inf'):
+                    heapq.heappush(queue, (distances[x], x))
+
+        # Propagation de type Dijkstra limitée aux nœuds améliorés
+        while queue:
+            distance, x = heapq.heappop(queue)
+            if distance > distances[x]:
+                continue
+            for k in range(offsets[x], offsets[x + 1]):
+                y = targets[k]
+                candidate = distance + weights[k]
+                if candidate < distances[y]:
+                    distances[y] = candidate
+                    previous[y] = x
+                    heapq.heappush(queue, (candidate, y))
+
+        return ShortestPathTree(self.source, graph.version, distances, previous)
+
+class ShortestPathCache:
+    """Cache LRU des arbres de plus courts chemins, partagé par le processus.
+
+    Une entrée n'est valable que pour la version du graphe qui l'a produite :
+    une lecture avec une autre version la considère comme absente.
+    """
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    instance = super(ShortestPathCache, cls).__new__(cls)
+                    instance._initialize()
+                    cls._instance = instance
+        return cls._instance
+
+    def _initialize(self):
+        self.lock = threading.Lock()
+        self.capacity = Config.SPT_CACHE_SIZE
+        self.trees = OrderedDict()   # id source -> ShortestPathTree
+
+    def get(self, source_id, version):
+        with self.lock:
+            tree = self.trees.get(source_id)
+            if tree is None or tree.version != version:
+                # Un lecteur en retard ne jette pas un arbre plus récent que sa version
+                if tree is not None and tree.version < version:
+                    del self.trees[source_id]
+                return None
+            self.trees.move_to_end(source_id)
+            return tree
+
+    def put(self, source_id, tree):
+        if self.capacity <= 0:
+            return
+        with self.lock:
+            current = self.trees.get(source_id)
+            if current is not None and current.version > tree.version:
+                return
+            self.trees[source_id] = tree
+            self.trees.move_to_end(source_id)
+            while len(self.trees) > self.capacity:
+                self.trees.popitem(last=False)
+
+    def repair(self, graph, u, v, old_weight, new_weight, old_version):
+        """Réparer les arbres de old_version après un changement de poids u-v.
+
+        graph est le CSR de la nouvelle version (mêmes indices, seul le poids
+        de u-v diffère). Les arbres d'autres versions sont périmés et oubliés.
+        """
+        a, b = graph.index[u], graph.index[v]
+        with self.lock:
+            for source_id, tree in list(self.trees.items()):
+                if tree.version != old_version:
+                    del self.trees[source_id]
+                elif new_weight == old_weight:
+                    self.trees[source_id] = ShortestPathTree(tree.source, graph.version, tree.distances, tree.previous)
+                else:
+                    self.trees[source_id] = tree.repaired(graph, a, b, old_weight, new_weight)
+
+    def clear(self):
+        with self.lock:
+            self.trees.clear()
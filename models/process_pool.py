@@ -0,0 +1,42 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+def _context():
+    # forkserver : les processus partent d'un serveur mono-thread lancé tôt,
+    # pas d'un fork du serveur HTTP dont d'autres threads tiennent des verrous
+    # (snapshot, pool de connexions, métriques, connexions sqlite)
+    method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+    return multiprocessing.get_context(method)
+
+class ProcessPool:
+    """Pool de processus créé au premier usage et recréé s'il se casse.
+
+    workers est appelé à la création du pool (valeur lue dans Config). Les
+    erreurs de submit (OSError, RuntimeError dont BrokenProcessPool) sont
+    propagées après abandon du pool : l'appelant se replie sur un calcul
+    local et le prochain appel repart d'un pool neuf. Un appelant qui voit
+    un résultat échouer pour la même raison appelle reset().
+    """
+
+    def __init__(self, workers):
+        self.workers = workers
+        self.lock = threading.Lock()
+        self._executor = None
+
+    def submit(self, function, *args, **kwargs):
+        try:
+            with self.lock:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers(), mp_context=_context())
+                executor = self._executor
+            return executor.submit(function, *args, **kwargs)
+        except (OSError, RuntimeError):
+            self.reset()
+            raise
+
+    def reset(self):
+        with self.lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
@@ -0,0 +1,291 @@
+import random
+import time
+from array import array
+from concurrent.futures import wait
+from config import Config
+from metrics import Metrics
+from models.coloring import Coloring
+from models.dijkstra import Dijkstra
+from models.graph_snapshot import GraphSnapshot
+from models.process_pool import ProcessPool
+
+class RouteOptimizer:
+    """Tournées de collecte à capacité limitée (CVRP) pour un jour donné.
+
+    Les bacs du jour viennent du coloriage, les distances d'une matrice
+    calculée avec les arbres de plus courts chemins de Dijkstra. Une
+    construction de Clarke-Wright est ensuite améliorée par recherche locale
+    en parallèle dans un pool de processus, dans un budget de temps.
+    """
+    _pool = ProcessPool(lambda: Config.ROUTES_WORKERS)
+
+    def __init__(self):
+        self.snapshot = GraphSnapshot()
+        self.dijkstra = Dijkstra()
+        self.coloring = Coloring()
+
+    def plan_routes(self, day, depot, vehicle_capacity=None, time_budget=None, strategy='welsh_powell'):
+        vehicle_capacity = vehicle_capacity or Config.VEHICLE_CAPACITY
+        time_budget = Config.ROUTES_TIME_BUDGET if time_budget is None else time_budget
+        time_budget = max(0.0, min(time_budget, Config.ROUTES_MAX_TIME_BUDGET))
+
+        metrics = Metrics()
+        with metrics.phase('routes', 'graph'):
+            graph = self.snapshot.csr()
+        if depot not in graph.index:
+            return {'routes': [], 'error': f'Depot node {depot} not found'}
+
+        colors = self.coloring.color_graph(strategy)
+        bins = [node for node, info in colors.items() if info['day'] == day and node != depot]
+
+        # Demande = capacité du bac ; un bac plus gros qu'un camion ne peut être servi
+        nodes = self.snapshot.nodes
+        demands = {node: (nodes.get(node) or {}).get('capacity') or 0 for node in bins}
+        oversized = [node for node in bins if demands[node] > vehicle_capacity]
+        bins = [node for node in bins if demands[node] <= vehicle_capacity]
+
+        # Les bacs hors de la composante du dépôt ne peuvent pas être desservis
+        reachable = {node: self.dijkstra.components.connected(depot, node, graph.version) for node in bins}
+        if None in reachable.values():
+            # Graphe modifié entre-temps : l'arbre du dépôt tranche sur ce CSR
+            depot_tree = self.dijkstra.shortest_path_tree(graph, depot)
+            reachable = {node: depot_tree.distances[graph.index[node]] != float('inf') for node in bins}
+        unreachable = [node for node in bins if not reachable[node]]
+        bins = [node for node in bins if reachable[node]]
+
+        points = [depot] + bins
+        indices = [graph.index[node] for node in points]
+        n = len(points)
+        with metrics.phase('routes', 'matrix'):
+            matrix = self._distance_matrix(graph, indices)
+        demand_list = [0] + [demands[node] for node in points[1:]]
+
+        with metrics.phase('routes', 'construction'):
+            routes = clarke_wright(matrix, n, demand_list, vehicle_capacity)
+        construction = total_cost(matrix, n, routes)
+        with metrics.phase('routes', 'improvement'):
+            routes = self._improve(matrix, n, demand_list, vehicle_capacity, routes, time_budget)
+
+        result_routes = []
+        with metrics.phase('routes', 'expansion'):
+            for route in routes:
+                stops = [points[k] for k in route]
+                # Chemin détaillé : les étapes sont courtes, A* les déplie à peu de frais
+                legs = [0] + route + [0]
+                path = [depot]
+                for a, b in zip(legs, legs[1:]):
+                    leg, _, _ = self.dijkstra.point_to_point(graph, indices[a], indices[b], 'astar')
+                    path.extend(graph.ids[i] for i in leg[1:])
+                result_routes.append({
+                    'stops': stops,
+                    'path': path,
+                    'distance': route_cost(matrix, n, route),
+                    'load': sum(demand_list[k] for k in route)
+                })
+
+        return {
+            'day': day,
+            'depot': depot,
+            'vehicle_capacity': vehicle_capacity,
+            'routes': result_routes,
+            'total_distance': sum(route['distance'] for route in result_routes),
+            'construction_distance': construction,
+            'unreachable': unreachable,
+            'oversized': oversized
+        }
+
+    def _distance_matrix(self, graph, indices):
+        """Matrice plate n x n des distances entre points, lignes calculées en parallèle"""
+        workers = max(1, Config.ROUTES_WORKERS)
+        chunks = [indices[k::workers] for k in range(workers)]
+        try:
+            parts = [self._pool.submit(distance_rows, graph, chunk, indices) for chunk in chunks if chunk]
+            rows = {}
+            for chunk, part in zip(chunks, parts):
+                rows.update(zip(chunk, part.result()))
+        except (OSError, RuntimeError):
+            self._pool.reset()
+            rows = dict(zip(indices, distance_rows(graph, indices, indices)))
+        matrix = array('d')
+        for source in indices:
+            matrix.extend(rows[source])
+        return matrix
+
+    def _improve(self, matrix, n, demands, capacity, routes, time_budget):
+        if n <= 2 or time_budget <= 0:
+            return local_search(matrix, n, demands, capacity, routes, 0, 0)
+
+        # Une recherche locale perturbée par processus, graines différentes
+        jobs = [(matrix, n, demands, capacity, routes, seed, time_budget) for seed in range(Config.ROUTES_WORKERS)]
+        try:
+            futures = [self._pool.submit(local_search, *job) for job in jobs]
+        except (OSError, RuntimeError):
+            # Pas de processus disponibles : une seule recherche dans le thread courant
+            return local_search(*jobs[0])
+
+        # Marge pour la descente initiale, qui n'est pas interrompue par le budget
+        done, _ = wait(futures, timeout=time_budget + 10)
+        candidates = [routes] + [future.result() for future in done if future.exception() is None]
+        return min(candidates, key=lambda candidate: total_cost(matrix, n, candidate))
+
+# Fonctions de niveau module : elles doivent être sérialisables pour le pool
+def distance_rows(graph, sources, targets):
+    """Distances de chaque source vers toutes les cibles (un arbre de Dijkstra par source)"""
+    rows = []
+    for source in sources:
+        tree, _ = Dijkstra.build_tree(graph, source)
+        rows.append(array('d', (tree.distances[target] for target in targets)))
+    return rows
+
+def route_cost(matrix, n, route):
+    if not route:
+        return 0.0
+    cost = matrix[route[0]] + matrix[route[-1] * n]
+    for a, b in zip(route, route[1:]):
+        cost += matrix[a * n + b]
+    return cost
+
+def total_cost(matrix, n, routes):
+    return sum(route_cost(matrix, n, route) for route in routes)
+
+def clarke_wright(matrix, n, demands, capacity):
+    """Heuristique des économies de Clarke-Wright (0 = dépôt)"""
+    routes = {k: [k] for k in range(1, n)}
+    route_of = {k: k for k in range(1, n)}
+    loads = {k: demands[k] for k in range(1, n)}
+
+    savings = sorted(
+        ((matrix[i] + matrix[j] - matrix[i * n + j], i, j) for i in range(1, n) for j in range(i + 1, n)),
+        reverse=True
+    )
+    for saving, i, j in savings:
+        if saving <= 0:
+            break
+        a, b = route_of[i], route_of[j]
+        if a == b or loads[a] + loads[b] > capacity:
+            continue
+        first, second = routes[a], routes[b]
+        # i et j doivent être en bout de tournée pour pouvoir les relier
+        if first[-1] == i and second[0] == j:
+            merged = first + second
+        elif first[0] == i and second[-1] == j:
+            merged = second + first
+        elif first[-1] == i and second[-1] == j:
+            merged = first + second[::-1]
+        elif first[0] == i and second[0] == j:
+            merged = first[::-1] + second
+        else:
+            continue
+        routes[a] = merged
+        loads[a] += loads[b]
+        del routes[b], loads[b]
+        for k in second:
+            route_of[k] = a
+
+    return list(routes.values())
+
+def local_search(matrix, n, demands, capacity, routes, seed, time_budget):
+    """Recherche locale itérée : descente 2-opt + déplacement, puis perturbations"""
+    rng = random.Random(seed)
+    deadline = time.monotonic() + time_budget
+    current = _descend(matrix, n, demands, capacity, [list(route) for route in routes])
+    current_cost = total_cost(matrix, n, current)
+    best, best_cost = current, current_cost
+
+    while time.monotonic() < deadline:
+        candidate = _perturb(matrix, n, demands, capacity, current, rng)
+        candidate = _descend(matrix, n, demands, capacity, candidate, deadline)
+        cost = total_cost(matrix, n, candidate)
+        # Critère d'acceptation légèrement permissif pour sortir des minima locaux
+        if cost < current_cost * 1.01:
+            current, current_cost = candidate, cost
+        if cost < best_cost - 1e-9:
+            best, best_cost = candidate, cost
+    return best
+
+def _descend(matrix, n, demands, capacity, routes, deadline=None):
+    """Appliquer 2-opt et déplacements jusqu'à un minimum local (ou l'échéance)"""
+    improved = True
+    while improved and (deadline is None or time.monotonic() < deadline):
+        improved = False
+        for route in routes:
+            improved |= _two_opt(matrix, n, route)
+        improved |= _relocate(matrix, n, demands, capacity, routes)
+        routes = [route for route in routes if route]
+    return routes
+
+def _two_opt(matrix, n, route):
+    improved = False
+    size = len(route)
+    for i in range(size - 1):
+        before = route[i - 1] if i > 0 else 0
+        for j in range(i + 1, size):
+            after = route[j + 1] if j + 1 < size else 0
+            delta = (matrix[before * n + route[j]] + matrix[route[i] * n + after]
+                     - matrix[before * n + route[i]] - matrix[route[j] * n + after])
+            if delta < -1e-9:
+                route[i:j + 1] = route[i:j + 1][::-1]
+                improved = True
+    return improved
+
+def _relocate(matrix, n, demands, capacity, routes):
+    improved = False
+    loads = [sum(demands[k] for k in route) for route in routes]
+    for a, source in enumerate(routes):
+        i = 0
+        while i < len(source):
+            customer = source[i]
+            before = source[i - 1] if i > 0 else 0
+            after = source[i + 1] if i + 1 < len(source) else 0
+            gain = matrix[before * n + customer] + matrix[customer * n + after] - matrix[before * n + after]
+            best = None
+            for b, target in enumerate(routes):
+                if b == a or loads[b] + demands[customer] > capacity:
+                    continue
+                for j in range(len(target) + 1):
+                    left = target[j - 1] if j > 0 else 0
+                    right = target[j] if j < len(target) else 0
+                    cost = matrix[left * n + customer] + matrix[customer * n + right] - matrix[left * n + right]
+                    if cost < gain - 1e-9 and (best is None or cost < best[0]):
+                        best = (cost, b, j)
+            if best is None:
+                i += 1
+                continue
+            _, b, j = best
+            del source[i]
+            routes[b].insert(j, customer)
+            loads[a] -= demands[customer]
+            loads[b] += demands[customer]
+            improved = True
+    return improved
+
+def _perturb(matrix, n, demands, capacity, routes, rng):
+    """Retirer quelques bacs au hasard puis les réinsérer au meilleur endroit"""
+    routes = [list(route) for route in routes]
+    customers = [k for route in routes for k in route]
+    if not customers:
+        return routes
+    removed = rng.sample(customers, max(1, len(customers) // 10))
+    removed_set = set(removed)
+    routes = [[k for k in route if k not in removed_set] for route in routes]
+    loads = [sum(demands[k] for k in route) for route in routes]
+
+    for customer in removed:
+        best = None
+        for b, target in enumerate(routes):
+            if loads[b] + demands[customer] > capacity:
+                continue
+            for j in range(len(target) + 1):
+                left = target[j - 1] if j > 0 else 0
+                right = target[j] if j < len(target) else 0
+                cost = matrix[left * n + customer] + matrix[customer * n + right] - matrix[left * n + right]
+                if best is None or cost < best[0]:
+                    best = (cost, b, j)
+        if best is None:
+            routes.append([customer])
+            loads.append(demands[customer])
+        else:
+            _, b, j = best
+            routes[b].insert(j, customer)
+            loads[b] += demands[customer]
+    return [route for route in routes if route]
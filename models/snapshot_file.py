@@ -0,0 +1,87 @@
+import json
+import mmap
+import os
+import struct
+import sys
+
+# En-tête : signature, longueur de l'en-tête JSON, puis l'en-tête lui-même ;
+# les sections (tableaux bruts) suivent, alignées sur 8 octets
+MAGIC = b'WGSNAP\x00\x01'
+FORMAT_VERSION = 1
+_LENGTH = struct.Struct('<I')
+
+def _aligned(offset):
+    return (offset + 7) & ~7
+
+def write_snapshot(path, data_version, meta, sections):
+    """Écrire un fichier de snapshot de façon atomique.
+
+    sections : nom -> array (ou memoryview) ; meta : dict sérialisable en
+    JSON. Le fichier est écrit à côté puis renommé : un processus qui l'a
+    déjà projeté garde l'ancienne version.
+    """
+    layout = {}
+    offset = 0
+    for name, data in sections.items():
+        view = memoryview(data)
+        layout[name] = {'offset': offset, 'typecode': view.format, 'length': len(view)}
+        offset = _aligned(offset + view.nbytes)
+
+    header = json.dumps({
+        'format': FORMAT_VERSION,
+        'byteorder': sys.byteorder,
+        'data_version': data_version,
+        'meta': meta,
+        'sections': layout
+    }).encode()
+    base = _aligned(len(MAGIC) + _LENGTH.size + len(header))
+
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, 'wb') as stream:
+        stream.write(MAGIC + _LENGTH.pack(len(header)) + header)
+        for name, data in sections.items():
+            stream.seek(base + layout[name]['offset'])
+            stream.write(memoryview(data).cast('B'))
+        stream.truncate(base + offset)
+        stream.flush()
+        os.fsync(stream.fileno())
+    os.replace(temporary, path)
+
+class MappedSnapshot:
+    """Fichier de snapshot projeté en mémoire (lecture seule).
+
+    Les sections sont des memoryview sur la projection, sans copie : les
+    processus qui ouvrent le même fichier partagent ses pages. La
+    projection reste vivante tant qu'une vue y fait référence.
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as stream:
+            self.buffer = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+
+        prefix = len(MAGIC) + _LENGTH.size
+        if len(self.buffer) < prefix or self.buffer[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a graph snapshot")
+        (length,) = _LENGTH.unpack_from(self.buffer, len(MAGIC))
+        header = json.loads(self.buffer[prefix:prefix + length])
+        if header['format'] != FORMAT_VERSION or header['byteorder'] != sys.byteorder:
+            raise ValueError(f"{path} was written in an incompatible format")
+
+        self.data_version = header['data_version']
+        self.meta = header['meta']
+        self.sections = header['sections']
+        self.base = _aligned(prefix + length)
+        end = max((self._end(section) for section in self.sections.values()), default=self.base)
+        if end > len(self.buffer):
+            raise ValueError(f"{path} is truncated")
+
+    def _end(self, section):
+        return self.base + section['offset'] + section['length'] * struct.calcsize(section['typecode'])
+
+    def __contains__(self, name):
+        return name in self.sections
+
+    def array(self, name):
+        section = self.sections[name]
+        start = self.base + section['offset']
+        return memoryview(self.buffer)[start:self._end(section)].cast(section['typecode'])
\ No newline at end of file
@@ -0,0 +1,220 @@
+import heapq
+import math
+import threading
+from models.graph_snapshot import GraphSnapshot
+
+class GridIndex:
+    """Grille uniforme sur les coordonnées des nœuds.
+
+    Chaque cellule carrée de côté cell_size liste les nœuds qu'elle contient.
+    La taille de cellule vise quelques nœuds par cellule ; les plus proches
+    voisins sont cherchés par anneaux de cellules concentriques.
+    """
+    TARGET_PER_CELL = 4
+
+    def __init__(self, points, cell_size=None):
+        self.points = dict(points)        # id -> (x, y)
+        self.cell_size = cell_size or self._auto_cell_size(self.points.values())
+        self.cells = {}                   # (cx, cy) -> [id, ...]
+        self.bounds = None                # (min_cx, min_cy, max_cx, max_cy)
+        for node_id, (x, y) in self.points.items():
+            self._add_to_cell(node_id, x, y)
+
+    @classmethod
+    def _auto_cell_size(cls, coordinates):
+        coordinates = list(coordinates)
+        if len(coordinates) < 2:
+            return 1.0
+        xs = [x for x, _ in coordinates]
+        ys = [y for _, y in coordinates]
+        width, height = max(xs) - min(xs), max(ys) - min(ys)
+        extent = max(width, height)
+        if extent <= 0:
+            # Tous les nœuds au même endroit : une seule cellule suffit
+            return 1.0
+        # Surface pour une répartition en 2D ; pour des nœuds (presque)
+        # alignés, la surface s'effondre et c'est la longueur qui compte
+        per_cell = cls.TARGET_PER_CELL / len(coordinates)
+        return max(math.sqrt(width * height * per_cell), extent * per_cell)
+
+    def __len__(self):
+        return len(self.points)
+
+    def _cell(self, x, y):
+        return math.floor(x / self.cell_size), math.floor(y / self.cell_size)
+
+    def _add_to_cell(self, node_id, x, y):
+        cx, cy = self._cell(x, y)
+        self.cells.setdefault((cx, cy), []).append(node_id)
+        if self.bounds is None:
+            self.bounds = (cx, cy, cx, cy)
+        else:
+            min_cx, min_cy, max_cx, max_cy = self.bounds
+            self.bounds = (min(min_cx, cx), min(min_cy, cy), max(max_cx, cx), max(max_cy, cy))
+
+    # Mises à jour
+    def insert(self, node_id, x, y):
+        if node_id in self.points:
+            self.remove(node_id)
+        self.points[node_id] = (x, y)
+        self._add_to_cell(node_id, x, y)
+
+    def remove(self, node_id):
+        position = self.points.pop(node_id, None)
+        if position is None:
+            return
+        key = self._cell(*position)
+        bucket = self.cells[key]
+        bucket.remove(node_id)
+        if not bucket:
+            # Les bornes restent larges : elles ne servent qu'à arrêter les recherches
+            del self.cells[key]
+
+    # Requêtes
+    def nearest(self, x, y, k=1):
+        """Les k nœuds les plus proches : liste de (distance, id) croissante"""
+        if k <= 0 or not self.points:
+            return []
+        if k >= len(self.points):
+            return sorted((math.hypot(px - x, py - y), node_id) for node_id, (px, py) in self.points.items())
+        cx, cy = self._cell(x, y)
+        min_cx, min_cy, max_cx, max_cy = self.bounds
+        # Anneaux entièrement hors de la grille : inutile de les parcourir
+        ring = max(min_cx - cx, cx - max_cx, min_cy - cy, cy - max_cy, 0)
+        last_ring = max(cx - min_cx, max_cx - cx, cy - min_cy, max_cy - cy)
+
+        best = []   # tas max de (-distance, id)
+        while ring <= last_ring:
+            for key in self._ring(cx, cy, ring):
+                for node_id in self.cells.get(key, ()):
+                    px, py = self.points[node_id]
+                    distance = math.hypot(px - x, py - y)
+                    if len(best) < k:
+                        heapq.heappush(best, (-distance, node_id))
+                    elif distance < -best[0][0]:
+                        heapq.heapreplace(best, (-distance, node_id))
+            # Tout nœud d'un anneau suivant est à au moins ring * cell_size
+            if len(best) == k and -best[0][0] <= ring * self.cell_size:
+                break
+            ring += 1
+        return sorted((-distance, node_id) for distance, node_id in best)
+
+    def _ring(self, cx, cy, ring):
+        min_cx, min_cy, max_cx, max_cy = self.bounds
+        if ring == 0:
+            yield cx, cy
+            return
+        low_x, high_x = max(cx - ring, min_cx), min(cx + ring, max_cx)
+        for y in (cy - ring, cy + ring):
+            if min_cy <= y <= max_cy:
+                for x in range(low_x, high_x + 1):
+                    yield x, y
+        low_y, high_y = max(cy - ring + 1, min_cy), min(cy + ring - 1, max_cy)
+        for x in (cx - ring, cx + ring):
+            if min_cx <= x <= max_cx:
+                for y in range(low_y, high_y + 1):
+                    yield x, y
+
+    def within(self, x, y, radius):
+        """Nœuds à distance <= radius : liste de (distance, id) croissante"""
+        if radius < 0 or not self.points:
+            return []
+        min_cx, min_cy, max_cx, max_cy = self.bounds
+        low_x, low_y = self._cell(x - radius, y - radius)
+        high_x, high_y = self._cell(x + radius, y + radius)
+        low_x, low_y = max(low_x, min_cx), max(low_y, min_cy)
+        high_x, high_y = min(high_x, max_cx), min(high_y, max_cy)
+
+        found = []
+        # Grand rayon : parcourir les cellules occupées plutôt que le rectangle
+        if (high_x - low_x + 1) * (high_y - low_y + 1) > len(self.cells):
+            keys = [key for key in self.cells if low_x <= key[0] <= high_x and low_y <= key[1] <= high_y]
+        else:
+            keys = [(cx, cy) for cx in range(low_x, high_x + 1) for cy in range(low_y, high_y + 1)]
+        for key in keys:
+            for node_id in self.cells.get(key, ()):
+                px, py = self.points[node_id]
+                distance = math.hypot(px - x, py - y)
+                if distance <= radius:
+                    found.append((distance, node_id))
+        found.sort()
+        return found
+
+class SpatialIndex:
+    """Index spatial des nœuds du snapshot, tenu à jour par ses événements.
+
+    La grille est reconstruite au chargement, après une invalidation ou
+    quand le nombre de nœuds a trop changé depuis le choix de la taille
+    de cellule ; sinon les nœuds ajoutés, déplacés ou supprimés sont
+    simplement reclassés.
+    """
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    instance = super(SpatialIndex, cls).__new__(cls)
+                    instance._initialize()
+                    cls._instance = instance
+        return cls._instance
+
+    def _initialize(self):
+        self.snapshot = GraphSnapshot()
+        self.grid = None
+        self.built_size = 0
+        self.version = -1
+        self.snapshot.subscribe(self._on_change)
+
+    def nearest(self, x, y, k=1):
+        self.snapshot.ensure_loaded()
+        # Les écouteurs s'exécutent sous le verrou du snapshot : les requêtes
+        # le prennent aussi pour lire une grille cohérente
+        with self.snapshot.lock:
+            return self._describe(self._current().nearest(x, y, k))
+
+    def within(self, x, y, radius):
+        self.snapshot.ensure_loaded()
+        with self.snapshot.lock:
+            return self._describe(self._current().within(x, y, radius))
+
+    def _current(self):
+        size = len(self.snapshot.nodes)
+        if (self.grid is None or self.version != self.snapshot.version
+                or not self.built_size / 4 <= size <= self.built_size * 4 + 16):
+            self._rebuild()
+        return self.grid
+
+    def _rebuild(self):
+        nodes = self.snapshot.nodes
+        self.grid = GridIndex({node_id: (node['x'], node['y']) for node_id, node in nodes.items()})
+        self.built_size = len(nodes)
+        self.version = self.snapshot.version
+
+    def _describe(self, matches):
+        nodes = self.snapshot.nodes
+        return [
+            {
+                'id': node_id,
+                'x': nodes[node_id]['x'],
+                'y': nodes[node_id]['y'],
+                'capacity': nodes[node_id]['capacity'],
+                'distance': distance
+            }
+            for distance, node_id in matches
+        ]
+
+    def _on_change(self, event, args, version):
+        if self.grid is None or self.version != version - 1 or event in ('load', 'invalidate'):
+            self.grid = None
+            return
+
+        if event in ('add_node', 'update_node'):
+            node = self.snapshot.nodes.get(args[0])
+            if node is not None and self.grid.points.get(args[0]) != (node['x'], node['y']):
+                self.grid.insert(args[0], node['x'], node['y'])
+        elif event == 'remove_node':
+            self.grid.remove(args[0])
+        # Les événements d'arêtes ne déplacent aucun nœud
+        self.version = version
\ No newline at end of file
@@ -0,0 +1,88 @@
+import sys
+from array import array
+
+MINUTES_PER_DAY = 24 * 60
+
+def parse_time(value):
+    """Minutes depuis minuit pour "HH:MM" ou un nombre de minutes ; ValueError sinon"""
+    text = str(value).strip()
+    if ':' in text:
+        hours, _, minutes = text.partition(':')
+        if not (hours.isdigit() and minutes.isdigit()) or int(hours) > 23 or int(minutes) > 59:
+            raise ValueError(f"'{value}' is not a time of day (HH:MM)")
+        return int(hours) * 60 + int(minutes)
+    minutes = float(text)
+    if not 0 <= minutes < MINUTES_PER_DAY:
+        raise ValueError(f"'{value}' is not a time of day (HH:MM)")
+    return minutes
+
+def format_time(minutes):
+    """"HH:MM" de l'heure atteinte, modulo un jour"""
+    minutes = int(round(minutes)) % MINUTES_PER_DAY
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+def encode_profile(factors):
+    """Facteurs (array('f')) en float32 petit-boutiste, tels que stockés en base"""
+    data = array('f', factors)
+    if sys.byteorder == 'big':
+        data.byteswap()
+    return data.tobytes()
+
+def decode_profile(blob):
+    data = array('f')
+    data.frombytes(blob)
+    if sys.byteorder == 'big':
+        data.byteswap()
+    return data
+
+class TimeDependentCosts:
+    """Coûts par créneau horaire des adjacences profilées d'un CSR.
+
+    entries[k] vaut -1 si l'adjacence k du CSR a un coût fixe (weights[k]),
+    sinon la position de sa ligne dans costs : son coût au créneau s est
+    costs[entries[k] + s], une lecture en O(1) dans la boucle de
+    relaxation. Les deux sens d'une adjacence partagent la même ligne.
+    """
+
+    def __init__(self, version, slots, entries, costs):
+        self.version = version
+        self.slots = slots
+        self.entries = entries      # array('i'), une entrée par adjacence du CSR
+        self.costs = costs          # array('d'), slots valeurs par adjacence profilée
+        self.profiled = len(costs) // slots if slots else 0
+
+    @classmethod
+    def build(cls, graph, edges, profiles, slots):
+        """Tables de graph pour les profils (u, v) -> facteurs par créneau.
+
+        Comme dans l'adjacence statique, le coût u-v d'un créneau est le
+        plus faible des arêtes (u, v) et (v, u), chacune pondérée par son
+        propre profil (facteur 1 sans profil). Un profil d'une autre
+        longueur que slots est rééchantillonné.
+        """
+        entries = array('i', [-1]) * len(graph.targets)
+        costs = array('d')
+        pairs = {}
+        for u, v in profiles:
+            if u != v and u in graph.index and v in graph.index:
+                pairs.setdefault(frozenset((u, v)), (u, v))
+
+        for u, v in pairs.values():
+            row = len(costs)
+            for slot in range(slots):
+                best = float('inf')
+                for key in ((u, v), (v, u)):
+                    edge = edges.get(key)
+                    if edge is None:
+                        continue
+                    factors = profiles.get(key)
+                    factor = factors[slot * len(factors) // slots] if factors else 1.0
+                    best = min(best, (edge['weight'] + edge['constraint_value']) * factor)
+                costs.append(best)
+
+            i, j = graph.index[u], graph.index[v]
+            for a, b in ((i, j), (j, i)):
+                for k in range(graph.offsets[a], graph.offsets[a + 1]):
+                    if graph.targets[k] == b:
+                        entries[k] = row
+        return cls(graph.version, slots, entries, costs)
\ No newline at end of file
@@ -1,3 +1,6 @@
+// Types des colonnes numériques (ColumnarView côté serveur)
+const COLUMN_TYPES = { f64: Float64Array, f32: Float32Array, u32: Uint32Array, i32: Int32Array };
+
 class WasteGraphApp {
     constructor() {
         this.baseUrl = window.location.origin;
@@ -5,6 +8,13 @@ class WasteGraphApp {
         this.colors = null;
         this.selectedNode = null;
         this.shortestPath = null;
+        // Version des données affichées ("epoch-version", ETag de /graph)
+        this.version = null;
+        this.nodeIndex = new Map();
+        this.edgeIndex = new Map();
+        this.incident = new Map();
+        this.events = null;
+        this.pollTimer = null;
         this.init();
     }
 
@@ -22,13 +32,13 @@ class WasteGraphApp {
 
     async loadGraph() {
         try {
-            const response = await fetch(`${this.baseUrl}/graph`);
-            const result = await response.json();
+            const { response, result } = await this.fetchColumns(`${this.baseUrl}/graph`);
             
             if (result.status === 'success') {
-                this.graphData = result.data;
+                this.setGraph(this.graphFromColumns(result.data.tables), this.parseTag(response.headers.get('ETag')));
                 this.renderGraph();
                 this.updateNodeSelects();
+                this.watchChanges();
             } else {
                 this.showError('Erreur lors du chargement du graphe: ' + result.message);
             }
@@ -37,6 +47,275 @@ class WasteGraphApp {
         }
     }
 
+    // Réponses en colonnes : tableaux typés en binaire, ou colonnes JSON
+    // si le serveur ne propose que celles-ci
+    async fetchColumns(url) {
+        const response = await fetch(url, {
+            headers: {
+                'Accept': 'application/vnd.wastegraph.columnar, application/vnd.wastegraph.columnar+json;q=0.9'
+            }
+        });
+        const type = (response.headers.get('Content-Type') || '').split(';')[0].trim();
+        if (response.ok && type === 'application/vnd.wastegraph.columnar') {
+            const data = this.decodeColumnar(await response.arrayBuffer());
+            return { response, result: { status: 'success', data } };
+        }
+        const result = await response.json();
+        if (result.status === 'success') {
+            result.data = this.columnsFromJSON(result.data);
+        }
+        return { response, result };
+    }
+
+    decodeColumnar(buffer) {
+        // Signature (8 octets), longueur de l'en-tête, en-tête JSON, puis
+        // colonnes petit-boutistes alignées sur 8 octets : vues sans copie
+        const view = new DataView(buffer);
+        const magic = new TextDecoder().decode(new Uint8Array(buffer, 0, 5));
+        if (magic !== 'WGCOL') {
+            throw new Error('Format de réponse en colonnes inconnu');
+        }
+        const length = view.getUint32(8, true);
+        const header = JSON.parse(new TextDecoder().decode(new Uint8Array(buffer, 12, length)));
+        const base = (12 + length + 7) & ~7;
+        return this.buildColumns(header, column => new COLUMN_TYPES[column.type](buffer, base + column.offset, column.length));
+    }
+
+    columnsFromJSON(data) {
+        // null remplace NaN en JSON (capacité absente)
+        return this.buildColumns(data, column => COLUMN_TYPES[column.type].from(column.values, value => value === null ? NaN : value));
+    }
+
+    buildColumns(header, typed) {
+        const tables = {};
+        Object.entries(header.tables).forEach(([name, table]) => {
+            const columns = {};
+            Object.entries(table.columns).forEach(([field, column]) => {
+                columns[field] = column.type === 'str' ? column.values : typed(column);
+            });
+            tables[name] = { count: table.count, columns };
+        });
+        return { meta: header.meta, tables };
+    }
+
+    graphFromColumns(tables) {
+        // Objets par ligne pour l'affichage ; u et v sont des indices dans les nœuds
+        const { id, x, y, capacity } = tables.nodes.columns;
+        const { u, v, weight, constraint_value } = tables.edges.columns;
+        const nodes = id.map((nodeId, i) => ({
+            id: nodeId,
+            x: x[i],
+            y: y[i],
+            capacity: Number.isNaN(capacity[i]) ? null : capacity[i]
+        }));
+        const edges = [];
+        for (let k = 0; k < tables.edges.count; k++) {
+            edges.push({
+                u: id[u[k]],
+                v: id[v[k]],
+                weight: weight[k],
+                constraint_value: constraint_value[k],
+                total_weight: weight[k] + constraint_value[k]
+            });
+        }
+        return { nodes, edges };
+    }
+
+    parseTag(etag) {
+        // W/"epoch-version" -> epoch-version
+        return etag ? etag.replace(/^W\//, '').replace(/"/g, '') : null;
+    }
+
+    versionNumber(tag) {
+        return tag ? parseInt(tag.slice(tag.lastIndexOf('-') + 1), 10) : -1;
+    }
+
+    edgeKey(u, v) {
+        return JSON.stringify([u, v]);
+    }
+
+    setGraph(data, version) {
+        this.graphData = data;
+        this.version = version;
+        this.nodeIndex = new Map(data.nodes.map(node => [node.id, node]));
+        this.edgeIndex = new Map();
+        this.incident = new Map(data.nodes.map(node => [node.id, new Set()]));
+        data.edges.forEach(edge => this.indexEdge(edge));
+    }
+
+    indexEdge(edge) {
+        const key = this.edgeKey(edge.u, edge.v);
+        this.edgeIndex.set(key, edge);
+        [edge.u, edge.v].forEach(id => {
+            if (!this.incident.has(id)) this.incident.set(id, new Set());
+            this.incident.get(id).add(key);
+        });
+        return key;
+    }
+
+    unindexEdge(key) {
+        const edge = this.edgeIndex.get(key);
+        if (!edge) return;
+        this.edgeIndex.delete(key);
+        [edge.u, edge.v].forEach(id => {
+            const keys = this.incident.get(id);
+            if (keys) keys.delete(key);
+        });
+    }
+
+    // Suivi des modifications : flux SSE, ou interrogation périodique si le
+    // navigateur ou le serveur ne le permet pas
+    watchChanges() {
+        this.stopWatching();
+        if (!this.version) return;
+
+        if (!window.EventSource) {
+            this.pollTimer = setTimeout(() => this.pollChanges(), 5000);
+            return;
+        }
+        const events = new EventSource(`${this.baseUrl}/graph/changes?since=${encodeURIComponent(this.version)}`);
+        events.addEventListener('changes', (e) => this.applyChanges(JSON.parse(e.data)));
+        events.addEventListener('reset', () => {
+            this.stopWatching();
+            this.loadGraph();
+        });
+        events.onerror = () => {
+            // Refus du serveur (503) : EventSource abandonne, on interroge
+            if (events.readyState === EventSource.CLOSED && this.events === events) {
+                this.events = null;
+                this.pollTimer = setTimeout(() => this.pollChanges(), 5000);
+            }
+        };
+        this.events = events;
+    }
+
+    stopWatching() {
+        if (this.events) {
+            this.events.close();
+            this.events = null;
+        }
+        clearTimeout(this.pollTimer);
+        this.pollTimer = null;
+    }
+
+    async pollChanges() {
+        await this.refreshChanges();
+        if (!this.events && this.version) {
+            this.pollTimer = setTimeout(() => this.pollChanges(), 5000);
+        }
+    }
+
+    async refreshChanges() {
+        // Appelé aussi après nos propres modifications, sans attendre le flux
+        if (!this.version) return this.loadGraph();
+        try {
+            const response = await fetch(`${this.baseUrl}/graph/changes?since=${encodeURIComponent(this.version)}`);
+            const result = await response.json();
+            if (result.status === 'success') {
+                this.applyChanges(result.data);
+            }
+        } catch (error) {
+            this.showError('Erreur de connexion au serveur: ' + error.message);
+        }
+    }
+
+    applyChanges(payload) {
+        if (payload.reset) {
+            this.stopWatching();
+            this.loadGraph();
+            return;
+        }
+        // Le flux et refreshChanges() peuvent livrer les mêmes deltas
+        const current = this.versionNumber(this.version);
+        if (this.versionNumber(payload.version) <= current) return;
+
+        let nodesChanged = false;
+        payload.changes.forEach(change => {
+            if (change.version <= current) return;
+            switch (change.op) {
+                case 'put_node':
+                    nodesChanged = nodesChanged || !this.nodeIndex.has(change.node.id);
+                    this.putNode(change.node);
+                    break;
+                case 'delete_node':
+                    nodesChanged = nodesChanged || this.nodeIndex.has(change.id);
+                    this.deleteNode(change.id);
+                    break;
+                case 'put_edge':
+                    this.putEdge(change.edge);
+                    break;
+                case 'delete_edge':
+                    this.deleteEdge(this.edgeKey(change.u, change.v));
+                    break;
+            }
+        });
+        this.version = payload.version;
+        this.graphData = {
+            nodes: Array.from(this.nodeIndex.values()),
+            edges: Array.from(this.edgeIndex.values())
+        };
+        if (nodesChanged) {
+            this.updateNodeSelects();
+        }
+    }
+
+    putNode(node) {
+        this.nodeIndex.set(node.id, node);
+        if (!this.incident.has(node.id)) this.incident.set(node.id, new Set());
+        this.removeElements(`[data-node-id="${CSS.escape(node.id)}"]`);
+        this.renderNode(node);
+        // Les arêtes suivent le nœud déplacé
+        this.incident.get(node.id).forEach(key => this.redrawEdge(key));
+    }
+
+    deleteNode(nodeId) {
+        // Arêtes incidentes supprimées en cascade côté serveur
+        Array.from(this.incident.get(nodeId) || []).forEach(key => this.deleteEdge(key));
+        this.incident.delete(nodeId);
+        this.nodeIndex.delete(nodeId);
+        this.removeElements(`[data-node-id="${CSS.escape(nodeId)}"]`);
+    }
+
+    putEdge(edge) {
+        const key = this.indexEdge(edge);
+        this.redrawEdge(key);
+    }
+
+    deleteEdge(key) {
+        this.unindexEdge(key);
+        this.removeElements(`[data-edge-key="${CSS.escape(key)}"]`);
+    }
+
+    redrawEdge(key) {
+        this.removeElements(`[data-edge-key="${CSS.escape(key)}"]`);
+        const edge = this.edgeIndex.get(key);
+        const uNode = edge && this.nodeIndex.get(edge.u);
+        const vNode = edge && this.nodeIndex.get(edge.v);
+        if (uNode && vNode) {
+            this.renderEdge(edge, uNode, vNode);
+        }
+    }
+
+    removeElements(selector) {
+        document.getElementById('graphCanvas').querySelectorAll(selector).forEach(element => element.remove());
+    }
+
+    layer(name) {
+        // Arêtes sous les nœuds : chaque type a son groupe SVG
+        const svg = document.getElementById('graphCanvas');
+        let group = svg.querySelector(`g[data-layer="${name}"]`);
+        if (!group) {
+            group = document.createElementNS('http://www.w3.org/2000/svg', 'g');
+            group.setAttribute('data-layer', name);
+            if (name === 'edges') {
+                svg.insertBefore(group, svg.firstChild);
+            } else {
+                svg.appendChild(group);
+            }
+        }
+        return group;
+    }
+
     updateNodeSelects() {
         const selects = [
             'startNode', 'endNode', 'constraintNodeA', 'constraintNodeB', 'edgeU', 'edgeV'
@@ -55,7 +334,7 @@ class WasteGraphApp {
                     select.appendChild(option);
                 });
                 
-                if (currentValue && this.graphData.nodes.some(node => node.id === currentValue)) {
+                if (currentValue && this.nodeIndex.has(currentValue)) {
                     select.value = currentValue;
                 }
             }
@@ -68,8 +347,8 @@ class WasteGraphApp {
 
         // Rendre les arêtes d'abord
         this.graphData.edges.forEach(edge => {
-            const uNode = this.graphData.nodes.find(n => n.id === edge.u);
-            const vNode = this.graphData.nodes.find(n => n.id === edge.v);
+            const uNode = this.nodeIndex.get(edge.u);
+            const vNode = this.nodeIndex.get(edge.v);
             
             if (uNode && vNode) {
                 this.renderEdge(edge, uNode, vNode);
@@ -83,7 +362,7 @@ class WasteGraphApp {
     }
 
     renderNode(node) {
-        const svg = document.getElementById('graphCanvas');
+        const svg = this.layer('nodes');
         const group = document.createElementNS('http://www.w3.org/2000/svg', 'g');
         group.classList.add('node');
         group.setAttribute('transform', `translate(${node.x}, ${node.y})`);
@@ -112,8 +391,10 @@ class WasteGraphApp {
     }
 
     renderEdge(edge, uNode, vNode) {
-        const svg = document.getElementById('graphCanvas');
+        const svg = this.layer('edges');
+        const key = this.edgeKey(edge.u, edge.v);
         const line = document.createElementNS('http://www.w3.org/2000/svg', 'line');
+        line.setAttribute('data-edge-key', key);
         
         line.setAttribute('x1', uNode.x);
         line.setAttribute('y1', uNode.y);
@@ -132,6 +413,7 @@ class WasteGraphApp {
         
         const text = document.createElementNS('http://www.w3.org/2000/svg', 'text');
         text.classList.add('edge-label');
+        text.setAttribute('data-edge-key', key);
         text.setAttribute('x', midX);
         text.setAttribute('y', midY - 8);
         text.setAttribute('text-anchor', 'middle');
@@ -173,7 +455,7 @@ class WasteGraphApp {
             if (result.status === 'success') {
                 this.showSuccess('Sommet ajouté avec succès');
                 this.clearNodeForm();
-                this.loadGraph();
+                this.refreshChanges();
             } else {
                 this.showError(result.message);
             }
@@ -209,7 +491,7 @@ class WasteGraphApp {
             
             if (result.status === 'success') {
                 this.showSuccess('Sommet modifié avec succès');
-                this.loadGraph();
+                this.refreshChanges();
             } else {
                 this.showError(result.message);
             }
@@ -240,7 +522,7 @@ class WasteGraphApp {
             if (result.status === 'success') {
                 this.showSuccess('Sommet supprimé avec succès');
                 this.clearNodeForm();
-                this.loadGraph();
+                this.refreshChanges();
             } else {
                 this.showError(result.message);
             }
@@ -271,7 +553,7 @@ class WasteGraphApp {
             if (result.status === 'success') {
                 this.showSuccess('Arête ajoutée avec succès');
                 this.clearEdgeForm();
-                this.loadGraph();
+                this.refreshChanges();
             } else {
                 this.showError(result.message);
             }
@@ -304,7 +586,7 @@ class WasteGraphApp {
             
             if (result.status === 'success') {
                 this.showSuccess('Arête modifiée avec succès');
-                this.loadGraph();
+                this.refreshChanges();
             } else {
                 this.showError(result.message);
             }
@@ -336,7 +618,7 @@ class WasteGraphApp {
             if (result.status === 'success') {
                 this.showSuccess('Arête supprimée avec succès');
                 this.clearEdgeForm();
-                this.loadGraph();
+                this.refreshChanges();
             } else {
                 this.showError(result.message);
             }
@@ -370,7 +652,7 @@ class WasteGraphApp {
             if (result.status === 'success') {
                 this.showSuccess('Contrainte ajoutée avec succès');
                 document.getElementById('constraintValue').value = '';
-                this.loadGraph();
+                this.refreshChanges();
             } else {
                 this.showError(result.message);
             }
@@ -403,7 +685,7 @@ class WasteGraphApp {
             if (result.status === 'success') {
                 this.showSuccess('Contrainte supprimée avec succès');
                 document.getElementById('constraintValue').value = '';
-                this.loadGraph();
+                this.refreshChanges();
             } else {
                 this.showError(result.message);
             }
@@ -428,7 +710,7 @@ class WasteGraphApp {
             if (result.status === 'success') {
                 this.shortestPath = result.data;
                 this.displayResults(`Chemin: ${result.data.path.join('→')}<br>Distance: ${result.data.distance}`);
-                this.loadGraph();
+                this.renderGraph();
             } else {
                 this.showError(result.message);
             }
@@ -439,14 +721,18 @@ class WasteGraphApp {
 
     async colorGraph() {
         try {
-            const response = await fetch(`${this.baseUrl}/algo/coloring`);
-            const result = await response.json();
+            const { result } = await this.fetchColumns(`${this.baseUrl}/algo/coloring`);
             
             if (result.status === 'success') {
-                this.colors = result.data;
+                const { meta, tables } = result.data;
+                const { id, color } = tables.nodes.columns;
+                this.colors = {};
+                id.forEach((nodeId, i) => {
+                    this.colors[nodeId] = { color: color[i], day: meta.days[color[i] % meta.days.length] };
+                });
                 this.showSuccess('Graphe colorié avec succès');
                 this.updateColorLegend();
-                this.loadGraph();
+                this.renderGraph();
             } else {
                 this.showError(result.message);
             }
@@ -531,7 +817,7 @@ class WasteGraphApp {
     selectNode(nodeId) {
         this.selectedNode = nodeId;
         // Mettre à jour les formulaires avec les données du nœud sélectionné
-        const node = this.graphData.nodes.find(n => n.id === nodeId);
+        const node = this.nodeIndex.get(nodeId);
         if (node) {
             document.getElementById('nodeId').value = node.id;
             document.getElementById('nodeX').value = node.x;
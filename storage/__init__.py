@@ -0,0 +1,37 @@
+"""
+Package storage pour WasteGraph
+Stockages interchangeables des tables nodes / edges (PostgreSQL, SQLite, mémoire)
+"""
+
+import threading
+from config import Config
+from .base import IntegrityError, StorageBackend
+
+BACKENDS = ('postgres', 'sqlite', 'memory')
+
+_storage = None
+_storage_lock = threading.Lock()
+
+def create_storage(backend):
+    # Imports différés : psycopg2 n'est requis que pour le stockage PostgreSQL
+    if backend == 'postgres':
+        from .postgres import PostgresStorage
+        return PostgresStorage()
+    if backend == 'sqlite':
+        from .sqlite import SQLiteStorage
+        return SQLiteStorage()
+    if backend == 'memory':
+        from .memory import MemoryStorage
+        return MemoryStorage()
+    raise ValueError(f"Unknown storage backend '{backend}', expected one of: {', '.join(BACKENDS)}")
+
+def get_storage():
+    """Stockage choisi par Config.STORAGE_BACKEND, partagé par tout le processus"""
+    global _storage
+    if _storage is None:
+        with _storage_lock:
+            if _storage is None:
+                _storage = create_storage(Config.STORAGE_BACKEND)
+    return _storage
+
+__all__ = ['BACKENDS', 'IntegrityError', 'StorageBackend', 'create_storage', 'get_storage']
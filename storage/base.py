@@ -0,0 +1,99 @@
+class IntegrityError(Exception):
+    """Contrainte du schéma violée (clé dupliquée, nœud référencé absent)"""
+
+class StorageBackend:
+    """Interface commune des stockages des tables nodes / edges.
+
+    Les nœuds sont des dicts id/x/y/capacity, les arêtes des dicts
+    id/u/v/weight/constraint_value. Les mutations renvoient le nombre de
+    lignes touchées, comme Database.execute_query ; supprimer un nœud
+    supprime ses arêtes en cascade.
+    """
+    name = None
+
+    # Lecture
+    def fetch_nodes(self):
+        raise NotImplementedError
+
+    def fetch_edges(self):
+        raise NotImplementedError
+
+    def node_rows(self):
+        """Tous les nœuds en tuples (id, x, y, capacity), sans dict par ligne"""
+        raise NotImplementedError
+
+    def edge_rows(self):
+        """Toutes les arêtes en tuples (u, v, weight, constraint_value)"""
+        raise NotImplementedError
+
+    def profile_rows(self):
+        """Profils horaires en tuples (u, v, facteurs), facteurs encodés par encode_profile"""
+        raise NotImplementedError
+
+    def get_node(self, node_id):
+        raise NotImplementedError
+
+    def iter_nodes(self, bbox=None, after=None, limit=None):
+        """Nœuds triés par id, filtrés par (min_x, min_y, max_x, max_y), après l'id after"""
+        raise NotImplementedError
+
+    def iter_edges(self, bbox=None, after=None, limit=None):
+        """Arêtes triées par id avec total_weight ; bbox retient celles dont une extrémité est dans la boîte"""
+        raise NotImplementedError
+
+    # Écriture
+    def insert_node(self, node_id, x, y, capacity):
+        raise NotImplementedError
+
+    def update_node(self, node_id, fields):
+        """fields : colonnes à modifier parmi x, y, capacity"""
+        raise NotImplementedError
+
+    def delete_node(self, node_id):
+        raise NotImplementedError
+
+    def insert_edge(self, u, v, weight, constraint_value):
+        raise NotImplementedError
+
+    def update_edge(self, u, v, fields):
+        """fields : colonnes à modifier parmi weight, constraint_value"""
+        raise NotImplementedError
+
+    def update_edges(self, updates):
+        """Mise à jour groupée, en une transaction.
+
+        updates : (u, v, weight, constraint_value), None laissant la colonne
+        inchangée, au plus une fois par arête. Renvoie les (u, v) modifiées.
+        """
+        raise NotImplementedError
+
+    def delete_edge(self, u, v):
+        raise NotImplementedError
+
+    def set_profile(self, u, v, factors):
+        """Enregistrer (ou retirer si factors est None) le profil de l'arête (u, v).
+
+        Le profil disparaît avec son arête ; IntegrityError si l'arête
+        n'existe pas.
+        """
+        raise NotImplementedError
+
+    def data_version(self):
+        """Identifiant opaque de l'état des tables, changé par toute écriture.
+
+        Sert à valider un fichier de snapshot ; None si le stockage ne
+        survit pas au processus (aucun fichier ne peut alors être réutilisé).
+        """
+        return None
+
+    def bulk_writer(self):
+        """Contexte transactionnel d'import massif.
+
+        L'objet fourni expose write_nodes(lignes) et write_edges(lignes),
+        lignes (id, x, y, capacity) et (u, v, weight, constraint_value) ;
+        tout est validé à la sortie du bloc, ou rien en cas d'exception.
+        """
+        raise NotImplementedError
+
+    def close(self):
+        pass
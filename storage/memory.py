@@ -0,0 +1,217 @@
+import itertools
+import threading
+from contextlib import contextmanager
+from storage.base import IntegrityError, StorageBackend
+
+class MemoryStorage(StorageBackend):
+    """Stockage entièrement en mémoire, sans persistance.
+
+    Reproduit les contraintes du schéma SQL (clés uniques, références
+    vers nodes, suppression en cascade) pour les tests, les benchmarks
+    et les déploiements sans base.
+    """
+    name = 'memory'
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.nodes = {}                      # id -> {'x', 'y', 'capacity'}
+        self.edges = {}                      # (u, v) -> {'id', 'weight', 'constraint_value', 'profile'?}
+        self.incident = {}                   # id -> clés (u, v) des arêtes incidentes
+        self.edge_ids = itertools.count(1)
+
+    # Lecture
+    def fetch_nodes(self):
+        with self.lock:
+            return [self._node_row(node_id, node) for node_id, node in self.nodes.items()]
+
+    def fetch_edges(self):
+        with self.lock:
+            return [self._edge_row(key, edge) for key, edge in self.edges.items()]
+
+    def node_rows(self):
+        with self.lock:
+            return [(node_id, node['x'], node['y'], node['capacity']) for node_id, node in self.nodes.items()]
+
+    def edge_rows(self):
+        with self.lock:
+            return [(u, v, edge['weight'], edge['constraint_value']) for (u, v), edge in self.edges.items()]
+
+    def profile_rows(self):
+        with self.lock:
+            return [(u, v, edge['profile']) for (u, v), edge in self.edges.items() if edge.get('profile') is not None]
+
+    def get_node(self, node_id):
+        with self.lock:
+            node = self.nodes.get(node_id)
+            return self._node_row(node_id, node) if node is not None else None
+
+    def iter_nodes(self, bbox=None, after=None, limit=None):
+        with self.lock:
+            rows = sorted(
+                (self._node_row(node_id, node) for node_id, node in self.nodes.items()
+                 if (after is None or node_id > after) and self._inside(node, bbox)),
+                key=lambda row: row['id']
+            )
+        return iter(rows[:limit] if limit is not None else rows)
+
+    def iter_edges(self, bbox=None, after=None, limit=None):
+        with self.lock:
+            rows = []
+            for key, edge in self.edges.items():
+                if after is not None and edge['id'] <= after:
+                    continue
+                if bbox and not (self._inside(self.nodes[key[0]], bbox) or self._inside(self.nodes[key[1]], bbox)):
+                    continue
+                row = self._edge_row(key, edge)
+                row['total_weight'] = row['weight'] + (row['constraint_value'] or 0)
+                rows.append(row)
+        rows.sort(key=lambda row: row['id'])
+        return iter(rows[:limit] if limit is not None else rows)
+
+    @staticmethod
+    def _inside(node, bbox):
+        if not bbox:
+            return True
+        min_x, min_y, max_x, max_y = bbox
+        return min_x <= node['x'] <= max_x and min_y <= node['y'] <= max_y
+
+    @staticmethod
+    def _node_row(node_id, node):
+        return {'id': node_id, 'x': node['x'], 'y': node['y'], 'capacity': node['capacity']}
+
+    @staticmethod
+    def _edge_row(key, edge):
+        return {
+            'id': edge['id'],
+            'u': key[0],
+            'v': key[1],
+            'weight': edge['weight'],
+            'constraint_value': edge['constraint_value']
+        }
+
+    # Écriture
+    def insert_node(self, node_id, x, y, capacity):
+        with self.lock:
+            if node_id in self.nodes:
+                raise IntegrityError(f"Node {node_id} already exists")
+            self.nodes[node_id] = {'x': float(x), 'y': float(y), 'capacity': capacity}
+            self.incident[node_id] = set()
+            return 1
+
+    def update_node(self, node_id, fields):
+        with self.lock:
+            node = self.nodes.get(node_id)
+            if node is None or not fields:
+                return 0
+            node.update(fields)
+            return 1
+
+    def delete_node(self, node_id):
+        with self.lock:
+            if self.nodes.pop(node_id, None) is None:
+                return 0
+            for key in list(self.incident.get(node_id, ())):
+                self._unlink(key)
+            del self.incident[node_id]
+            return 1
+
+    def insert_edge(self, u, v, weight, constraint_value):
+        with self.lock:
+            self._check_edge(u, v, self.nodes)
+            self._link((u, v), {
+                'weight': float(weight),
+                'constraint_value': float(constraint_value) if constraint_value is not None else None
+            })
+            return 1
+
+    def _link(self, key, edge):
+        edge['id'] = next(self.edge_ids)
+        self.edges[key] = edge
+        for node_id in key:
+            self.incident[node_id].add(key)
+
+    def _unlink(self, key):
+        del self.edges[key]
+        for node_id in key:
+            self.incident[node_id].discard(key)
+
+    def _check_edge(self, u, v, nodes):
+        if u not in nodes or v not in nodes:
+            raise IntegrityError(f"Edge {u}-{v} references an unknown node")
+        if (u, v) in self.edges:
+            raise IntegrityError(f"Edge {u}-{v} already exists")
+
+    def update_edge(self, u, v, fields):
+        with self.lock:
+            edge = self.edges.get((u, v))
+            if edge is None or not fields:
+                return 0
+            edge.update(fields)
+            return 1
+
+    def update_edges(self, updates):
+        with self.lock:
+            updated = []
+            for u, v, weight, constraint_value in updates:
+                edge = self.edges.get((u, v))
+                if edge is None:
+                    continue
+                if weight is not None:
+                    edge['weight'] = weight
+                if constraint_value is not None:
+                    edge['constraint_value'] = constraint_value
+                updated.append((u, v))
+            return updated
+
+    def delete_edge(self, u, v):
+        with self.lock:
+            if (u, v) not in self.edges:
+                return 0
+            self._unlink((u, v))
+            return 1
+
+    def set_profile(self, u, v, factors):
+        # Le profil est rangé dans l'arête : il disparaît avec elle
+        with self.lock:
+            edge = self.edges.get((u, v))
+            if edge is None:
+                if factors is None:
+                    return 0
+                raise IntegrityError(f"Edge {u}-{v} does not exist")
+            if factors is None:
+                return int(edge.pop('profile', None) is not None)
+            edge['profile'] = factors
+            return 1
+
+    @contextmanager
+    def bulk_writer(self):
+        # Les lignes sont validées au fil de l'eau mais appliquées en bloc à la fin
+        with self.lock:
+            writer = _StagedWriter(self)
+            yield writer
+            for node_id, node in writer.nodes.items():
+                self.nodes[node_id] = node
+                self.incident[node_id] = set()
+            for key, edge in writer.edges.items():
+                self._link(key, edge)
+
+class _StagedWriter:
+    def __init__(self, storage):
+        self.storage = storage
+        self.nodes = {}
+        self.edges = {}
+
+    def write_nodes(self, rows):
+        for node_id, x, y, capacity in rows:
+            if node_id in self.storage.nodes or node_id in self.nodes:
+                raise IntegrityError(f"Node {node_id} already exists")
+            self.nodes[node_id] = {'x': float(x), 'y': float(y), 'capacity': capacity}
+
+    def write_edges(self, rows):
+        for u, v, weight, constraint_value in rows:
+            known = self.storage.nodes
+            if (u not in known and u not in self.nodes) or (v not in known and v not in self.nodes):
+                raise IntegrityError(f"Edge {u}-{v} references an unknown node")
+            if (u, v) in self.storage.edges or (u, v) in self.edges:
+                raise IntegrityError(f"Edge {u}-{v} already exists")
+            self.edges[(u, v)] = {'weight': float(weight), 'constraint_value': constraint_value}
@@ -0,0 +1,78 @@
+import csv
+import io
+import time
+from contextlib import contextmanager
+import psycopg2
+from database import Database
+from metrics import Metrics
+from storage.base import IntegrityError
+from storage.sql import SQLStorage
+
+class PostgresStorage(SQLStorage):
+    """Stockage PostgreSQL : pool de Database, curseurs nommés et COPY"""
+    name = 'postgres'
+
+    def __init__(self):
+        self.db = Database()
+
+    def _execute(self, query, params=None):
+        try:
+            return self.db.execute_query(query, params)
+        except psycopg2.IntegrityError as e:
+            raise IntegrityError(str(e)) from e
+
+    def _stream(self, query, params=None):
+        return self.db.stream_query(query, params)
+
+    def _run(self, name, params=()):
+        try:
+            return self.db.execute_prepared(name, self.STATEMENTS[name], params)
+        except psycopg2.IntegrityError as e:
+            raise IntegrityError(str(e)) from e
+
+    def _returning(self, statements):
+        rows = []
+        with self.db.connection() as connection:
+            with connection.cursor() as cursor:
+                for query, params in statements:
+                    start = time.perf_counter()
+                    try:
+                        cursor.execute(query, params)
+                    except psycopg2.IntegrityError as e:
+                        raise IntegrityError(str(e)) from e
+                    batch = cursor.fetchall()
+                    rows.extend(batch)
+                    Metrics().observe_query('postgres', query, time.perf_counter() - start, len(batch))
+            connection.commit()
+        return rows
+
+    @contextmanager
+    def bulk_writer(self):
+        with self.db.connection() as connection:
+            with connection.cursor() as cursor:
+                yield _CopyWriter(cursor)
+            connection.commit()
+
+    def close(self):
+        self.db.close()
+
+class _CopyWriter:
+    def __init__(self, cursor):
+        self.cursor = cursor
+
+    def write_nodes(self, rows):
+        self._copy("COPY nodes (id, x, y, capacity) FROM STDIN WITH (FORMAT csv)", rows)
+
+    def write_edges(self, rows):
+        self._copy("COPY edges (u, v, weight, constraint_value) FROM STDIN WITH (FORMAT csv)", rows)
+
+    def _copy(self, statement, rows):
+        start = time.perf_counter()
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        buffer.seek(0)
+        try:
+            self.cursor.copy_expert(statement, buffer)
+        except psycopg2.IntegrityError as e:
+            raise IntegrityError(str(e)) from e
+        Metrics().observe_query('postgres', statement, time.perf_counter() - start, len(rows))
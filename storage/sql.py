@@ -0,0 +1,180 @@
+from storage.base import StorageBackend
+
+class SQLStorage(StorageBackend):
+    """Requêtes SQL partagées par PostgreSQL et SQLite.
+
+    Les requêtes sont écrites avec des marqueurs %s ; les sous-classes
+    fournissent _execute (liste de dicts pour un SELECT, nombre de lignes
+    sinon), _stream (itération paresseuse d'un SELECT), _returning
+    (plusieurs requêtes dans une transaction, lignes de leurs RETURNING)
+    et _run (requête nommée de STATEMENTS, préparée une fois par
+    connexion : liste de tuples si elle renvoie des lignes, nombre de
+    lignes sinon).
+    """
+    # Requêtes des chemins chauds (chargement du snapshot, mutations
+    # unitaires) : texte fixe, paramètres positionnels
+    STATEMENTS = {
+        'data_version': "SELECT token, version FROM graph_meta WHERE id = 1",
+        'node_rows': "SELECT id, x, y, capacity FROM nodes",
+        'edge_rows': "SELECT u, v, weight, constraint_value FROM edges",
+        'profile_rows': "SELECT u, v, factors FROM edge_profiles",
+        'get_node': "SELECT id, x, y, capacity FROM nodes WHERE id = %s",
+        'insert_node': "INSERT INTO nodes (id, x, y, capacity) VALUES (%s, %s, %s, %s)",
+        'update_node': """
+            UPDATE nodes
+            SET x = COALESCE(%s, x), y = COALESCE(%s, y), capacity = COALESCE(%s, capacity)
+            WHERE id = %s
+        """,
+        'delete_node': "DELETE FROM nodes WHERE id = %s",
+        'insert_edge': "INSERT INTO edges (u, v, weight, constraint_value) VALUES (%s, %s, %s, %s)",
+        'update_edge': """
+            UPDATE edges
+            SET weight = COALESCE(%s, weight), constraint_value = COALESCE(%s, constraint_value)
+            WHERE u = %s AND v = %s
+        """,
+        'delete_edge': "DELETE FROM edges WHERE u = %s AND v = %s",
+        'set_profile': """
+            INSERT INTO edge_profiles (u, v, factors) VALUES (%s, %s, %s)
+            ON CONFLICT (u, v) DO UPDATE SET factors = excluded.factors
+        """,
+        'delete_profile': "DELETE FROM edge_profiles WHERE u = %s AND v = %s"
+    }
+    # Lignes par requête de mise à jour groupée (4 marqueurs par ligne,
+    # sous la limite de 32766 variables de SQLite)
+    UPDATE_BATCH_ROWS = 1000
+
+    def _execute(self, query, params=None):
+        raise NotImplementedError
+
+    def _stream(self, query, params=None):
+        raise NotImplementedError
+
+    def _returning(self, statements):
+        raise NotImplementedError
+
+    def _run(self, name, params=()):
+        raise NotImplementedError
+
+    def fetch_nodes(self):
+        return self._execute("SELECT id, x, y, capacity FROM nodes")
+
+    def fetch_edges(self):
+        return self._execute("SELECT id, u, v, weight, constraint_value FROM edges")
+
+    def node_rows(self):
+        return self._run('node_rows')
+
+    def edge_rows(self):
+        return self._run('edge_rows')
+
+    def profile_rows(self):
+        # bytea arrive en memoryview sous psycopg2
+        return [(u, v, bytes(factors)) for u, v, factors in self._run('profile_rows')]
+
+    def data_version(self):
+        # graph_meta est tenue à jour par des triggers sur nodes et edges ;
+        # le jeton distingue deux bases recréées au même compteur
+        result = self._run('data_version')
+        return f"{result[0][0]}:{result[0][1]}" if result else None
+
+    def get_node(self, node_id):
+        result = self._run('get_node', (node_id,))
+        return dict(zip(('id', 'x', 'y', 'capacity'), result[0])) if result else None
+
+    def iter_nodes(self, bbox=None, after=None, limit=None):
+        conditions, params = [], []
+        if bbox:
+            min_x, min_y, max_x, max_y = bbox
+            conditions.append("x BETWEEN %s AND %s AND y BETWEEN %s AND %s")
+            params.extend([min_x, max_x, min_y, max_y])
+        if after is not None:
+            conditions.append("id > %s")
+            params.append(after)
+
+        query = "SELECT id, x, y, capacity FROM nodes"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY id"
+        if limit is not None:
+            query += " LIMIT %s"
+            params.append(limit)
+        return self._stream(query, params)
+
+    def iter_edges(self, bbox=None, after=None, limit=None):
+        conditions, params = [], []
+        query = """
+            SELECT e.id, e.u, e.v, e.weight, e.constraint_value,
+                   e.weight + COALESCE(e.constraint_value, 0) AS total_weight
+            FROM edges e
+        """
+        if bbox:
+            min_x, min_y, max_x, max_y = bbox
+            query += " JOIN nodes nu ON nu.id = e.u JOIN nodes nv ON nv.id = e.v"
+            conditions.append(
+                "((nu.x BETWEEN %s AND %s AND nu.y BETWEEN %s AND %s)"
+                " OR (nv.x BETWEEN %s AND %s AND nv.y BETWEEN %s AND %s))"
+            )
+            params.extend([min_x, max_x, min_y, max_y] * 2)
+        if after is not None:
+            conditions.append("e.id > %s")
+            params.append(after)
+
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY e.id"
+        if limit is not None:
+            query += " LIMIT %s"
+            params.append(limit)
+        return self._stream(query, params)
+
+    def insert_node(self, node_id, x, y, capacity):
+        return self._run('insert_node', (node_id, x, y, capacity))
+
+    def update_node(self, node_id, fields):
+        # Une seule requête préparée pour toutes les combinaisons de
+        # colonnes : NULL laisse la colonne inchangée
+        if not fields:
+            return 0
+        return self._run('update_node', (fields.get('x'), fields.get('y'), fields.get('capacity'), node_id))
+
+    def delete_node(self, node_id):
+        return self._run('delete_node', (node_id,))
+
+    def insert_edge(self, u, v, weight, constraint_value):
+        return self._run('insert_edge', (u, v, weight, constraint_value))
+
+    def update_edge(self, u, v, fields):
+        if not fields:
+            return 0
+        return self._run('update_edge', (fields.get('weight'), fields.get('constraint_value'), u, v))
+
+    def update_edges(self, updates):
+        # Une seule requête par paquet : UPDATE ... FROM (VALUES ...), les
+        # colonnes de VALUES s'appelant column1..column4 sous PostgreSQL
+        # comme sous SQLite. Les CAST typent les NULL des valeurs inchangées.
+        statements = []
+        for start in range(0, len(updates), self.UPDATE_BATCH_ROWS):
+            batch = updates[start:start + self.UPDATE_BATCH_ROWS]
+            values = ', '.join(
+                ["(%s, %s, CAST(%s AS DOUBLE PRECISION), CAST(%s AS DOUBLE PRECISION))"] * len(batch)
+            )
+            statements.append((
+                f"""
+                UPDATE edges
+                SET weight = COALESCE(d.column3, edges.weight),
+                    constraint_value = COALESCE(d.column4, edges.constraint_value)
+                FROM (VALUES {values}) AS d
+                WHERE edges.u = d.column1 AND edges.v = d.column2
+                RETURNING edges.u, edges.v
+                """,
+                [value for update in batch for value in update]
+            ))
+        return [(row[0], row[1]) for row in self._returning(statements)]
+
+    def delete_edge(self, u, v):
+        return self._run('delete_edge', (u, v))
+
+    def set_profile(self, u, v, factors):
+        if factors is None:
+            return self._run('delete_profile', (u, v))
+        return self._run('set_profile', (u, v, factors))
@@ -0,0 +1,189 @@
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from config import Config
+from metrics import Metrics
+from storage.base import IntegrityError
+from storage.sql import SQLStorage
+
+class SQLiteStorage(SQLStorage):
+    """Stockage SQLite embarqué (fichier Config.SQLITE_PATH).
+
+    Une connexion par thread, en mode autocommit : chaque mutation est sa
+    propre transaction, sauf dans bulk_writer. Le journal WAL laisse les
+    lectures avancer pendant une écriture. Les requêtes nommées gardent
+    leur texte exact d'un appel à l'autre : le cache de requêtes compilées
+    de sqlite3 (par connexion) ne les prépare qu'une fois.
+    """
+    name = 'sqlite'
+
+    def __init__(self, path=None):
+        self.path = path or Config.SQLITE_PATH
+        self.local = threading.local()
+        self.connections = []
+        self.lock = threading.Lock()
+        self.statements = {name: query.replace('%s', '?') for name, query in self.STATEMENTS.items()}
+        self.create_tables()
+
+    def _connection(self):
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+            connection.row_factory = sqlite3.Row
+            # Les clés étrangères (et donc ON DELETE CASCADE) sont désactivées par défaut
+            connection.execute("PRAGMA foreign_keys = ON")
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute("PRAGMA synchronous = NORMAL")
+            self.local.connection = connection
+            with self.lock:
+                self.connections.append(connection)
+        return connection
+
+    def create_tables(self):
+        connection = self._connection()
+        connection.executescript("""
+            CREATE TABLE IF NOT EXISTS nodes (
+                id TEXT PRIMARY KEY,
+                x REAL NOT NULL,
+                y REAL NOT NULL,
+                capacity INTEGER,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            );
+            CREATE TABLE IF NOT EXISTS edges (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                u TEXT NOT NULL REFERENCES nodes(id) ON DELETE CASCADE,
+                v TEXT NOT NULL REFERENCES nodes(id) ON DELETE CASCADE,
+                weight REAL NOT NULL,
+                constraint_value REAL DEFAULT 0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE(u, v)
+            );
+            CREATE INDEX IF NOT EXISTS idx_edges_v ON edges (v);
+            CREATE INDEX IF NOT EXISTS idx_nodes_xy ON nodes (x, y);
+            CREATE TABLE IF NOT EXISTS edge_profiles (
+                u TEXT NOT NULL,
+                v TEXT NOT NULL,
+                factors BLOB NOT NULL,
+                PRIMARY KEY (u, v),
+                FOREIGN KEY (u, v) REFERENCES edges (u, v) ON DELETE CASCADE
+            );
+            CREATE TABLE IF NOT EXISTS graph_meta (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                token TEXT NOT NULL,
+                version INTEGER NOT NULL DEFAULT 0
+            );
+            INSERT OR IGNORE INTO graph_meta (id, token) VALUES (1, lower(hex(randomblob(16))));
+        """)
+        # SQLite n'a que des triggers par ligne (suppressions en cascade comprises)
+        for table in ('nodes', 'edges', 'edge_profiles'):
+            for operation in ('INSERT', 'UPDATE', 'DELETE'):
+                connection.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS {table}_version_{operation.lower()}
+                    AFTER {operation} ON {table}
+                    BEGIN
+                        UPDATE graph_meta SET version = version + 1 WHERE id = 1;
+                    END
+                """)
+
+    def _execute(self, query, params=None):
+        start = time.perf_counter()
+        try:
+            cursor = self._connection().execute(query.replace('%s', '?'), params or ())
+        except sqlite3.IntegrityError as e:
+            raise IntegrityError(str(e)) from e
+        if cursor.description is not None:
+            result = [dict(row) for row in cursor.fetchall()]
+            rows = len(result)
+        else:
+            result = rows = cursor.rowcount
+        Metrics().observe_query('sqlite', query, time.perf_counter() - start, rows)
+        return result
+
+    def _run(self, name, params=()):
+        start = time.perf_counter()
+        cursor = self._connection().cursor()
+        # Tuples bruts : pas de sqlite3.Row à convertir
+        cursor.row_factory = None
+        try:
+            cursor.execute(self.statements[name], params)
+        except sqlite3.IntegrityError as e:
+            raise IntegrityError(str(e)) from e
+        if cursor.description is not None:
+            result = cursor.fetchall()
+            rows = len(result)
+        else:
+            result = rows = cursor.rowcount
+        Metrics().observe_query('sqlite', self.STATEMENTS[name], time.perf_counter() - start, rows)
+        return result
+
+    def _stream(self, query, params=None):
+        start = time.perf_counter()
+        count = 0
+        cursor = self._connection().execute(query.replace('%s', '?'), params or ())
+        try:
+            while True:
+                rows = cursor.fetchmany(Config.DB_STREAM_ITERSIZE)
+                if not rows:
+                    break
+                for row in rows:
+                    count += 1
+                    yield dict(row)
+        finally:
+            cursor.close()
+            Metrics().observe_query('sqlite', query, time.perf_counter() - start, count)
+
+    def _returning(self, statements):
+        connection = self._connection()
+        rows = []
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            for query, params in statements:
+                start = time.perf_counter()
+                try:
+                    batch = connection.execute(query.replace('%s', '?'), params).fetchall()
+                except sqlite3.IntegrityError as e:
+                    raise IntegrityError(str(e)) from e
+                rows.extend(batch)
+                Metrics().observe_query('sqlite', query, time.perf_counter() - start, len(batch))
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+        return rows
+
+    @contextmanager
+    def bulk_writer(self):
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield _InsertWriter(connection)
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    def close(self):
+        with self.lock:
+            for connection in self.connections:
+                connection.close()
+            self.connections = []
+        self.local = threading.local()
+
+class _InsertWriter:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def write_nodes(self, rows):
+        self._insert("INSERT INTO nodes (id, x, y, capacity) VALUES (?, ?, ?, ?)", rows)
+
+    def write_edges(self, rows):
+        self._insert("INSERT INTO edges (u, v, weight, constraint_value) VALUES (?, ?, ?, ?)", rows)
+
+    def _insert(self, statement, rows):
+        start = time.perf_counter()
+        try:
+            self.connection.executemany(statement, rows)
+        except sqlite3.IntegrityError as e:
+            raise IntegrityError(str(e)) from e
+        Metrics().observe_query('sqlite', statement, time.perf_counter() - start, len(rows))
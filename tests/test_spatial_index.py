@@ -0,0 +1,68 @@
+import math
+import random
+import unittest
+from models.spatial_index import GridIndex
+
+def brute_nearest(points, x, y, k):
+    return sorted((math.hypot(px - x, py - y), node_id) for node_id, (px, py) in points.items())[:k]
+
+def brute_within(points, x, y, radius):
+    return sorted(
+        (math.hypot(px - x, py - y), node_id) for node_id, (px, py) in points.items()
+        if math.hypot(px - x, py - y) <= radius
+    )
+
+class GridIndexDegenerateLayoutTest(unittest.TestCase):
+    """Dispositions dégénérées : la taille de cellule ne doit pas s'effondrer"""
+
+    def check(self, points, queries):
+        grid = GridIndex(points)
+        for x, y in queries:
+            for k in (1, 3, len(points)):
+                found = grid.nearest(x, y, k)
+                # À distance égale, n'importe lequel des ex aequo convient
+                self.assertEqual([distance for distance, _ in found], [distance for distance, _ in brute_nearest(points, x, y, k)])
+                for distance, node_id in found:
+                    self.assertEqual(distance, math.hypot(points[node_id][0] - x, points[node_id][1] - y))
+            for radius in (0.0, 5.0, 250.0):
+                self.assertEqual(grid.within(x, y, radius), brute_within(points, x, y, radius))
+        return grid
+
+    def test_collinear_horizontal(self):
+        points = {f'N{i}': (i * 5.0, 100.0) for i in range(200)}
+        grid = self.check(points, [(500, 500), (-50, 100), (997.5, 100), (2000, -300)])
+        # Environ TARGET_PER_CELL nœuds par cellule le long de la ligne
+        self.assertGreaterEqual(grid.cell_size, 995.0 * GridIndex.TARGET_PER_CELL / 200)
+        self.assertLessEqual(len(grid.cells), 200 // GridIndex.TARGET_PER_CELL + 1)
+
+    def test_collinear_vertical(self):
+        points = {f'N{i}': (42.0, i * 0.5) for i in range(200)}
+        grid = self.check(points, [(0, 0), (42, 50), (500, 500)])
+        self.assertLessEqual(len(grid.cells), 200 // GridIndex.TARGET_PER_CELL + 1)
+
+    def test_nearly_collinear(self):
+        rng = random.Random(7)
+        points = {f'N{i}': (rng.uniform(0, 1000), 10 + rng.uniform(0, 1e-6)) for i in range(300)}
+        grid = self.check(points, [(500, 500), (0, 10)])
+        self.assertLessEqual(len(grid.cells), 300)
+
+    def test_single_point(self):
+        points = {'A': (3.0, 4.0)}
+        grid = self.check(points, [(0, 0), (3, 4), (1e6, -1e6)])
+        self.assertEqual(grid.cell_size, 1.0)
+
+    def test_coincident_points(self):
+        points = {f'N{i}': (7.0, 7.0) for i in range(20)}
+        grid = self.check(points, [(0, 0), (7, 7)])
+        self.assertEqual(grid.cell_size, 1.0)
+
+    def test_insert_after_degenerate_start(self):
+        grid = GridIndex({'A': (0.0, 0.0)})
+        points = {'A': (0.0, 0.0)}
+        for i in range(50):
+            points[f'N{i}'] = (i * 3.0, -i * 2.0)
+            grid.insert(f'N{i}', i * 3.0, -i * 2.0)
+        self.assertEqual(grid.nearest(60, -40, 5), brute_nearest(points, 60, -40, 5))
+
+if __name__ == '__main__':
+    unittest.main()
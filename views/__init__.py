@@ -3,6 +3,6 @@ Package views pour WasteGraph
 Contient les vues et formateurs de réponse
 """
 
-from .json_view import JSONView
+from .json_view import JSONView, ColumnarView
 
-__all__ = ['JSONView']
\ No newline at end of file
+__all__ = ['JSONView', 'ColumnarView']
\ No newline at end of file
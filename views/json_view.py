@@ -1,4 +1,7 @@
 import json
+import math
+import struct
+import sys
 
 class JSONView:
     @staticmethod
@@ -15,4 +18,70 @@ class JSONView:
             'status': 'error',
             'message': message,
             'status_code': status_code
-        }
\ No newline at end of file
+        }
+
+class ColumnarView:
+    """Réponses en colonnes : un tableau par champ plutôt qu'un objet par ligne.
+
+    tables : nom -> {champ: valeurs}, les valeurs étant une liste (chaînes,
+    ids) ou un array numérique de même longueur. En JSON, chaque colonne
+    porte son type et ses valeurs (NaN devient null). En binaire : signature,
+    longueur puis en-tête JSON de même forme, où les colonnes numériques
+    donnent leur position au lieu des valeurs ; elles suivent en petit-boutiste,
+    alignées sur 8 octets après l'en-tête, et se lisent sans copie avec les
+    Float64Array / Uint32Array du navigateur.
+    """
+    JSON_TYPE = 'application/vnd.wastegraph.columnar+json'
+    BINARY_TYPE = 'application/vnd.wastegraph.columnar'
+    MAGIC = b'WGCOL\x00\x00\x01'
+    # typecode d'array -> type de tableau typé côté client
+    TYPES = {'d': 'f64', 'f': 'f32', 'I': 'u32', 'i': 'i32'}
+    _LENGTH = struct.Struct('<I')
+
+    @classmethod
+    def json(cls, tables, meta=None, message="Success"):
+        data = {'meta': meta or {}, 'tables': {}}
+        for table, columns in tables.items():
+            described = data['tables'][table] = {'count': cls._count(columns), 'columns': {}}
+            for name, values in columns.items():
+                kind = cls.TYPES.get(getattr(values, 'typecode', None), 'str')
+                if kind in ('f64', 'f32'):
+                    values = [None if math.isnan(value) else value for value in values]
+                described['columns'][name] = {'type': kind, 'values': list(values)}
+        return JSONView.success(data, message)
+
+    @classmethod
+    def binary(cls, tables, meta=None):
+        header = {'meta': meta or {}, 'tables': {}}
+        sections, offset = [], 0
+        for table, columns in tables.items():
+            described = header['tables'][table] = {'count': cls._count(columns), 'columns': {}}
+            for name, values in columns.items():
+                kind = cls.TYPES.get(getattr(values, 'typecode', None))
+                if kind is None:
+                    described['columns'][name] = {'type': 'str', 'values': list(values)}
+                    continue
+                if sys.byteorder == 'big':
+                    values = values[:]
+                    values.byteswap()
+                described['columns'][name] = {'type': kind, 'offset': offset, 'length': len(values)}
+                sections.append((offset, values))
+                offset = cls._aligned(offset + len(values) * values.itemsize)
+
+        encoded = json.dumps(header).encode()
+        base = cls._aligned(len(cls.MAGIC) + cls._LENGTH.size + len(encoded))
+        body = bytearray(base + offset)
+        prefix = cls.MAGIC + cls._LENGTH.pack(len(encoded)) + encoded
+        body[:len(prefix)] = prefix
+        for position, values in sections:
+            data = values.tobytes()
+            body[base + position:base + position + len(data)] = data
+        return bytes(body)
+
+    @staticmethod
+    def _count(columns):
+        return len(next(iter(columns.values()))) if columns else 0
+
+    @staticmethod
+    def _aligned(offset):
+        return (offset + 7) & ~7
\ No newline at end of file